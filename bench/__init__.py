@@ -0,0 +1,8 @@
+"""
+Klad Macro Tool - Offline Benchmarks
+
+Headless harnesses that drive the matching engine from recorded or synthetic
+frames. Run from the repository root, e.g.:
+
+    python -m bench.bench_matching --synthetic 20 --frames-count 500
+"""
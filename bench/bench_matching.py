@@ -0,0 +1,462 @@
+"""
+Klad Macro Tool - Matching Benchmark
+
+Feeds recorded (or synthetic) frames through GroupRunner.process_frame - the
+exact code path of group_worker - with key presses disabled, and reports
+per-stage timings (capture, BGRA->gray, matchTemplate / minMaxLoc per template,
+action dispatch) with percentiles.
+
+Examples:
+    # Group from config.json, recorded frames (PNG folder or video)
+    python -m bench.bench_matching --group "WoW Ret" --frames recordings/ret --json bench_ret.json
+
+    # Synthetic group: 20 random 32x32 templates on a 320x185 region
+    python -m bench.bench_matching --synthetic 20 --json bench_synth.json
+
+    # Compare with a previous run, fail if FPS dropped more than 5%
+    python -m bench.bench_matching --synthetic 20 --baseline bench_synth.json --fail-on-regression 5
+
+    # Check batched (FFT) scores against cv2.matchTemplate, fail above epsilon
+    python -m bench.bench_matching --synthetic 20 --verify-batched
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.config import load_config, flatten_groups  # noqa: E402
+from core.constants import (  # noqa: E402
+    VERSION, COMMIT_HASH, DEFAULT_SEARCH_REGION, DEFAULT_TIMING, ROI_MODE_FULL, TRIGGER_CONDITION_FOUND
+)
+from core.frame_source import ReplayFrameSource, SyntheticFrameSource  # noqa: E402
+from core.worker import GroupRunner, IMAGES_FOLDER  # noqa: E402
+from bench.profiler import StageProfiler  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = ROOT / "config.json"
+VERIFY_EPSILON = 1e-3  # max |batched - matchTemplate| score difference
+
+
+def find_group(config_file: Path, name_or_id: str) -> Optional[Dict[str, Any]]:
+    """Find a group in config.json by name or id (nested folders included)"""
+    groups, _, _ = load_config(config_file)
+    for group in flatten_groups(groups):
+        if group.get('id') == name_or_id or group.get('name') == name_or_id:
+            return group
+    return None
+
+
+def make_synthetic_group(
+    template_count: int,
+    template_size: int,
+    region: list,
+    folder: Path,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Build a group with random textured templates saved as PNG under folder.
+
+    Returns:
+        Group configuration dictionary referencing the generated files
+    """
+    rng = np.random.default_rng(seed)
+    templates = []
+    for i in range(template_count):
+        img = rng.integers(0, 256, (template_size, template_size, 3), dtype=np.uint8)
+        img = cv2.GaussianBlur(img, (3, 3), 0)  # icon-like, not pure noise
+        file = f"synthetic_{i:03d}.png"
+        cv2.imwrite(str(folder / file), img)
+        templates.append(_synthetic_template(f"T{i:03d}", file))
+
+    return {
+        "type": "group",
+        "id": str(uuid.uuid4()),
+        "name": f"Synthetic x{template_count}",
+        "spam_enabled": False,
+        "search_region": list(region),
+        "templates": templates
+    }
+
+
+def _synthetic_template(name: str, file: str) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "file": file,
+        "enabled": True,
+        "threshold": 0.9,
+        "key_combo": "1",
+        "color": "#00ff88",
+        "timing": DEFAULT_TIMING.copy(),
+        "use_macro": False,
+        "macro": []
+    }
+
+
+def make_edge_templates(template_size: int, folder: Path, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Templates the batched matcher has to special-case: a flat one (zero norm,
+    batched) and one with a transparent corner (alpha mask, never batched).
+    """
+    flat = np.full((template_size, template_size, 3), 128, dtype=np.uint8)
+    cv2.imwrite(str(folder / "edge_flat.png"), flat)
+
+    rng = np.random.default_rng(seed + 1)
+    masked = rng.integers(0, 256, (template_size, template_size, 4), dtype=np.uint8)
+    masked[:, :, 3] = 255
+    masked[:template_size // 3, :template_size // 3, 3] = 0
+    cv2.imwrite(str(folder / "edge_masked.png"), masked)
+
+    return [_synthetic_template("edge_flat", "edge_flat.png"),
+            _synthetic_template("edge_masked", "edge_masked.png")]
+
+
+def edge_case_frames(gray: np.ndarray, seed: int = 0) -> List[Tuple[str, np.ndarray]]:
+    """Frames derived from a real one: flat, partly flat, low contrast, and off-size"""
+    rng = np.random.default_rng(seed)
+    height, width = gray.shape
+    partly_flat = gray.copy()
+    partly_flat[:, :width // 2] = 128
+    frames = [
+        ('flat', np.full_like(gray, 128)),
+        ('partly_flat', partly_flat),
+        ('low_contrast', rng.integers(127, 129, gray.shape, dtype=np.uint8)),
+    ]
+    if height > 8 and width > 8:
+        # Region resized while running: the matcher must step aside for matchTemplate
+        frames.append(('size_mismatch', np.ascontiguousarray(gray[:-3, :-5])))
+    return frames
+
+
+def verify_batched(
+    group: Dict[str, Any],
+    source,
+    images_folder: Path,
+    frames: int,
+    epsilon: float = VERIFY_EPSILON,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Compare batched (FFT) scores with cv2.matchTemplate TM_CCOEFF_NORMED.
+
+    Every frame goes through two GroupRunners - batching on and off - and the
+    scores of every template are compared. Edge case frames (flat, partly flat,
+    low contrast, wrong size) are added after the source frames.
+
+    Returns:
+        Result dict; 'passed' is False if any score differs by epsilon or more,
+        or a masked template was batched
+    """
+    # Never found: match() scores every template on every frame
+    templates = [dict(t, threshold=2.0, roi_mode=ROI_MODE_FULL, trigger_condition=TRIGGER_CONDITION_FOUND)
+                 for t in group.get('templates', [])]
+    group = dict(group, templates=templates, batched_matching=True,
+                 pyramid_matching=False, prefilter=False, change_gate=False)
+
+    worst: Dict[str, Tuple[float, str]] = {}
+    checked = 0
+    fallback_ok = True
+    with source:
+        batched = GroupRunner(group, source, dry_run=True, images_folder=images_folder, record_scores=True)
+        reference = GroupRunner(dict(group, batched_matching=False), source, dry_run=True,
+                                images_folder=images_folder, record_scores=True)
+        if batched.matcher is None:
+            batched.close()
+            reference.close()
+            return {'group': group.get('name'), 'passed': False,
+                    'error': "batching not used (fewer than 2 eligible templates)"}
+
+        gray_frames: List[Tuple[str, np.ndarray]] = []
+        while len(gray_frames) < frames and not source.exhausted:
+            bgra = source.grab()
+            if bgra is not None:
+                gray_frames.append((f"frame_{len(gray_frames)}", cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)))
+        if gray_frames:
+            gray_frames.extend(edge_case_frames(gray_frames[0][1], seed))
+
+        for label, gray in gray_frames:
+            batched.match(gray)
+            reference.match(gray)
+            if label == 'size_mismatch' and batched._matcher_usable:
+                fallback_ok = False
+            for name, score in batched.scores.items():
+                diff = abs(float(score) - float(reference.scores[name]))
+                if name not in worst or diff > worst[name][0]:
+                    worst[name] = (diff, label)
+            checked += 1
+
+        batched_names = [t['name'] for t in batched.templates if t.get('batch_index') is not None]
+        masked_batched = [t['name'] for t in batched.templates
+                          if t.get('mask') is not None and t.get('batch_index') is not None]
+        batched.close()
+        reference.close()
+
+    failed = [name for name, (diff, _) in worst.items() if not diff < epsilon]
+    return {
+        'group': group.get('name'),
+        'frames': checked,
+        'epsilon': epsilon,
+        'batched': batched_names,
+        'templates': {name: {'max_abs_diff': diff, 'worst_frame': label} for name, (diff, label) in worst.items()},
+        'size_mismatch_fallback': fallback_ok,
+        'masked_batched': masked_batched,
+        'failed': failed,
+        'passed': bool(checked) and not failed and fallback_ok and not masked_batched,
+    }
+
+
+def print_verify_report(result: Dict[str, Any]) -> None:
+    print(f"\n{result['group']}: batched vs cv2.matchTemplate (TM_CCOEFF_NORMED)")
+    if 'error' in result:
+        print(result['error'])
+        return
+    print(f"{result['frames']} frames, epsilon {result['epsilon']:g}\n")
+    header = f"{'template':<28}{'batched':>8}{'max diff':>12}  worst frame"
+    print(header)
+    print('-' * len(header))
+    for name, t in result['templates'].items():
+        mark = 'yes' if name in result['batched'] else 'no'
+        flag = '  FAIL' if name in result['failed'] else ''
+        print(f"{name[:27]:<28}{mark:>8}{t['max_abs_diff']:>12.2e}  {t['worst_frame']}{flag}")
+    if not result['size_mismatch_fallback']:
+        print("\noff-size frame was scored with the batched matcher")
+    if result['masked_batched']:
+        print(f"\nmasked templates were batched: {', '.join(result['masked_batched'])}")
+    print(f"\n{'PASS' if result['passed'] else 'FAIL'}")
+
+
+def run_benchmark(
+    group: Dict[str, Any],
+    source,
+    images_folder: Path,
+    frames: int,
+    warmup: int
+) -> Tuple[Dict[str, Any], StageProfiler]:
+    """
+    Run frames through GroupRunner and collect stage timings.
+
+    Returns:
+        (result dict, profiler)
+    """
+    profiler = StageProfiler()
+    with source:
+        runner = GroupRunner(group, source, dry_run=True, profiler=profiler, images_folder=images_folder)
+
+        for _ in range(warmup):
+            runner.process_frame()
+        profiler.reset()
+        runner.pop_pyramid_speedup()
+        runner.pop_prefilter_stats()
+        runner.gate_skipped = 0
+
+        processed = 0
+        start = time.perf_counter()
+        while processed < frames and not source.exhausted:
+            if runner.process_frame():
+                processed += 1
+        elapsed = time.perf_counter() - start
+
+    result = {
+        'group': group.get('name'),
+        'templates': len(runner.templates),
+        'region': group.get('search_region'),
+        'frames': processed,
+        'elapsed_sec': round(elapsed, 4),
+        'fps': round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+        'stages': profiler.summary(),
+    }
+    if runner.change_gate:
+        result['gate_skipped'] = runner.gate_skipped
+    speedup = runner.pop_pyramid_speedup()
+    if speedup is not None:
+        result['pyramid_speedup'] = round(speedup, 2)
+    prefilter_stats = runner.pop_prefilter_stats()
+    if prefilter_stats:
+        result['prefilter'] = {
+            name: {'checked': checked, 'rejected': rejected, 'reject_rate': round(rejected / checked, 4)}
+            for name, (checked, rejected) in prefilter_stats.items()
+        }
+    return result, profiler
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        'version': VERSION,
+        'commit': COMMIT_HASH,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'opencv_threads': cv2.getNumThreads(),
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"\n{result['group']}: {result['templates']} templates, region {result['region']}")
+    print(f"{result['frames']} frames in {result['elapsed_sec']:.3f}s -> {result['fps']:.1f} FPS")
+    if 'pyramid_speedup' in result:
+        print(f"pyramid speedup (estimated vs full resolution): x{result['pyramid_speedup']:.1f}")
+    if 'gate_skipped' in result:
+        print(f"change gate: {result['gate_skipped']} of {result['frames']} frames reused the previous result")
+    print()
+
+    header = f"{'stage':<28}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"
+    print(header)
+    print('-' * len(header))
+    for stage, s in result['stages'].items():
+        print(f"{stage[:27]:<28}{s['count']:>8}{s['mean_ms']:>10.3f}{s['p50_ms']:>10.3f}"
+              f"{s['p90_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}")
+    print("(ms)")
+
+    if 'prefilter' in result:
+        print(f"\n{'prefilter':<28}{'checked':>8}{'rejected':>10}{'rate':>10}")
+        for name, p in result['prefilter'].items():
+            print(f"{name[:27]:<28}{p['checked']:>8}{p['rejected']:>10}{p['reject_rate'] * 100:>9.1f}%")
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]) -> float:
+    """
+    Print FPS and per-stage p50/p99 deltas (>= 5%) against a baseline run.
+
+    Returns:
+        FPS change in percent (negative = slower)
+    """
+    base_fps = baseline.get('fps', 0) or 0
+    fps_delta = (result['fps'] - base_fps) / base_fps * 100 if base_fps else 0.0
+    print(f"\nvs baseline ({baseline.get('env', {}).get('commit', '?')}): "
+          f"FPS {base_fps:.1f} -> {result['fps']:.1f} ({fps_delta:+.1f}%)")
+
+    for stage, s in result['stages'].items():
+        b = baseline.get('stages', {}).get(stage)
+        # Per-template stages are too noisy for a diff, compare the totals
+        if not b or ':' in stage:
+            continue
+        for key in ('p50_ms', 'p99_ms'):
+            if b[key] > 0:
+                delta = (s[key] - b[key]) / b[key] * 100
+                if abs(delta) >= 5:
+                    print(f"  {stage:<28}{key:<8}{b[key]:>9.3f} -> {s[key]:>9.3f} ({delta:+.1f}%)")
+    return fps_delta
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the template matching hot path")
+    parser.add_argument('--config', type=Path, default=CONFIG_FILE, help="config.json path")
+    parser.add_argument('--group', help="Group name or id from config.json")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="Use a synthetic group with N templates")
+    parser.add_argument('--template-size', type=int, default=32, help="Synthetic template size (px)")
+    parser.add_argument('--region', type=int, nargs=4, metavar=('X1', 'Y1', 'X2', 'Y2'),
+                        help="Override search region (synthetic default: DEFAULT_SEARCH_REGION)")
+    parser.add_argument('--frames', type=Path, help="Recorded frames: PNG folder or video file")
+    parser.add_argument('--frames-count', type=int, default=500, help="Frames to measure")
+    parser.add_argument('--warmup', type=int, default=20, help="Warmup frames (not measured)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for synthetic templates/frames")
+    parser.add_argument('--pyramid', action='store_true', help="Enable pyramid matching for the group")
+    parser.add_argument('--prefilter', action='store_true', help="Enable the histogram prefilter for the group")
+    parser.add_argument('--change-gate', action='store_true', help="Skip matching on unchanged frames")
+    parser.add_argument('--threads', type=int, help="cv2.setNumThreads before running")
+    parser.add_argument('--verify-batched', action='store_true',
+                        help="Compare batched scores with cv2.matchTemplate instead of timing (exit 1 on mismatch)")
+    parser.add_argument('--epsilon', type=float, default=VERIFY_EPSILON,
+                        help="Max allowed score difference for --verify-batched")
+    parser.add_argument('--json', type=Path, help="Write results as JSON")
+    parser.add_argument('--baseline', type=Path, help="Previous JSON result to compare against")
+    parser.add_argument('--fail-on-regression', type=float, metavar='PCT',
+                        help="Exit with code 1 if FPS dropped more than PCT percent vs baseline")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] %(message)s', datefmt='%H:%M:%S')
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    tmp_dir = None
+    if args.synthetic:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="klad_bench_")
+        images_folder = Path(tmp_dir.name)
+        region = args.region or DEFAULT_SEARCH_REGION
+        group = make_synthetic_group(args.synthetic, args.template_size, region, images_folder, args.seed)
+        if args.verify_batched:
+            group['templates'] += make_edge_templates(args.template_size, images_folder, args.seed)
+    elif args.group:
+        group = find_group(args.config, args.group)
+        if group is None:
+            print(f"Group not found: {args.group}", file=sys.stderr)
+            return 2
+        images_folder = IMAGES_FOLDER
+        if args.region:
+            group = dict(group, search_region=list(args.region))
+    else:
+        parser.error("--group or --synthetic is required")
+
+    if args.pyramid:
+        group = dict(group, pyramid_matching=True)
+    if args.prefilter:
+        group = dict(group, prefilter=True)
+    if args.change_gate:
+        group = dict(group, change_gate=True)
+
+    region = group.get('search_region', DEFAULT_SEARCH_REGION)
+    if args.frames:
+        source = ReplayFrameSource(region, str(args.frames), loop=True)
+    else:
+        paste = [cv2.imread(str(images_folder / t['file'])) for t in group.get('templates', [])]
+        source = SyntheticFrameSource(region, seed=args.seed, paste_images=[p for p in paste if p is not None])
+
+    if args.verify_batched:
+        try:
+            result = verify_batched(group, source, images_folder, args.frames_count, args.epsilon, args.seed)
+        finally:
+            if tmp_dir is not None:
+                tmp_dir.cleanup()
+        print_verify_report(result)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            print(f"\nResults written to {args.json}")
+        return 0 if result['passed'] else 1
+
+    try:
+        result, _ = run_benchmark(group, source, images_folder, args.frames_count, args.warmup)
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    result['frame_source'] = str(args.frames) if args.frames else f"synthetic(seed={args.seed})"
+    result['env'] = environment_info()
+    print_report(result)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        fps_delta = compare(result, baseline)
+        if args.fail_on_regression is not None and fps_delta < -args.fail_on_regression:
+            print(f"\nFPS regression {fps_delta:.1f}% exceeds {args.fail_on_regression}%", file=sys.stderr)
+            exit_code = 1
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.json}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
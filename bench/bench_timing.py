@@ -0,0 +1,91 @@
+"""
+Klad Macro Tool - Key Timing Benchmark
+
+Measures how long a requested key delay really takes with plain time.sleep
+and with precise_sleep at several spin thresholds, plus the CPU time spent
+waiting, to pick the "Hassas Bekleme" setting for a machine.
+
+Examples:
+    python -m bench.bench_timing
+    python -m bench.bench_timing --delays 1 5 --spins 0 0.5 1 2 --repeat 300 --json timing.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.timing import precise_sleep, enable_high_resolution_timer, disable_high_resolution_timer  # noqa: E402
+
+
+def measure(wait: Callable[[float], None], seconds: float, repeat: int) -> Dict[str, Any]:
+    """
+    Time repeated waits of the given length.
+
+    Returns:
+        Overshoot percentiles (ms) and CPU time per wait (ms)
+    """
+    overshoot = np.empty(repeat)
+    cpu_start = time.process_time()
+    for i in range(repeat):
+        start = time.perf_counter()
+        wait(seconds)
+        overshoot[i] = time.perf_counter() - start - seconds
+    cpu = time.process_time() - cpu_start
+    overshoot *= 1000
+    return {
+        'requested_ms': seconds * 1000,
+        'mean_ms': round(float(overshoot.mean()), 4),
+        'p50_ms': round(float(np.percentile(overshoot, 50)), 4),
+        'p99_ms': round(float(np.percentile(overshoot, 99)), 4),
+        'max_ms': round(float(overshoot.max()), 4),
+        'cpu_ms': round(cpu / repeat * 1000, 4),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark key delay accuracy")
+    parser.add_argument('--delays', type=float, nargs='+', default=[1.0, 2.0, 5.0], help="Requested delays (ms)")
+    parser.add_argument('--spins', type=float, nargs='+', default=[0.5, 1.0, 2.0],
+                        help="precise_sleep spin thresholds to try (ms)")
+    parser.add_argument('--repeat', type=int, default=200, help="Waits per measurement")
+    parser.add_argument('--json', type=Path, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    high_res = enable_high_resolution_timer()
+    results: List[Dict[str, Any]] = []
+    try:
+        for delay_ms in args.delays:
+            seconds = delay_ms / 1000
+            results.append(dict(measure(time.sleep, seconds, args.repeat), method='time.sleep'))
+            for spin_ms in args.spins:
+                wait = lambda s, spin=spin_ms / 1000: precise_sleep(s, spin)  # noqa: E731
+                results.append(dict(measure(wait, seconds, args.repeat), method=f"precise spin={spin_ms:g}ms"))
+    finally:
+        if high_res:
+            disable_high_resolution_timer()
+
+    header = f"{'method':<24}{'req':>8}{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}{'cpu':>10}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['method']:<24}{r['requested_ms']:>8.2f}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}"
+              f"{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}{r['cpu_ms']:>10.3f}")
+    print("(overshoot and CPU time per wait, ms)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Klad Macro Tool - Stage Profiler
+Collects per-stage timings and summarizes them with percentiles
+"""
+
+import numpy as np
+from collections import defaultdict
+from typing import Dict, List
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class StageProfiler:
+    """Records durations per stage name (seconds) and reports them in milliseconds"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize all stages.
+
+        Returns:
+            {stage: {'count', 'mean_ms', 'p50_ms', ..., 'max_ms'}}
+        """
+        result = {}
+        for stage, values in sorted(self.samples.items()):
+            arr = np.asarray(values, dtype=np.float64) * 1000.0
+            if arr.size == 0:
+                continue
+            entry = {
+                'count': int(arr.size),
+                'mean_ms': round(float(arr.mean()), 4),
+            }
+            for p, value in zip(PERCENTILES, np.percentile(arr, PERCENTILES)):
+                entry[f'p{p}_ms'] = round(float(value), 4)
+            entry['max_ms'] = round(float(arr.max()), 4)
+            result[stage] = entry
+        return result
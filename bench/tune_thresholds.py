@@ -0,0 +1,317 @@
+"""
+Klad Macro Tool - Threshold Tuner
+
+Finds, per template, the threshold that best separates frames that contain
+the template from frames that do not, and optionally writes it back into
+config.json.
+
+Labeled mode runs a recording through GroupRunner (the bot's matching code,
+with the group's own pyramid / prefilter / batched settings) and collects
+every template's score per frame. labels.json lists which templates are
+visible in each frame:
+
+    {"frame_0001.png": ["Heal", "Buff"], "frame_0002.png": [], ...}
+
+Frames missing from labels.json are skipped (or counted as negatives with
+--unlabeled-negative). For video recordings the keys are frame numbers.
+
+The chosen threshold minimizes missed + false triggers (false ones weighted
+by --fp-weight); among equally good thresholds it takes the middle of the
+widest gap between scores, i.e. the largest margin on both sides.
+
+Telemetry mode summarizes score files the bot wrote with "Skor kaydı"
+enabled (telemetry/*.npz). Without labels it can only split each
+distribution in two (Otsu); check the suggestion before writing it.
+
+Close the app before --write: it saves its own copy of the config on exit.
+
+Examples:
+    python -m bench.tune_thresholds --group "WoW Ret" --frames recordings/ret --labels recordings/ret/labels.json
+    python -m bench.tune_thresholds --group "WoW Ret" --frames recordings/ret --labels labels.json --write
+    python -m bench.tune_thresholds --telemetry telemetry/WoW_Ret_20260101-120000.npz
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.config import load_config, save_config, flatten_groups  # noqa: E402
+from core.frame_source import ReplayFrameSource  # noqa: E402
+from core.telemetry import load_score_telemetry  # noqa: E402
+from core.worker import GroupRunner, IMAGES_FOLDER  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = ROOT / "config.json"
+
+# Range of the threshold slider in the template dialogs
+MIN_THRESHOLD = 0.5
+MAX_THRESHOLD = 1.0
+
+
+def find_group(groups: List[Dict[str, Any]], name_or_id: str) -> Optional[Dict[str, Any]]:
+    """Find a group by name or id (nested folders included)"""
+    for group in flatten_groups(groups):
+        if group.get('id') == name_or_id or group.get('name') == name_or_id:
+            return group
+    return None
+
+
+def collect_scores(group: Dict[str, Any], frames: Path, images_folder: Path) -> Dict[str, Dict[str, float]]:
+    """
+    Score every template on every recorded frame with the bot's matching code.
+
+    The change gate is turned off so every frame is really matched.
+
+    Returns:
+        {frame name: {template name: score (NaN = prefilter rejected)}}
+    """
+    group = dict(group, change_gate=False)
+    source = ReplayFrameSource(group.get('search_region', [0, 0, 100, 100]), str(frames), loop=False)
+    scores: Dict[str, Dict[str, float]] = {}
+    with source:
+        runner = GroupRunner(group, source, dry_run=True, images_folder=images_folder, record_scores=True)
+        if not runner.templates:
+            # process_frame would not grab, the source would never run out
+            logger.warning(f"{group.get('name')}: no enabled or loadable templates")
+            runner.close()
+            return scores
+        while not source.exhausted:
+            if not runner.process_frame():
+                continue
+            runner.score_unscored()
+            scores[source.current_name] = dict(runner.scores)
+        runner.close()
+    return scores
+
+
+def best_threshold(positives: np.ndarray, negatives: np.ndarray, fp_weight: float = 1.0) -> Dict[str, Any]:
+    """
+    Threshold that separates positive from negative scores best.
+
+    A template counts as found when score >= threshold. Cost is the missed
+    rate plus fp_weight times the false trigger rate; ties go to the widest
+    gap between neighbouring scores.
+
+    Returns:
+        {'threshold', 'missed', 'false', 'margin', 'd_prime'}
+    """
+    values = np.concatenate([positives, negatives])
+    is_pos = np.concatenate([np.ones(len(positives), bool), np.zeros(len(negatives), bool)])
+    order = np.argsort(values, kind='stable')
+    values, is_pos = values[order], is_pos[order]
+
+    # Candidate i sits between values[i - 1] and values[i] (0 = below all, n = above all)
+    below = np.concatenate([[values[0] - 0.01], values])
+    above = np.concatenate([values, [values[-1] + 0.01]])
+    candidates = (below + above) / 2
+    gaps = above - below
+    missed = np.concatenate([[0], np.cumsum(is_pos)])                        # positives below
+    false = len(negatives) - np.concatenate([[0], np.cumsum(~is_pos)])       # negatives at/above
+    cost = missed / len(positives) + fp_weight * false / len(negatives)
+    cost[gaps <= 0] = np.inf  # between equal scores: not a real threshold
+
+    best = np.flatnonzero(cost <= cost.min() + 1e-12)
+    index = best[np.argmax(gaps[best])]
+    spread = np.sqrt((positives.var() + negatives.var()) / 2)
+    return {
+        'threshold': float(candidates[index]),
+        'missed': int(missed[index]),
+        'false': int(false[index]),
+        'margin': float(positives.min() - negatives.max()),
+        'd_prime': float((positives.mean() - negatives.mean()) / spread) if spread > 0 else float('inf'),
+    }
+
+
+def otsu_threshold(scores: np.ndarray) -> float:
+    """Split a score distribution in two classes with minimal within-class variance"""
+    hist, edges = np.histogram(scores, bins=200, range=(-1.0, 1.0))
+    centers = (edges[:-1] + edges[1:]) / 2
+    weight = np.cumsum(hist)
+    total = weight[-1]
+    mean = np.cumsum(hist * centers)
+    w0, w1 = weight[:-1], total - weight[:-1]
+    valid = (w0 > 0) & (w1 > 0)
+    between = np.zeros_like(w0, dtype=np.float64)
+    m0 = mean[:-1][valid] / w0[valid]
+    m1 = (mean[-1] - mean[:-1][valid]) / w1[valid]
+    between[valid] = w0[valid] * w1[valid] * (m0 - m1) ** 2
+    return float(edges[1:-1][np.argmax(between)])
+
+
+def tune_labeled(
+    group: Dict[str, Any],
+    scores: Dict[str, Dict[str, float]],
+    labels: Dict[str, List[str]],
+    unlabeled_negative: bool,
+    fp_weight: float
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Pick a threshold per template from labeled frame scores.
+
+    Returns:
+        {template name: best_threshold() result + 'current', 'positives', 'negatives'}
+    """
+    results = {}
+    for template in group.get('templates', []):
+        name = template['name']
+        positives, negatives = [], []
+        for frame, frame_scores in scores.items():
+            if name not in frame_scores or np.isnan(frame_scores[name]):
+                continue  # not scored on this frame (prefilter)
+            if frame in labels:
+                (positives if name in labels[frame] else negatives).append(frame_scores[name])
+            elif unlabeled_negative:
+                negatives.append(frame_scores[name])
+        if not positives or not negatives:
+            logger.warning(f"{name}: needs labeled frames with and without the template, skipped")
+            continue
+        result = best_threshold(np.array(positives), np.array(negatives), fp_weight)
+        result.update(current=template.get('threshold'), positives=len(positives), negatives=len(negatives))
+        results[name] = result
+    return results
+
+
+def tune_telemetry(files: List[Path]) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize recorded score distributions and suggest an Otsu split per template.
+
+    Returns:
+        {template name: {'threshold', 'current', 'samples', 'p50', 'p99', 'above_current'}}
+    """
+    samples: Dict[str, List[np.ndarray]] = {}
+    current: Dict[str, float] = {}
+    for file in files:
+        data = load_score_telemetry(file)
+        for column, name in enumerate(data['names']):
+            values = data['scores'][:, column]
+            samples.setdefault(name, []).append(values[~np.isnan(values)])
+            current[name] = data['thresholds'][column]
+
+    results = {}
+    for name, parts in samples.items():
+        values = np.concatenate(parts)
+        if values.size < 2:
+            continue
+        results[name] = {
+            'threshold': otsu_threshold(values),
+            'current': current[name],
+            'samples': int(values.size),
+            'p50': float(np.percentile(values, 50)),
+            'p99': float(np.percentile(values, 99)),
+            'above_current': float((values >= current[name]).mean()),
+        }
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]], labeled: bool) -> None:
+    if labeled:
+        header = f"{'template':<24}{'current':>9}{'tuned':>8}{'pos':>6}{'neg':>6}{'missed':>8}{'false':>7}{'margin':>9}{'dprime':>7}"
+    else:
+        header = f"{'template':<24}{'current':>9}{'otsu':>8}{'samples':>9}{'p50':>8}{'p99':>8}{'>=cur':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        current = f"{r['current']:.3f}" if r.get('current') is not None else '-'
+        if labeled:
+            print(f"{name[:23]:<24}{current:>9}{r['threshold']:>8.3f}{r['positives']:>6}{r['negatives']:>6}"
+                  f"{r['missed']:>8}{r['false']:>7}{r['margin']:>9.3f}{r['d_prime']:>7.1f}")
+        else:
+            print(f"{name[:23]:<24}{current:>9}{r['threshold']:>8.3f}{r['samples']:>9}{r['p50']:>8.3f}"
+                  f"{r['p99']:>8.3f}{r['above_current'] * 100:>7.1f}%")
+    if labeled:
+        print("(margin > 0: every positive scores above every negative)")
+
+
+def write_thresholds(config_file: Path, group_name: str, results: Dict[str, Dict[str, Any]]) -> int:
+    """
+    Store tuned thresholds (clamped to the slider range) in config.json.
+
+    Returns:
+        Number of templates changed
+    """
+    groups, global_settings, presets = load_config(config_file)
+    group = find_group(groups, group_name)
+    if group is None:
+        raise ValueError(f"Group not found: {group_name}")
+
+    changed = 0
+    for template in group.get('templates', []):
+        result = results.get(template['name'])
+        if result is None:
+            continue
+        threshold = min(max(result['threshold'], MIN_THRESHOLD), MAX_THRESHOLD)
+        if threshold != result['threshold']:
+            logger.warning(f"{template['name']}: {result['threshold']:.3f} clamped to {threshold}")
+        threshold = round(threshold, 3)
+        if template.get('threshold') != threshold:
+            template['threshold'] = threshold
+            changed += 1
+
+    if changed and not save_config(config_file, groups, global_settings, presets):
+        raise OSError(f"Could not write {config_file}")
+    return changed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tune template thresholds from labeled recordings or telemetry")
+    parser.add_argument('--config', type=Path, default=CONFIG_FILE, help="config.json path")
+    parser.add_argument('--group', help="Group name or id from config.json")
+    parser.add_argument('--frames', type=Path, help="Recorded frames: PNG folder or video file")
+    parser.add_argument('--labels', type=Path, help="JSON: frame name -> templates visible in it")
+    parser.add_argument('--unlabeled-negative', action='store_true',
+                        help="Count frames missing from labels as frames without any template")
+    parser.add_argument('--fp-weight', type=float, default=1.0,
+                        help="Cost of a false trigger relative to a missed one")
+    parser.add_argument('--telemetry', type=Path, nargs='+', help="Score files written by the bot (telemetry/*.npz)")
+    parser.add_argument('--write', action='store_true', help="Write the thresholds into config.json")
+    parser.add_argument('--json', type=Path, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] %(message)s', datefmt='%H:%M:%S')
+
+    labeled = args.telemetry is None
+    if labeled:
+        if not (args.group and args.frames and args.labels):
+            parser.error("--group, --frames and --labels are required (or use --telemetry)")
+        groups, _, _ = load_config(args.config)
+        group = find_group(groups, args.group)
+        if group is None:
+            print(f"Group not found: {args.group}", file=sys.stderr)
+            return 2
+        with open(args.labels, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+        scores = collect_scores(group, args.frames, IMAGES_FOLDER)
+        print(f"{group['name']}: {len(scores)} frames scored, {sum(1 for f in scores if f in labels)} labeled\n")
+        results = tune_labeled(group, scores, labels, args.unlabeled_negative, args.fp_weight)
+        group_name = group['name']
+    else:
+        results = tune_telemetry(args.telemetry)
+        group_name = args.group or load_score_telemetry(args.telemetry[0])['group']
+
+    if not results:
+        print("Nothing to tune", file=sys.stderr)
+        return 1
+    print_report(results, labeled)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.json}")
+
+    if args.write:
+        changed = write_thresholds(args.config, group_name, results)
+        print(f"\n{changed} threshold(s) written to {args.config}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
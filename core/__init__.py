@@ -8,6 +8,16 @@ This module contains the core functionality:
 - config: Configuration loading and saving
 - export_import: Group export/import functionality
 - keyboard_utils: Keyboard key name utilities
+- capture: Shared capture server and frame bus
+- matching: Batched template matching with cached spectra
+- frame_source: Pluggable frame sources (live, shared, replay, synthetic)
+- timing: Precise waits, frame pacing and delay measurement
+- actions: Background action executor for key presses and macros
+- control: Shared-memory control block for worker toggles and commands
+- status: Shared-memory worker status table sampled by the UI
+- affinity: Worker CPU placement, priority and OpenCV thread planning
+- template_cache: Content-hash keyed, memory-mapped template image cache
+- telemetry: Sampled match score ring buffer for threshold tuning
 """
 
 from .constants import (
@@ -19,9 +29,14 @@ from .constants import (
     # Timing (used by worker)
     STATUS_CHECK_INTERVAL_MS,
     TEST_CYCLE_INTERVAL_MS,
+    DEFAULT_TEST_FPS,
     FPS_REPORT_INTERVAL_SEC,
     FPS_RESET_INTERVAL_SEC,
     IDLE_SLEEP_SEC,
+    CONTROL_WAIT_TIMEOUT_SEC,
+    STATUS_NAME_BYTES,
+    FRAME_BUS_SLOTS,
+    FRAME_WAIT_TIMEOUT_SEC,
 
     # UI
     MIN_REGION_SIZE,
@@ -31,6 +46,43 @@ from .constants import (
     DEFAULT_TIMING,
     DEFAULT_SEARCH_REGION,
 
+    # Per-template search window
+    ROI_MODE_FULL,
+    ROI_MODE_AUTO,
+    ROI_MODE_FIXED,
+    DEFAULT_ROI_MODE,
+    ROI_PADDING_PX,
+    ROI_FULL_SCAN_INTERVAL,
+
+    # Per-template color check
+    COLOR_MODE_OFF,
+    COLOR_MODE_RGB,
+    COLOR_MODE_HSV,
+    DEFAULT_COLOR_MODE,
+    DEFAULT_COLOR_TOLERANCE,
+
+    # Frame pacing
+    DEFAULT_TARGET_FPS,
+    TIMER_SPIN_THRESHOLD_SEC,
+
+    # Action executor
+    ACTION_POLICY_DROP,
+    ACTION_POLICY_COALESCE,
+    ACTION_POLICY_QUEUE,
+    DEFAULT_ACTION_POLICY,
+    ACTION_QUEUE_SIZE,
+    WORKER_PROCESSES_PER_GROUP,
+    WORKER_PROCESSES_AUTO,
+    DEFAULT_WORKER_PROCESSES,
+    WORKER_PRIORITY_BELOW_NORMAL,
+    WORKER_PRIORITY_NORMAL,
+    WORKER_PRIORITY_ABOVE_NORMAL,
+    WORKER_PRIORITY_HIGH,
+    DEFAULT_WORKER_PRIORITY,
+    DEFAULT_RESERVED_CORES,
+    DEFAULT_SPREAD_WORKERS,
+    DEFAULT_CV_THREADS,
+
     # Colors
     COLORS,
     LOG_COLORS,
@@ -46,9 +98,44 @@ from .keyboard_handler import (
     press_key_with_timing,
     press_key_combo,
     execute_macro,
+    compile_macro,
+    run_macro,
+    compile_key_combo,
+    press_compiled_combo,
 )
 
-from .worker import group_worker
+from .worker import group_worker, multi_group_worker, plan_worker_processes, test_worker
+
+from .capture import (
+    FrameBus,
+    capture_server,
+    get_union_region,
+)
+
+from .matching import BatchedMatcher
+
+from .template_cache import TemplateCache, get_template_cache
+
+from .telemetry import ScoreTelemetry, load_score_telemetry
+
+from .timing import precise_sleep, set_spin_threshold, FramePacer, DelayStats, LatencyHistogram
+
+from .actions import ActionExecutor
+
+from .control import WorkerControl
+
+from .status import WorkerStatus
+
+from .affinity import AffinityPlanner, physical_cores, apply_placement, cv_thread_count
+
+from .frame_source import (
+    FrameSource,
+    MssFrameSource,
+    SharedMemoryFrameSource,
+    ReplayFrameSource,
+    SyntheticFrameSource,
+    create_frame_source,
+)
 
 from .config import (
     get_default_group,
@@ -73,7 +160,7 @@ from .export_import import (
     parse_import_code,
 )
 
-from .keyboard_utils import get_physical_key_name
+from .keyboard_utils import get_physical_key_name, resolve_key
 
 __all__ = [
     # Version
@@ -83,15 +170,49 @@ __all__ = [
     # Constants
     'STATUS_CHECK_INTERVAL_MS',
     'TEST_CYCLE_INTERVAL_MS',
+    'DEFAULT_TEST_FPS',
     'FPS_REPORT_INTERVAL_SEC',
     'FPS_RESET_INTERVAL_SEC',
     'IDLE_SLEEP_SEC',
+    'CONTROL_WAIT_TIMEOUT_SEC',
+    'STATUS_NAME_BYTES',
+    'FRAME_BUS_SLOTS',
+    'FRAME_WAIT_TIMEOUT_SEC',
     'MIN_REGION_SIZE',
     'DEFAULT_THRESHOLD',
     'DEFAULT_SPAM_INTERVAL',
     'DEFAULT_CYCLE_DELAY',
     'DEFAULT_TIMING',
     'DEFAULT_SEARCH_REGION',
+    'ROI_MODE_FULL',
+    'ROI_MODE_AUTO',
+    'ROI_MODE_FIXED',
+    'DEFAULT_ROI_MODE',
+    'ROI_PADDING_PX',
+    'ROI_FULL_SCAN_INTERVAL',
+    'COLOR_MODE_OFF',
+    'COLOR_MODE_RGB',
+    'COLOR_MODE_HSV',
+    'DEFAULT_COLOR_MODE',
+    'DEFAULT_COLOR_TOLERANCE',
+    'DEFAULT_TARGET_FPS',
+    'TIMER_SPIN_THRESHOLD_SEC',
+    'ACTION_POLICY_DROP',
+    'ACTION_POLICY_COALESCE',
+    'ACTION_POLICY_QUEUE',
+    'DEFAULT_ACTION_POLICY',
+    'ACTION_QUEUE_SIZE',
+    'WORKER_PROCESSES_PER_GROUP',
+    'WORKER_PROCESSES_AUTO',
+    'DEFAULT_WORKER_PROCESSES',
+    'WORKER_PRIORITY_BELOW_NORMAL',
+    'WORKER_PRIORITY_NORMAL',
+    'WORKER_PRIORITY_ABOVE_NORMAL',
+    'WORKER_PRIORITY_HIGH',
+    'DEFAULT_WORKER_PRIORITY',
+    'DEFAULT_RESERVED_CORES',
+    'DEFAULT_SPREAD_WORKERS',
+    'DEFAULT_CV_THREADS',
     'COLORS',
     'LOG_COLORS',
     'MACRO_ACTION_COLORS',
@@ -103,10 +224,54 @@ __all__ = [
     'press_key_with_timing',
     'press_key_combo',
     'execute_macro',
+    'compile_macro',
+    'run_macro',
+    'compile_key_combo',
+    'press_compiled_combo',
     'get_physical_key_name',
+    'resolve_key',
 
     # Worker
     'group_worker',
+    'multi_group_worker',
+    'plan_worker_processes',
+    'test_worker',
+
+    # Capture
+    'FrameBus',
+    'capture_server',
+    'get_union_region',
+
+    # Matching
+    'BatchedMatcher',
+    'TemplateCache',
+    'get_template_cache',
+    'ScoreTelemetry',
+    'load_score_telemetry',
+
+    # Timing
+    'precise_sleep',
+    'set_spin_threshold',
+    'FramePacer',
+    'DelayStats',
+    'LatencyHistogram',
+
+    # Actions
+    'ActionExecutor',
+    'WorkerControl',
+    'WorkerStatus',
+    'AffinityPlanner',
+    'physical_cores',
+    'apply_placement',
+    'cv_thread_count',
+
+    # Frame sources
+    'FrameSource',
+    'MssFrameSource',
+    'SharedMemoryFrameSource',
+    'ReplayFrameSource',
+    'SyntheticFrameSource',
+    'create_frame_source',
 
     # Config
     'get_default_group',
@@ -0,0 +1,102 @@
+"""
+Klad Macro Tool - Action Executor
+Runs key presses and macros on a background thread so matching keeps going
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Tuple
+
+from .constants import (
+    ACTION_POLICY_DROP,
+    ACTION_POLICY_COALESCE,
+    DEFAULT_ACTION_POLICY,
+    ACTION_QUEUE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ActionExecutor:
+    """
+    Single background thread executing actions in submission order.
+
+    Policies for an action submitted while another one runs or waits:
+        - drop: rejected (no backlog, like the old synchronous behaviour)
+        - coalesce: rejected if an action with the same key is already waiting
+        - queue: appended, up to max_pending waiting actions
+
+    Args:
+        policy: ACTION_POLICY_DROP, ACTION_POLICY_COALESCE or ACTION_POLICY_QUEUE
+        max_pending: Maximum number of waiting actions (bounded queue)
+    """
+
+    def __init__(self, policy: str = DEFAULT_ACTION_POLICY, max_pending: int = ACTION_QUEUE_SIZE):
+        self.policy = policy
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending: Deque[Tuple[str, Callable[[], None]]] = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="action-executor", daemon=True)
+        self._thread.start()
+
+    @property
+    def idle(self) -> bool:
+        """True if nothing is running or waiting"""
+        with self._cond:
+            return not self._busy and not self._pending
+
+    def submit(self, key: str, action: Callable[[], None]) -> bool:
+        """
+        Hand an action to the executor thread.
+
+        Args:
+            key: Identity used for coalescing (e.g. template name)
+            action: Callable doing the key presses
+
+        Returns:
+            True if accepted, False if rejected by the policy or a full queue
+        """
+        with self._cond:
+            if not self._running:
+                return False
+            if self.policy == ACTION_POLICY_DROP and (self._busy or self._pending):
+                self.dropped += 1
+                return False
+            if self.policy == ACTION_POLICY_COALESCE and any(k == key for k, _ in self._pending):
+                self.dropped += 1
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending.append((key, action))
+            self._cond.notify()
+            return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                key, action = self._pending.popleft()
+                self._busy = True
+            try:
+                action()
+            except Exception as e:
+                logger.error(f"Action error ({key}): {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Discard waiting actions and stop after the running one finishes"""
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify()
+        self._thread.join(timeout)
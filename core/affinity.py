@@ -0,0 +1,233 @@
+"""
+Klad Macro Tool - CPU Placement
+Worker CPU affinity, process priority and OpenCV thread planning
+"""
+
+import sys
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from .constants import (
+    WORKER_PRIORITY_BELOW_NORMAL,
+    WORKER_PRIORITY_NORMAL,
+    WORKER_PRIORITY_ABOVE_NORMAL,
+    WORKER_PRIORITY_HIGH,
+)
+
+logger = logging.getLogger(__name__)
+
+_SYSFS_CPU = Path("/sys/devices/system/cpu")
+
+
+def _parse_cpu_list(text: str) -> List[int]:
+    """'0-2,8' -> [0, 1, 2, 8]"""
+    cpus = []
+    for part in text.strip().split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def physical_cores() -> List[List[int]]:
+    """
+    Logical CPUs grouped by physical core, in core order.
+
+    Linux reads the sysfs topology. Elsewhere psutil's logical/physical counts
+    are used: with SMT, Windows numbers the two threads of a core next to
+    each other (0-1, 2-3, ...).
+
+    Returns:
+        [[logical CPUs of core 0], [logical CPUs of core 1], ...]
+    """
+    if sys.platform.startswith('linux') and _SYSFS_CPU.exists():
+        cores = {}
+        for path in sorted(_SYSFS_CPU.glob('cpu[0-9]*/topology/thread_siblings_list')):
+            try:
+                siblings = tuple(_parse_cpu_list(path.read_text()))
+            except (OSError, ValueError):
+                continue
+            cores[siblings] = list(siblings)
+        if cores:
+            return sorted(cores.values(), key=lambda core: core[0])
+
+    try:
+        import psutil
+        logical = psutil.cpu_count(logical=True) or 1
+        physical = psutil.cpu_count(logical=False) or logical
+    except ImportError:
+        import os
+        logical = physical = os.cpu_count() or 1
+
+    threads = logical // physical if physical and logical % physical == 0 else 1
+    return [list(range(i, i + threads)) for i in range(0, threads * (logical // threads), threads)]
+
+
+class AffinityPlanner:
+    """
+    Decides which CPUs each worker process may run on.
+
+    The first reserved_cores physical cores are left to the game (its main
+    thread usually runs on the low cores). From the rest, at most max_cpus
+    logical CPUs are used. With spread, every worker gets its own physical
+    core (round-robin when there are more workers than cores) instead of
+    all workers sharing the whole set.
+
+    Args:
+        max_cpus: Logical CPUs workers may use (0 = all)
+        reserved_cores: Physical cores kept free for the game
+        spread: One physical core per worker
+        cores: Topology override (default physical_cores())
+    """
+
+    def __init__(
+        self,
+        max_cpus: int = 0,
+        reserved_cores: int = 0,
+        spread: bool = False,
+        cores: Optional[List[List[int]]] = None
+    ):
+        self.cores = cores if cores is not None else physical_cores()
+        self.total_cpus = sum(len(core) for core in self.cores)
+        reserved_cores = max(0, min(reserved_cores, len(self.cores) - 1))
+        self.reserved = [cpu for core in self.cores[:reserved_cores] for cpu in core]
+
+        available = self.cores[reserved_cores:]
+        if 0 < max_cpus < sum(len(core) for core in available):
+            limited, remaining = [], max_cpus
+            for core in available:
+                if remaining <= 0:
+                    break
+                limited.append(core[:remaining])
+                remaining -= len(limited[-1])
+            available = limited
+        self.available = available
+        self.spread = spread
+        self.pinned = spread or bool(self.reserved) or len(self.cpus) < self.total_cpus
+
+    @property
+    def cpus(self) -> List[int]:
+        """All logical CPUs workers may use"""
+        return [cpu for core in self.available for cpu in core]
+
+    def cpus_for(self, index: int) -> Optional[List[int]]:
+        """
+        CPUs for the index-th worker process.
+
+        Returns:
+            Logical CPU list, or None to leave the process unpinned
+        """
+        if not self.pinned:
+            return None
+        if self.spread:
+            return list(self.available[index % len(self.available)])
+        return self.cpus
+
+    def sharing(self, index: int, workers: int) -> int:
+        """
+        Number of worker processes that run on the CPUs of the index-th one.
+
+        Args:
+            index: Worker index (as passed to cpus_for)
+            workers: Total number of workers placed
+        """
+        workers = max(workers, index + 1)
+        if self.spread and self.pinned:
+            cores = len(self.available)
+            return len(range(index % cores, workers, cores))
+        return workers
+
+    def describe(self) -> str:
+        text = f"{len(self.cores)} fiziksel / {self.total_cpus} mantıksal çekirdek"
+        if self.reserved:
+            text += f", oyuna ayrılan CPU {_format_cpus(self.reserved)}"
+        if self.pinned:
+            text += f", worker CPU {_format_cpus(self.cpus)}"
+            if self.spread:
+                text += " (her worker ayrı çekirdek)"
+        return text
+
+
+def _format_cpus(cpus: List[int]) -> str:
+    return ','.join(str(cpu) for cpu in cpus)
+
+
+def cv_thread_count(setting: int, cpus: Optional[List[int]], sharing: int = 1) -> int:
+    """
+    OpenCV threads for a worker: the explicit setting, or with 0 (auto) the
+    CPUs the worker is pinned to divided among the workers sharing them, at
+    least 1. An unpinned worker gets 1 thread, since OpenCV's default (every
+    core) in each of several processes oversubscribes the machine.
+
+    Args:
+        setting: OpenCV thread setting (0 = auto)
+        cpus: CPUs the worker is pinned to, None if unpinned
+        sharing: Workers pinned to the same CPUs (AffinityPlanner.sharing)
+    """
+    if setting > 0:
+        return setting
+    if not cpus:
+        return 1
+    return max(len(cpus) // max(sharing, 1), 1)
+
+
+def _priority_value(priority: str):
+    import psutil
+    if sys.platform == 'win32':
+        return {
+            WORKER_PRIORITY_BELOW_NORMAL: psutil.BELOW_NORMAL_PRIORITY_CLASS,
+            WORKER_PRIORITY_NORMAL: psutil.NORMAL_PRIORITY_CLASS,
+            WORKER_PRIORITY_ABOVE_NORMAL: psutil.ABOVE_NORMAL_PRIORITY_CLASS,
+            WORKER_PRIORITY_HIGH: psutil.HIGH_PRIORITY_CLASS,
+        }[priority]
+    return {
+        WORKER_PRIORITY_BELOW_NORMAL: 5,
+        WORKER_PRIORITY_NORMAL: 0,
+        WORKER_PRIORITY_ABOVE_NORMAL: -5,
+        WORKER_PRIORITY_HIGH: -10,
+    }[priority]
+
+
+def apply_placement(pid: int, cpus: Optional[List[int]], priority: str = WORKER_PRIORITY_NORMAL) -> bool:
+    """
+    Pin a process to CPUs and set its priority (nice value outside Windows).
+
+    Args:
+        pid: Process id
+        cpus: Logical CPUs, None = leave the affinity alone
+        priority: One of the WORKER_PRIORITY_* constants
+
+    Returns:
+        True if everything was applied
+    """
+    try:
+        import psutil
+    except ImportError:
+        logger.warning("psutil not installed, CPU placement not applied")
+        return False
+
+    ok = True
+    try:
+        proc = psutil.Process(pid)
+    except psutil.Error as e:
+        logger.error(f"CPU placement: {e}")
+        return False
+
+    if cpus:
+        try:
+            proc.cpu_affinity(cpus)
+        except (psutil.Error, OSError, ValueError) as e:
+            logger.error(f"Failed to set CPU affinity for PID {pid}: {e}")
+            ok = False
+
+    if priority != WORKER_PRIORITY_NORMAL:
+        try:
+            proc.nice(_priority_value(priority))
+        except (psutil.Error, OSError, KeyError) as e:
+            # Raising priority needs admin/root outside Windows
+            logger.warning(f"Failed to set priority '{priority}' for PID {pid}: {e}")
+            ok = False
+    return ok
@@ -0,0 +1,234 @@
+"""
+Klad Macro Tool - Shared Capture
+Single capture process that publishes frames to a shared memory ring buffer
+"""
+
+import time
+import logging
+import numpy as np
+import mss
+from multiprocessing import shared_memory, Value
+from typing import Dict, List, Any, Optional
+
+from .constants import (
+    FRAME_BUS_SLOTS, FRAME_WAIT_TIMEOUT_SEC, FRAME_WAIT_SPINS, FRAME_WAIT_SLEEP_SEC, IDLE_SLEEP_SEC
+)
+
+logger = logging.getLogger(__name__)
+
+# Header layout (int64 fields at the start of the shared memory block)
+_HDR_SEQ = 0
+_HDR_LEFT = 1
+_HDR_TOP = 2
+_HDR_WIDTH = 3
+_HDR_HEIGHT = 4
+_HDR_SLOTS = 5
+_HDR_SLOT_SEQ = 8  # slot sequence numbers start here
+_HDR_BYTES = 64 * 8  # room for up to 56 slots
+
+
+def get_union_region(groups: List[Dict[str, Any]]) -> Optional[List[int]]:
+    """
+    Compute the bounding box that covers every group's search region.
+
+    Args:
+        groups: List of group configurations (flat, no folders)
+
+    Returns:
+        [x1, y1, x2, y2] union region, or None if there are no groups
+    """
+    regions = [g.get('search_region', [0, 0, 100, 100]) for g in groups]
+    if not regions:
+        return None
+    return [
+        min(r[0] for r in regions),
+        min(r[1] for r in regions),
+        max(r[2] for r in regions),
+        max(r[3] for r in regions),
+    ]
+
+
+class FrameBus:
+    """
+    Shared memory ring buffer holding the latest BGRA frames of the union region.
+
+    One writer (the capture server) publishes frames, any number of readers
+    (group workers) take zero-copy views of their own sub-rectangle. Every slot
+    carries its own sequence number so a reader can detect that the slot was
+    overwritten while it was being read.
+
+    With a frame_ready condition (multiprocessing.Condition shared by the
+    writer and the readers) readers sleep until the writer publishes;
+    without one they poll with a short sleep.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool, frame_ready=None):
+        self.shm = shm
+        self.owner = owner
+        self.ready = frame_ready
+        self.header = np.ndarray((_HDR_BYTES // 8,), dtype=np.int64, buffer=shm.buf)
+        self.left = int(self.header[_HDR_LEFT])
+        self.top = int(self.header[_HDR_TOP])
+        self.width = int(self.header[_HDR_WIDTH])
+        self.height = int(self.header[_HDR_HEIGHT])
+        self.slots = int(self.header[_HDR_SLOTS])
+        self.frames = np.ndarray(
+            (self.slots, self.height, self.width, 4),
+            dtype=np.uint8,
+            buffer=shm.buf,
+            offset=_HDR_BYTES
+        )
+
+    @classmethod
+    def create(cls, region: List[int], slots: int = FRAME_BUS_SLOTS) -> 'FrameBus':
+        """Allocate a new bus for the given [x1, y1, x2, y2] region"""
+        width = region[2] - region[0]
+        height = region[3] - region[1]
+        size = _HDR_BYTES + slots * width * height * 4
+        shm = shared_memory.SharedMemory(create=True, size=size)
+
+        header = np.ndarray((_HDR_BYTES // 8,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_HDR_LEFT] = region[0]
+        header[_HDR_TOP] = region[1]
+        header[_HDR_WIDTH] = width
+        header[_HDR_HEIGHT] = height
+        header[_HDR_SLOTS] = slots
+        header[_HDR_SLOT_SEQ:_HDR_SLOT_SEQ + slots] = -1
+        del header
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, frame_ready=None) -> 'FrameBus':
+        """Attach to an existing bus by shared memory name"""
+        return cls(shared_memory.SharedMemory(name=name), owner=False, frame_ready=frame_ready)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def latest_seq(self) -> int:
+        """Sequence number of the most recently published frame (0 = none yet)"""
+        return int(self.header[_HDR_SEQ])
+
+    def publish(self, bgra: np.ndarray) -> int:
+        """
+        Copy a BGRA frame into the next slot and make it visible to readers.
+
+        Args:
+            bgra: Frame with shape (height, width, 4)
+
+        Returns:
+            Sequence number of the published frame
+        """
+        seq = int(self.header[_HDR_SEQ]) + 1
+        slot = seq % self.slots
+        self.header[_HDR_SLOT_SEQ + slot] = -1  # writing
+        self.frames[slot][...] = bgra
+        self.header[_HDR_SLOT_SEQ + slot] = seq
+        self.header[_HDR_SEQ] = seq
+        if self.ready is not None:
+            with self.ready:
+                self.ready.notify_all()
+        return seq
+
+    def wait_for_frame(self, last_seq: int, timeout: float = FRAME_WAIT_TIMEOUT_SEC) -> int:
+        """
+        Wait until a frame newer than last_seq is published.
+
+        Returns:
+            New sequence number, or last_seq if the timeout expired
+        """
+        if self.ready is not None:
+            with self.ready:
+                self.ready.wait_for(lambda: self.latest_seq() != last_seq, timeout)
+            return self.latest_seq()
+
+        # No condition: a few yields for a frame that is just being published,
+        # then real sleeps so a waiting reader does not burn a core
+        deadline = time.perf_counter() + timeout
+        spins = 0
+        seq = self.latest_seq()
+        while seq == last_seq:
+            if time.perf_counter() >= deadline:
+                return last_seq
+            if spins < FRAME_WAIT_SPINS:
+                spins += 1
+                time.sleep(0)
+            else:
+                time.sleep(FRAME_WAIT_SLEEP_SEC)
+            seq = self.latest_seq()
+        return seq
+
+    def view(self, seq: int, region: List[int]) -> np.ndarray:
+        """
+        Zero-copy BGRA view of a sub-rectangle of the frame with the given sequence.
+
+        Args:
+            seq: Sequence number returned by latest_seq / wait_for_frame
+            region: [x1, y1, x2, y2] in screen coordinates (must lie inside the bus region)
+        """
+        frame = self.frames[seq % self.slots]
+        return frame[region[1] - self.top:region[3] - self.top,
+                     region[0] - self.left:region[2] - self.left]
+
+    def is_valid(self, seq: int) -> bool:
+        """True if the slot of seq has not been overwritten since it was published"""
+        return int(self.header[_HDR_SLOT_SEQ + seq % self.slots]) == seq
+
+    def close(self) -> None:
+        """Release the mapping (and free the block if this process created it)"""
+        # numpy views keep the buffer exported, drop them first
+        self.header = None
+        self.frames = None
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except Exception as e:
+            logger.error(f"Frame bus close error: {e}")
+
+
+def capture_server(
+    bus_name: str,
+    running_flag: Value,
+    active_count: Value,
+    frame_ready=None
+) -> None:
+    """
+    Capture process: grabs the union region once per tick and publishes it.
+
+    Captures only while at least one group is running (active_count > 0).
+
+    Args:
+        bus_name: Shared memory name of the FrameBus
+        running_flag: Shared flag to signal process termination
+        active_count: Number of groups currently running
+        frame_ready: Condition notified after every published frame
+    """
+    bus = FrameBus.attach(bus_name, frame_ready)
+    monitor = {
+        "left": bus.left,
+        "top": bus.top,
+        "width": bus.width,
+        "height": bus.height
+    }
+    shape = (bus.height, bus.width, 4)
+
+    logger.info(f"Capture server started: {bus.width}x{bus.height} @ {bus.left},{bus.top}")
+
+    with mss.mss() as sct:
+        while running_flag.value:
+            if active_count.value <= 0:
+                time.sleep(IDLE_SLEEP_SEC)
+                continue
+            try:
+                sct_img = sct.grab(monitor)
+                bus.publish(np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(shape))
+            except Exception as e:
+                logger.error(f"Capture server error: {e}")
+                time.sleep(IDLE_SLEEP_SEC)
+
+    bus.close()
+    logger.info("Capture server stopped")
@@ -14,7 +14,14 @@ from .constants import (
     DEFAULT_SEARCH_REGION,
     DEFAULT_SPAM_INTERVAL,
     DEFAULT_CYCLE_DELAY,
-    DEFAULT_TRIGGER_CONDITION
+    DEFAULT_TRIGGER_CONDITION,
+    DEFAULT_BATCHED_MATCHING,
+    DEFAULT_PYRAMID_MATCHING,
+    DEFAULT_PREFILTER,
+    DEFAULT_CHANGE_GATE,
+    DEFAULT_SCORE_TELEMETRY,
+    DEFAULT_TARGET_FPS,
+    DEFAULT_ACTION_POLICY
 )
 
 logger = logging.getLogger(__name__)
@@ -39,6 +46,13 @@ def get_default_group() -> Dict[str, Any]:
         "spam_key_interval": DEFAULT_SPAM_INTERVAL,
         "search_region": DEFAULT_SEARCH_REGION.copy(),
         "cycle_delay": DEFAULT_CYCLE_DELAY,
+        "batched_matching": DEFAULT_BATCHED_MATCHING,
+        "pyramid_matching": DEFAULT_PYRAMID_MATCHING,
+        "prefilter": DEFAULT_PREFILTER,
+        "change_gate": DEFAULT_CHANGE_GATE,
+        "score_telemetry": DEFAULT_SCORE_TELEMETRY,
+        "target_fps": DEFAULT_TARGET_FPS,
+        "action_policy": DEFAULT_ACTION_POLICY,
         "notes": "",
         "templates": []
     }
@@ -24,9 +24,107 @@ GITHUB_REPO = "kladenets-codes/Klad-Macro-Tool"
 # Timing constants (milliseconds)
 STATUS_CHECK_INTERVAL_MS = 50
 TEST_CYCLE_INTERVAL_MS = 100
+DEFAULT_TEST_FPS = 10  # Test modu hızı, 0 = bot hızı (grubun hedef FPS'i)
 FPS_REPORT_INTERVAL_SEC = 0.5
 FPS_RESET_INTERVAL_SEC = 5.0
 IDLE_SLEEP_SEC = 0.01
+CONTROL_WAIT_TIMEOUT_SEC = 0.5  # Boştaki worker'ın kapanma kontrol aralığı
+STATUS_NAME_BYTES = 64  # Durum tablosunda son eşleşen template adı (UTF-8)
+STATUS_SNAPSHOT_RETRIES = 500  # Yazma sırasında ölen worker'da arayüz donmasın
+
+# Shared capture (frame bus)
+FRAME_BUS_SLOTS = 3
+FRAME_WAIT_TIMEOUT_SEC = 0.1
+FRAME_WAIT_SPINS = 20             # koşul değişkeni yoksa: önce bu kadar kısa bekleme
+FRAME_WAIT_SLEEP_SEC = 0.0005     # sonra gerçek uyku (çekirdek yakmaz)
+
+# Frame sources (group 'frame_source' -> 'type')
+FRAME_SOURCE_MSS = "mss"              # Canlı ekran yakalama
+FRAME_SOURCE_SHARED = "shared"        # Ortak capture server (shared memory)
+FRAME_SOURCE_REPLAY = "replay"        # Kayıtlı PNG klasörü veya video
+FRAME_SOURCE_SYNTHETIC = "synthetic"  # Seed'li sentetik kareler
+REPLAY_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Batched matching (cached template spectra, one frame DFT per frame)
+DEFAULT_BATCHED_MATCHING = True
+BATCHED_MIN_TEMPLATES = 2
+BATCHED_MAX_SPECTRA_BYTES = 64 * 1024 * 1024  # üstü klasik matchTemplate ile
+
+# Per-template search window (template 'roi_mode' / 'roi')
+ROI_MODE_FULL = "full"    # Grubun tüm arama bölgesi
+ROI_MODE_AUTO = "auto"    # Son eşleşme konumundan öğrenilen pencere
+ROI_MODE_FIXED = "fixed"  # Kullanıcının seçtiği sabit pencere
+DEFAULT_ROI_MODE = ROI_MODE_FULL
+ROI_PADDING_PX = 8                # öğrenilen pencerenin şablon etrafındaki payı
+ROI_FULL_SCAN_INTERVAL = 60       # otomatik modda her N karede bir tam tarama
+
+# Template masks (PNG alpha: saydam pikseller eşleştirmede yok sayılır)
+MASK_ALPHA_THRESHOLD = 128        # bu alfa değerinin altındaki pikseller maskelenir
+
+# Color check (template 'color_mode' / 'color_tolerance'): gri eşleşmeden sonra
+# eşleşme konumundaki ortalama renk şablonunkiyle karşılaştırılır
+COLOR_MODE_OFF = "off"
+COLOR_MODE_RGB = "rgb"            # kanal başına ortalama fark (kararmayı da yakalar)
+COLOR_MODE_HSV = "hsv"            # ton + doygunluk, parlaklıktan bağımsız
+DEFAULT_COLOR_MODE = COLOR_MODE_OFF
+DEFAULT_COLOR_TOLERANCE = 25      # en büyük fark (0-255 ölçeğinde)
+COLOR_MIN_SATURATION = 40         # bunun altında ton anlamsız, sadece doygunluk karşılaştırılır
+
+# Pyramid matching (coarse-to-fine, for large regions)
+DEFAULT_PYRAMID_MATCHING = False
+PYRAMID_LEVELS = 2                # en fazla 2 kez pyrDown -> 1/4 çözünürlük
+PYRAMID_MIN_TEMPLATE_PX = 8       # kaba seviyede şablonun en kısa kenarı
+PYRAMID_CANDIDATES = 3            # tam çözünürlükte doğrulanan aday sayısı
+
+# Prefilter (cheap histogram check before the correlation)
+DEFAULT_PREFILTER = False
+PREFILTER_HIST_BINS = 32
+PREFILTER_MIN_COVERAGE = 0.6      # şablon piksellerinin en az bu kadarı bölgede bulunmalı
+
+# Change gate (reuse the previous result while the region is unchanged)
+DEFAULT_CHANGE_GATE = False
+CHANGE_GATE_SCALE = 4             # fark, 1/4 küçültülmüş kare üzerinde ölçülür
+CHANGE_GATE_THRESHOLD = 3         # en büyük gri seviye farkı (0-255)
+CHANGE_GATE_MAX_SKIP = 30         # en fazla bu kadar kare üst üste atlanır
+
+# Score telemetry (group 'score_telemetry', eşik ayarı için skor dağılımları)
+DEFAULT_SCORE_TELEMETRY = False
+SCORE_TELEMETRY_SAMPLE_EVERY = 5  # her N karede bir örnek
+SCORE_TELEMETRY_CAPACITY = 8192   # halka tampon satırı, dolunca en eskiler ezilir
+
+# Frame pacing (group 'target_fps', 0 = sınırsız)
+DEFAULT_TARGET_FPS = 0
+TARGET_FPS_OPTIONS = (0, 30, 60, 90, 120, 144, 240)
+TIMER_SPIN_THRESHOLD_SEC = 0.001  # beklemenin son kısmı perf_counter ile döngüde
+
+# Action executor (group 'action_policy')
+ACTION_POLICY_DROP = "drop"          # Meşgulse yeni aksiyonu at
+ACTION_POLICY_COALESCE = "coalesce"  # Aynı template zaten bekliyorsa birleştir
+ACTION_POLICY_QUEUE = "queue"        # Sıraya al (sınırlı kuyruk)
+DEFAULT_ACTION_POLICY = ACTION_POLICY_DROP
+ACTION_QUEUE_SIZE = 8
+
+# Worker processes (global 'worker_processes')
+WORKER_PROCESSES_PER_GROUP = 0    # Her gruba ayrı process
+WORKER_PROCESSES_AUTO = -1        # Çekirdek sayısı kadar process, gruplar paylaştırılır
+DEFAULT_WORKER_PROCESSES = WORKER_PROCESSES_PER_GROUP
+
+# Worker CPU placement (global 'reserved_cores', 'spread_workers', 'worker_priority', 'cv_threads')
+WORKER_PRIORITY_BELOW_NORMAL = "below_normal"
+WORKER_PRIORITY_NORMAL = "normal"
+WORKER_PRIORITY_ABOVE_NORMAL = "above_normal"
+WORKER_PRIORITY_HIGH = "high"
+DEFAULT_WORKER_PRIORITY = WORKER_PRIORITY_NORMAL
+DEFAULT_RESERVED_CORES = 0        # oyuna bırakılan fiziksel çekirdek (ilk çekirdekler)
+DEFAULT_SPREAD_WORKERS = False    # her worker ayrı fiziksel çekirdekte
+DEFAULT_CV_THREADS = 0            # 0 = worker'ın CPU'ları, o CPU'ları paylaşan worker'lara bölünür (en az 1; sabitlenmemişse 1)
+
+# Latency histogram (capture -> key, HDR tarzı log-lineer kovalar)
+LATENCY_SUB_BUCKETS = 64          # 64 µs'ye kadar 1 µs çözünürlük, sonra ~%3 hata
+LATENCY_MAX_MS = 10000            # üstündeki değerler son kovaya yazılır
+
+# Template cache (decoded images as memory-mapped .npy, keyed by content hash)
+TEMPLATE_CACHE_VERSION = 3        # ön işleme değişince artır, eski girişler kullanılmaz
 
 # UI constants
 MIN_REGION_SIZE = 10
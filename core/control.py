@@ -0,0 +1,126 @@
+"""
+Klad Macro Tool - Worker Control
+Shared-memory control block for toggling workers without polling a queue
+"""
+
+import logging
+import queue
+import time
+import multiprocessing
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerControl:
+    """
+    Toggle state and command signalling for one worker process.
+
+    The main process writes, the worker reads. Whether the group should scan
+    is a single shared byte, so a running worker checks it with one memory
+    read per frame. An idle worker blocks on an Event instead of sleeping in
+    a loop and wakes up as soon as the toggle key is pressed. Rare commands
+    that carry data still go through a Queue; a shared counter tells the
+    worker when there is something to read, so the queue is never polled.
+
+    Toggle timestamps use time.perf_counter, which is system-wide
+    (QueryPerformanceCounter / CLOCK_MONOTONIC), so the worker can measure
+    toggle-to-first-frame latency against the main process's stamp.
+
+    Create it in the main process and pass it to the worker as a Process
+    argument.
+
+    Args:
+        wake: Event shared by all controls of one worker process, so a process
+            hosting several groups can block on a single Event (optional)
+    """
+
+    def __init__(self, wake: Optional[Any] = None):
+        self._active = multiprocessing.RawValue('b', 0)
+        self._toggle_time = multiprocessing.RawValue('d', 0.0)
+        self._commands = multiprocessing.RawValue('L', 0)
+        self._queue = multiprocessing.Queue()
+        self._wake = wake if wake is not None else multiprocessing.Event()
+        self._lock = multiprocessing.Lock()  # writers only, reads are lock-free
+        self._seen_commands = 0
+
+    # ---- main process side ----
+
+    def set_active(self, active: bool) -> None:
+        """Start or stop scanning"""
+        with self._lock:
+            if active and not self._active.value:
+                self._toggle_time.value = time.perf_counter()
+            self._active.value = int(active)
+        self._wake.set()
+
+    def toggle(self) -> bool:
+        """
+        Flip the scanning state (toggle key).
+
+        Returns:
+            New state
+        """
+        with self._lock:
+            active = not self._active.value
+            if active:
+                self._toggle_time.value = time.perf_counter()
+            self._active.value = int(active)
+        self._wake.set()
+        return active
+
+    def send(self, command: Dict[str, Any]) -> None:
+        """Send a command dict to the worker (read with poll_commands)"""
+        self._queue.put(command)
+        with self._lock:
+            self._commands.value += 1
+        self._wake.set()
+
+    def wake(self) -> None:
+        """Wake an idle worker (e.g. after clearing its running flag)"""
+        self._wake.set()
+
+    # ---- worker side ----
+
+    @property
+    def active(self) -> bool:
+        return bool(self._active.value)
+
+    @property
+    def toggle_time(self) -> float:
+        """perf_counter stamp of the last start"""
+        return self._toggle_time.value
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the main process changes something.
+
+        Returns:
+            True if woken, False on timeout
+        """
+        if self._wake.wait(timeout):
+            self._wake.clear()
+            return True
+        return False
+
+    def poll_commands(self) -> List[Dict[str, Any]]:
+        """
+        Commands sent since the last call ([] after a single memory read if none).
+
+        Only commands actually received are counted as seen; one that has not
+        arrived yet is read on a later call instead of being dropped.
+        """
+        generation = self._commands.value
+        if generation == self._seen_commands:
+            return []
+        commands = []
+        for _ in range(generation - self._seen_commands):
+            try:
+                # The counter is bumped after put, so the item is on its way
+                commands.append(self._queue.get(timeout=1.0))
+            except queue.Empty:
+                logger.warning(f"{generation - self._seen_commands - len(commands)} command(s) "
+                               f"not received yet, retrying on the next poll")
+                break
+        self._seen_commands += len(commands)
+        return commands
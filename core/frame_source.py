@@ -0,0 +1,310 @@
+"""
+Klad Macro Tool - Frame Sources
+Pluggable frame providers for the matching engine (live, shared, replay, synthetic)
+"""
+
+import abc
+import logging
+import cv2
+import numpy as np
+import mss
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .capture import FrameBus
+from .constants import (
+    FRAME_SOURCE_MSS,
+    FRAME_SOURCE_SHARED,
+    FRAME_SOURCE_REPLAY,
+    FRAME_SOURCE_SYNTHETIC,
+    REPLAY_IMAGE_EXTENSIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSource(abc.ABC):
+    """
+    Base class for frame providers.
+
+    grab() returns a BGRA uint8 frame of shape (height, width, 4) covering the
+    group's search region, or None when no new frame is available.
+
+    live is True only for sources that show the actual screen; the bot never
+    presses keys in response to recorded or generated frames.
+    """
+
+    live = False
+
+    def __init__(self, region: List[int]):
+        self.region = list(region)
+        self.width = region[2] - region[0]
+        self.height = region[3] - region[1]
+
+    def open(self) -> None:
+        """Acquire resources (called once in the process that grabs)"""
+
+    @abc.abstractmethod
+    def grab(self) -> Optional[np.ndarray]:
+        """Next frame, or None if none is available"""
+
+    def frame_valid(self) -> bool:
+        """False if the last grabbed frame was overwritten while in use"""
+        return True
+
+    def set_active(self, active: bool) -> None:
+        """Notify the source that the consumer started/stopped searching"""
+
+    @property
+    def exhausted(self) -> bool:
+        """True when a finite source has no more frames"""
+        return False
+
+    def close(self) -> None:
+        """Release resources"""
+
+    def __enter__(self) -> 'FrameSource':
+        self.open()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class MssFrameSource(FrameSource):
+    """Live screen capture with mss"""
+
+    live = True
+
+    def __init__(self, region: List[int]):
+        super().__init__(region)
+        self.monitor = {
+            "left": region[0],
+            "top": region[1],
+            "width": self.width,
+            "height": self.height
+        }
+        self.shape = (self.height, self.width, 4)
+        self.sct = None
+
+    def open(self) -> None:
+        self.sct = mss.mss()
+
+    def grab(self) -> Optional[np.ndarray]:
+        # Zero-copy BGRA view of mss's raw buffer (np.array would copy it)
+        return np.frombuffer(self.sct.grab(self.monitor).raw, dtype=np.uint8).reshape(self.shape)
+
+    def close(self) -> None:
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
+
+
+class SharedMemoryFrameSource(FrameSource):
+    """Zero-copy views of the shared capture server's frame bus"""
+
+    live = True
+
+    def __init__(self, region: List[int], frame_bus: Dict[str, Any]):
+        super().__init__(region)
+        self.frame_bus = frame_bus
+        self.bus = None
+        self.seq = 0
+
+    def open(self) -> None:
+        self.bus = FrameBus.attach(self.frame_bus['name'], self.frame_bus.get('ready'))
+        x1, y1, x2, y2 = self.region
+        bus = self.bus
+        if x1 < bus.left or y1 < bus.top or x2 > bus.left + bus.width or y2 > bus.top + bus.height:
+            self.close()
+            raise ValueError(f"Region {self.region} is outside the shared capture area")
+
+    def grab(self) -> Optional[np.ndarray]:
+        seq = self.bus.wait_for_frame(self.seq)
+        if seq == self.seq:
+            return None  # no new frame yet
+        self.seq = seq
+        return self.bus.view(seq, self.region)
+
+    def frame_valid(self) -> bool:
+        return self.bus.is_valid(self.seq)
+
+    def set_active(self, active: bool) -> None:
+        with self.frame_bus['active'].get_lock():
+            self.frame_bus['active'].value += 1 if active else -1
+
+    def close(self) -> None:
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+
+class ReplayFrameSource(FrameSource):
+    """
+    Deterministic playback of recorded frames (PNG/JPG folder or video file).
+
+    Frames are decoded once at open() and served as fast as they are requested.
+    Frames larger than the search region are treated as full screenshots and
+    cropped at the region's screen coordinates.
+    """
+
+    def __init__(self, region: List[int], path: str, loop: bool = True):
+        super().__init__(region)
+        self.path = Path(path)
+        self.loop = loop
+        self.frames: List[np.ndarray] = []
+        self.names: List[str] = []  # file name (or video frame number) of each frame
+        self.index = 0
+
+    def open(self) -> None:
+        if self.path.is_dir():
+            files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in REPLAY_IMAGE_EXTENSIONS)
+            for file in files:
+                # UTF-8 path desteği için numpy ile oku
+                img = cv2.imdecode(np.fromfile(str(file), dtype=np.uint8), cv2.IMREAD_COLOR)
+                if img is not None:
+                    self.frames.append(self._prepare(img))
+                    self.names.append(file.name)
+        else:
+            cap = cv2.VideoCapture(str(self.path))
+            while True:
+                ok, img = cap.read()
+                if not ok:
+                    break
+                self.names.append(str(len(self.frames)))
+                self.frames.append(self._prepare(img))
+            cap.release()
+
+        if not self.frames:
+            logger.warning(f"Replay source has no frames: {self.path}")
+        else:
+            logger.info(f"Replay source loaded {len(self.frames)} frames from {self.path}")
+
+    def _prepare(self, img: np.ndarray) -> np.ndarray:
+        """Crop full screenshots to the region and convert to contiguous BGRA"""
+        h, w = img.shape[:2]
+        x1, y1, x2, y2 = self.region
+        if (h, w) != (self.height, self.width) and w >= x2 and h >= y2 and x1 >= 0 and y1 >= 0:
+            img = img[y1:y2, x1:x2]
+        return cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+
+    def grab(self) -> Optional[np.ndarray]:
+        if not self.frames:
+            return None
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return None
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.frames or (not self.loop and self.index >= len(self.frames))
+
+    @property
+    def current_name(self) -> Optional[str]:
+        """Name of the frame the last grab() returned"""
+        return self.names[self.index - 1] if 0 < self.index <= len(self.names) else None
+
+    def close(self) -> None:
+        self.frames = []
+        self.names = []
+
+
+class SyntheticFrameSource(FrameSource):
+    """
+    Seeded generator of noise frames, optionally with images pasted at random spots.
+
+    Useful to drive the matcher without any display or recording. The same seed
+    always produces the same frame sequence.
+    """
+
+    def __init__(
+        self,
+        region: List[int],
+        seed: int = 0,
+        paste_images: Optional[List[np.ndarray]] = None,
+        hit_rate: float = 0.5,
+        pool_size: int = 32
+    ):
+        super().__init__(region)
+        self.seed = seed
+        self.paste_images = paste_images or []
+        self.hit_rate = hit_rate
+        self.pool_size = pool_size
+        self.frames: List[np.ndarray] = []
+        self.index = 0
+
+    def open(self) -> None:
+        # Pre-generate a pool so grab() costs nothing
+        rng = np.random.default_rng(self.seed)
+        for _ in range(self.pool_size):
+            frame = rng.integers(0, 256, (self.height, self.width, 4), dtype=np.uint8)
+            frame[:, :, 3] = 255
+            if self.paste_images and rng.random() < self.hit_rate:
+                img = self.paste_images[rng.integers(len(self.paste_images))]
+                h, w = img.shape[:2]
+                if h <= self.height and w <= self.width:
+                    y = int(rng.integers(self.height - h + 1))
+                    x = int(rng.integers(self.width - w + 1))
+                    if img.ndim == 2:
+                        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGRA)
+                    elif img.shape[2] == 3:
+                        img = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+                    frame[y:y + h, x:x + w] = img
+            self.frames.append(frame)
+
+    def grab(self) -> Optional[np.ndarray]:
+        frame = self.frames[self.index]
+        self.index = (self.index + 1) % len(self.frames)
+        return frame
+
+    def close(self) -> None:
+        self.frames = []
+
+
+def create_frame_source(
+    group_data: Dict[str, Any],
+    frame_bus: Optional[Dict[str, Any]] = None,
+    images_folder: Optional[Path] = None
+) -> FrameSource:
+    """
+    Create the frame source selected by a group's 'frame_source' setting.
+
+    Args:
+        group_data: Group configuration dictionary
+        frame_bus: Shared capture info {'name', 'active'} if the capture server runs
+        images_folder: Base folder for synthetic 'paste_files' (template images)
+
+    Returns:
+        Unopened FrameSource (use as a context manager or call open())
+    """
+    region = group_data.get('search_region', [0, 0, 100, 100])
+    settings = group_data.get('frame_source') or {}
+    source_type = settings.get('type', FRAME_SOURCE_MSS)
+
+    if source_type == FRAME_SOURCE_REPLAY and settings.get('path'):
+        return ReplayFrameSource(region, settings['path'], loop=settings.get('loop', True))
+
+    if source_type == FRAME_SOURCE_SYNTHETIC:
+        paste_images = []
+        for file in settings.get('paste_files', []):
+            path = (images_folder / file) if images_folder else Path(file)
+            if path.exists():
+                img = cv2.imdecode(np.fromfile(str(path), dtype=np.uint8), cv2.IMREAD_COLOR)
+                if img is not None:
+                    paste_images.append(img)
+        return SyntheticFrameSource(
+            region,
+            seed=settings.get('seed', 0),
+            paste_images=paste_images,
+            hit_rate=settings.get('hit_rate', 0.5)
+        )
+
+    # Live capture: use the shared bus when the capture server is running
+    if frame_bus and source_type in (FRAME_SOURCE_MSS, FRAME_SOURCE_SHARED):
+        return SharedMemoryFrameSource(region, frame_bus)
+
+    return MssFrameSource(region)
@@ -5,65 +5,98 @@ Functions for key press simulation and macro execution
 
 import keyboard
 import time
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .constants import DEFAULT_TIMING
+from .keyboard_utils import resolve_key
+from .timing import precise_sleep, DelayStats
 
+# Compiled macro opcodes
+OP_KEY_DOWN = 0
+OP_KEY_UP = 1
+OP_KEY_PRESS = 2
+OP_SLEEP = 3
 
-def press_key_with_timing(key: str, timing: Optional[Dict[str, int]] = None) -> None:
-    """
-    Press a key with pre-delay, hold time, and post-delay.
+_MACRO_OPCODES = {
+    'key_down': OP_KEY_DOWN,
+    'key_up': OP_KEY_UP,
+    'key_press': OP_KEY_PRESS,
+    'sleep': OP_SLEEP,
+}
 
-    Args:
-        key: The key to press
-        timing: Dict with pre_delay, hold_time, post_delay in milliseconds
-    """
-    if timing is None:
-        timing = DEFAULT_TIMING
+# (opcode, key, seconds) - key is None for sleep, seconds is 0 for key steps
+CompiledMacro = Tuple[Tuple[int, Any, float], ...]
 
-    pre_delay = timing.get("pre_delay", 1) / 1000.0
-    hold_time = timing.get("hold_time", 1) / 1000.0
-    post_delay = timing.get("post_delay", 1) / 1000.0
+# (modifiers, regular keys, pre_delay, hold_time, post_delay) - keys are scan codes
+CompiledCombo = Tuple[Tuple[Any, ...], Tuple[Any, ...], float, float, float]
 
-    if pre_delay > 0:
-        time.sleep(pre_delay)
 
-    keyboard.press(key)
-    if hold_time > 0:
-        time.sleep(hold_time)
-    keyboard.release(key)
+def _wait(seconds: float, stats: Optional[DelayStats] = None) -> None:
+    """Precise wait for key timings, recorded in stats if given"""
+    start = time.perf_counter()
+    precise_sleep(seconds)
+    if stats is not None:
+        stats.add(seconds, time.perf_counter() - start)
 
-    if post_delay > 0:
-        time.sleep(post_delay)
 
+def _timing_seconds(timing: Optional[Dict[str, int]]) -> Tuple[float, float, float]:
+    """(pre_delay, hold_time, post_delay) in seconds from a timing dict in milliseconds"""
+    if timing is None:
+        timing = DEFAULT_TIMING
+    return (
+        timing.get("pre_delay", 1) / 1000.0,
+        timing.get("hold_time", 1) / 1000.0,
+        timing.get("post_delay", 1) / 1000.0,
+    )
 
-def press_key_combo(key_combo: str, timing: Optional[Dict[str, int]] = None) -> None:
+
+def compile_key(key: str, timing: Optional[Dict[str, int]] = None) -> CompiledCombo:
     """
-    Press a key combination (e.g., "shift+ctrl+a") with timing.
+    Resolve a single key and its timing once, for press_compiled_combo.
 
     Args:
-        key_combo: Key combination string separated by '+'
+        key: The key to press
         timing: Dict with pre_delay, hold_time, post_delay in milliseconds
     """
-    if timing is None:
-        timing = DEFAULT_TIMING
+    return ((), (resolve_key(key),)) + _timing_seconds(timing)
+
 
-    pre_delay = timing.get("pre_delay", 1) / 1000.0
-    hold_time = timing.get("hold_time", 1) / 1000.0
-    post_delay = timing.get("post_delay", 1) / 1000.0
+def compile_key_combo(key_combo: str, timing: Optional[Dict[str, int]] = None) -> CompiledCombo:
+    """
+    Split a key combination and resolve its keys to scan codes once.
+
+    Args:
+        key_combo: Key combination string separated by '+'
+        timing: Dict with pre_delay, hold_time, post_delay in milliseconds
 
+    Returns:
+        (modifiers, regular keys, pre_delay, hold_time, post_delay) for press_compiled_combo
+    """
     keys = [k.strip().lower() for k in key_combo.split('+')]
     modifiers = []
     regular_keys = []
 
     for key in keys:
         if key in ['shift', 'alt', 'ctrl', 'control']:
-            modifiers.append(key)
+            modifiers.append(resolve_key(key))
         else:
-            regular_keys.append(key)
+            regular_keys.append(resolve_key(key))
+
+    return (tuple(modifiers), tuple(regular_keys)) + _timing_seconds(timing)
+
+
+def press_compiled_combo(combo: CompiledCombo, stats: Optional[DelayStats] = None) -> None:
+    """
+    Press a combination prepared by compile_key_combo or compile_key.
+
+    Args:
+        combo: (modifiers, regular keys, pre_delay, hold_time, post_delay)
+        stats: Records requested vs actual delays (one per group)
+    """
+    modifiers, regular_keys, pre_delay, hold_time, post_delay = combo
 
     if pre_delay > 0:
-        time.sleep(pre_delay)
+        _wait(pre_delay, stats)
 
     # Press modifiers first
     for mod in modifiers:
@@ -73,7 +106,7 @@ def press_key_combo(key_combo: str, timing: Optional[Dict[str, int]] = None) ->
     for key in regular_keys:
         keyboard.press(key)
         if hold_time > 0:
-            time.sleep(hold_time)
+            _wait(hold_time, stats)
         keyboard.release(key)
 
     # Release modifiers in reverse order
@@ -81,7 +114,104 @@ def press_key_combo(key_combo: str, timing: Optional[Dict[str, int]] = None) ->
         keyboard.release(mod)
 
     if post_delay > 0:
-        time.sleep(post_delay)
+        _wait(post_delay, stats)
+
+
+def press_key_with_timing(key: str, timing: Optional[Dict[str, int]] = None) -> None:
+    """
+    Press a key with pre-delay, hold time, and post-delay.
+
+    Args:
+        key: The key to press
+        timing: Dict with pre_delay, hold_time, post_delay in milliseconds
+    """
+    press_compiled_combo(compile_key(key, timing))
+
+
+def press_key_combo(key_combo: str, timing: Optional[Dict[str, int]] = None) -> None:
+    """
+    Press a key combination (e.g., "shift+ctrl+a") with timing.
+
+    Resolves the keys on every call; workers compile once at load and use
+    press_compiled_combo.
+
+    Args:
+        key_combo: Key combination string separated by '+'
+        timing: Dict with pre_delay, hold_time, post_delay in milliseconds
+    """
+    press_compiled_combo(compile_key_combo(key_combo, timing))
+
+
+def compile_macro(macro_list: List[Dict]) -> Tuple[CompiledMacro, List[str]]:
+    """
+    Compile a macro (list of action dicts) into a tuple of (opcode, key, seconds).
+
+    Invalid steps (unknown action, missing key, bad sleep value) are left out
+    and reported, so problems show up when the group loads instead of when
+    the template fires. Consecutive sleeps are merged and key names are
+    resolved to scan codes.
+
+    Args:
+        macro_list: List of action dictionaries
+
+    Returns:
+        (compiled macro, list of error messages)
+    """
+    compiled = []
+    errors = []
+
+    for i, action in enumerate(macro_list, 1):
+        action_type = action.get('action', '') if isinstance(action, dict) else ''
+        opcode = _MACRO_OPCODES.get(action_type)
+        if opcode is None:
+            errors.append(f"Step {i}: unknown action '{action_type}'")
+            continue
+
+        if opcode == OP_SLEEP:
+            try:
+                seconds = float(action.get('ms', 0)) / 1000.0
+            except (TypeError, ValueError):
+                errors.append(f"Step {i}: invalid sleep value {action.get('ms')!r}")
+                continue
+            if seconds <= 0:
+                continue
+            if compiled and compiled[-1][0] == OP_SLEEP:
+                compiled[-1] = (OP_SLEEP, None, compiled[-1][2] + seconds)
+            else:
+                compiled.append((OP_SLEEP, None, seconds))
+        else:
+            key = action.get('key', '')
+            if not key:
+                errors.append(f"Step {i}: {action_type} without a key")
+                continue
+            compiled.append((opcode, resolve_key(key), 0.0))
+
+    return tuple(compiled), errors
+
+
+def macro_duration(compiled: CompiledMacro) -> float:
+    """Total sleep time of a compiled macro in seconds"""
+    return sum(seconds for opcode, _, seconds in compiled if opcode == OP_SLEEP)
+
+
+def run_macro(compiled: CompiledMacro, stats: Optional[DelayStats] = None) -> None:
+    """
+    Execute a compiled macro (see compile_macro).
+
+    Args:
+        compiled: Tuple of (opcode, key, seconds)
+        stats: Records requested vs actual sleeps (one per group)
+    """
+    for opcode, key, seconds in compiled:
+        if opcode == OP_SLEEP:
+            _wait(seconds, stats)
+        elif opcode == OP_KEY_DOWN:
+            keyboard.press(key)
+        elif opcode == OP_KEY_UP:
+            keyboard.release(key)
+        else:
+            keyboard.press(key)
+            keyboard.release(key)
 
 
 def execute_macro(macro_list: List[Dict]) -> None:
@@ -94,29 +224,9 @@ def execute_macro(macro_list: List[Dict]) -> None:
         - key_press: Single key press and release
         - sleep: Delay in milliseconds
 
+    Compiles on every call; workers compile once at load and use run_macro.
+
     Args:
         macro_list: List of action dictionaries
     """
-    for action in macro_list:
-        action_type = action.get('action', '')
-
-        if action_type == 'key_down':
-            key = action.get('key', '')
-            if key:
-                keyboard.press(key)
-
-        elif action_type == 'key_up':
-            key = action.get('key', '')
-            if key:
-                keyboard.release(key)
-
-        elif action_type == 'key_press':
-            key = action.get('key', '')
-            if key:
-                keyboard.press(key)
-                keyboard.release(key)
-
-        elif action_type == 'sleep':
-            ms = action.get('ms', 0)
-            if ms > 0:
-                time.sleep(ms / 1000.0)
+    run_macro(compile_macro(macro_list)[0])
@@ -3,6 +3,10 @@ Klad Macro Tool - Keyboard Utilities
 Ortak klavye tuş ismi dönüşüm fonksiyonları
 """
 
+import keyboard
+from collections import Counter
+from typing import Dict, Union
+
 # Türkçe Q klavye scan code -> tuş eşleştirmesi
 SCAN_CODE_MAP = {
     # Sayı satırı - 41: " tuşu (Esc altında)
@@ -53,6 +57,18 @@ MODIFIER_KEYS = {
     'left windows', 'right windows'
 }
 
+# Tuş adı -> scan code (SCAN_CODE_MAP'in tersi). Birden fazla tuşa karşılık
+# gelen isimler ve extended kodlar hariç, onlar keyboard modülüne sorulur.
+_NAME_COUNTS = Counter(SCAN_CODE_MAP.values())
+KEY_NAME_TO_SCAN_CODE = {
+    name: code for code, name in SCAN_CODE_MAP.items()
+    if code < 0x100 and _NAME_COUNTS[name] == 1
+}
+
+# resolve_key sonuçları (worker process başına bir kez çözülür)
+_resolved_keys: Dict[str, Union[int, str]] = {}
+_name_tables_ready = False
+
 
 def get_physical_key_name(event):
     """
@@ -84,3 +100,51 @@ def get_physical_key_name(event):
         return name.lower()
 
     return name.lower()
+
+
+def _setup_name_tables() -> None:
+    """
+    keyboard modülünün tuş tablolarını bir kez kurdur.
+
+    Tablolar ilk isim çözümlemesinde tembel olarak kurulur; Windows'ta
+    scan code -> virtual key tablosu da bunlardan biridir. SCAN_CODE_MAP'ten
+    gelen tuşlar keyboard'a hiç isim sordurmaz, tablo kurulmazsa
+    keyboard.press(int) vk=0 ile gönderilir ve oyun sadece çıplak scan code
+    görür.
+    """
+    global _name_tables_ready
+    if _name_tables_ready:
+        return
+    _name_tables_ready = True
+    try:
+        keyboard.key_to_scan_codes('a')
+    except Exception:
+        pass  # keyboard backend yok
+
+
+def resolve_key(name: str) -> Union[int, str]:
+    """
+    Tuş adını scan code'a çevir (sonuç önbelleğe alınır)
+
+    Önce SCAN_CODE_MAP'e, bulunamazsa keyboard modülünün düzen tablosuna
+    bakılır. keyboard.press/release scan code ile çağrıldığında her basışta
+    isim çözümlemesi yapmaz.
+
+    Args:
+        name: Tuş adı (örn. 'a', 'shift', 'f1')
+
+    Returns:
+        int scan code, çözülemezse tuş adının kendisi
+    """
+    key = name.strip().lower()
+    resolved = _resolved_keys.get(key)
+    if resolved is None:
+        _setup_name_tables()
+        resolved = KEY_NAME_TO_SCAN_CODE.get(key)
+        if resolved is None:
+            try:
+                resolved = keyboard.key_to_scan_codes(key)[0]
+            except Exception:
+                resolved = key  # bilinmeyen tuş ya da keyboard backend yok
+        _resolved_keys[key] = resolved
+    return resolved
@@ -0,0 +1,234 @@
+"""
+Klad Macro Tool - Batched Template Matching
+Scores many templates against one frame with spectra precomputed at load time
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .constants import COLOR_MODE_RGB, COLOR_MODE_HSV, COLOR_MIN_SATURATION
+
+# Windows with a standard deviation below this are treated as flat (score 0),
+# the same way cv2.TM_CCOEFF_NORMED does
+FLAT_WINDOW_STD = 1e-3
+
+
+class BatchedMatcher:
+    """
+    TM_CCOEFF_NORMED for a fixed frame size and a fixed set of templates.
+
+    At load time every template is made zero-mean and its DFT (padded to the
+    frame's optimal DFT size) and norm are cached. Per frame only one forward
+    DFT of the frame and one integral image are computed; window statistics are
+    shared by all templates of the same size. Each template then costs one
+    spectrum multiply and one inverse DFT instead of a full matchTemplate call.
+
+    Args:
+        frame_shape: (height, width) of the grayscale search region
+        images: Grayscale template images (must fit inside the frame)
+    """
+
+    def __init__(self, frame_shape: Tuple[int, int], images: List[np.ndarray]):
+        self.frame_shape = tuple(frame_shape)
+        height, width = self.frame_shape
+        self.dft_shape = (cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width))
+
+        self.sizes: List[Tuple[int, int]] = []
+        self.spectra: List[np.ndarray] = []
+        self.norms = np.zeros(len(images), dtype=np.float64)
+
+        padded = np.zeros(self.dft_shape, dtype=np.float32)
+        for i, img in enumerate(images):
+            h, w = img.shape[:2]
+            zero_mean = img.astype(np.float32) - float(img.mean())
+            padded[:] = 0
+            padded[:h, :w] = zero_mean
+            self.spectra.append(cv2.dft(padded))
+            self.norms[i] = float(np.sqrt(np.sum(zero_mean.astype(np.float64) ** 2)))
+            self.sizes.append((h, w))
+
+        # Per-frame buffers, allocated once
+        self._padded = np.zeros(self.dft_shape, dtype=np.float32)
+        self._spectrum = np.empty(self.dft_shape, dtype=np.float32)
+        self._product = np.empty(self.dft_shape, dtype=np.float32)
+        self._corr = np.empty(self.dft_shape, dtype=np.float32)
+        self._sum = np.empty((height + 1, width + 1), dtype=np.float64)
+        self._sqsum = np.empty((height + 1, width + 1), dtype=np.float64)
+        self._inv_std_valid = set()
+        self._inv_std: Dict[Tuple[int, int], np.ndarray] = {}
+        self._results: Dict[Tuple[int, int], np.ndarray] = {}
+        self._window: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for size in set(self.sizes):
+            out_shape = (height - size[0] + 1, width - size[1] + 1)
+            self._inv_std[size] = np.empty(out_shape, dtype=np.float32)
+            self._results[size] = np.empty(out_shape, dtype=np.float32)
+            self._window[size] = (
+                np.empty(out_shape, dtype=np.float64),  # window sum
+                np.empty(out_shape, dtype=np.float64),  # window sum of squares
+                np.empty(out_shape, dtype=bool)         # flat window mask
+            )
+
+    def __len__(self) -> int:
+        return len(self.spectra)
+
+    def set_frame(self, gray: np.ndarray) -> None:
+        """Compute the frame DFT and integral images (once per frame)"""
+        height, width = self.frame_shape
+        self._padded[:height, :width] = gray
+        cv2.dft(self._padded, dst=self._spectrum)
+        cv2.integral2(gray, sum=self._sum, sqsum=self._sqsum, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        self._inv_std_valid.clear()
+
+    def _window_inv_std(self, size: Tuple[int, int]) -> np.ndarray:
+        """1 / (window std * sqrt(n)) for every valid position, 0 for flat windows"""
+        inv_std = self._inv_std[size]
+        if size not in self._inv_std_valid:
+            h, w = size
+            s, sq = self._sum, self._sqsum
+            win_sum, win_sq, flat = self._window[size]
+            np.subtract(s[h:, w:], s[:-h, w:], out=win_sum)
+            win_sum -= s[h:, :-w]
+            win_sum += s[:-h, :-w]
+            np.subtract(sq[h:, w:], sq[:-h, w:], out=win_sq)
+            win_sq -= sq[h:, :-w]
+            win_sq += sq[:-h, :-w]
+            # std * sqrt(n) = sqrt(sum(x^2) - sum(x)^2 / n)
+            np.multiply(win_sum, win_sum, out=win_sum)
+            win_sum *= 1.0 / (h * w)
+            win_sq -= win_sum
+            np.maximum(win_sq, 0.0, out=win_sq)
+            np.sqrt(win_sq, out=win_sq)
+            np.less(win_sq, FLAT_WINDOW_STD * np.sqrt(h * w), out=flat)
+            np.copyto(win_sq, 1.0, where=flat)
+            np.divide(1.0, win_sq, out=inv_std, casting='same_kind')
+            np.copyto(inv_std, 0.0, where=flat)
+            self._inv_std_valid.add(size)
+        return inv_std
+
+    def score(self, index: int) -> Tuple[float, Tuple[int, int]]:
+        """
+        Best normalized correlation of one template against the current frame.
+
+        Returns:
+            (max_val, max_loc) like cv2.minMaxLoc on a TM_CCOEFF_NORMED result
+        """
+        height, width = self.frame_shape
+        h, w = self.sizes[index]
+        norm = self.norms[index]
+        if norm <= 0:
+            return 1.0, (0, 0)  # flat template: cv2 reports 1 everywhere
+
+        cv2.mulSpectrums(self._spectrum, self.spectra[index], 0, c=self._product, conjB=True)
+        cv2.idft(self._product, dst=self._corr, flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)
+        corr = self._corr[:height - h + 1, :width - w + 1]
+        result = self._results[(h, w)]
+        cv2.multiply(corr, self._window_inv_std((h, w)), dst=result, scale=1.0 / norm)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return min(max_val, 1.0), max_loc
+
+    def score_all(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Score every template against a frame in one pass.
+
+        Returns:
+            float32 array of max scores, in template order
+        """
+        self.set_frame(gray)
+        scores = np.empty(len(self.spectra), dtype=np.float32)
+        for i in range(len(self.spectra)):
+            scores[i] = self.score(i)[0]
+        return scores
+
+
+def build_pyramid(image: np.ndarray, levels: int) -> List[np.ndarray]:
+    """
+    Gaussian pyramid of an image.
+
+    Returns:
+        [image, 1/2, 1/4, ...] with levels + 1 entries
+    """
+    pyramid = [image]
+    for _ in range(levels):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+    return pyramid
+
+
+def top_peaks(result: np.ndarray, count: int, radius: int) -> List[Tuple[float, Tuple[int, int]]]:
+    """
+    Best maxima of a matchTemplate result, at least radius apart.
+
+    The result map is modified in place (found peaks are suppressed).
+
+    Returns:
+        Up to count (value, (x, y)) pairs, best first
+    """
+    peaks = []
+    for _ in range(count):
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if peaks and max_val <= -1.0:
+            break  # everything suppressed
+        peaks.append((max_val, max_loc))
+        x, y = max_loc
+        result[max(y - radius, 0):y + radius + 1, max(x - radius, 0):x + radius + 1] = -1.0
+    return peaks
+
+
+def intensity_histogram(gray: np.ndarray, bins: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Grayscale histogram with the given number of bins (float32, shape (bins, 1)), only where mask is set"""
+    return cv2.calcHist([gray], [0], mask, [bins], [0, 256])
+
+
+def histogram_coverage(region_hist: np.ndarray, template_hist: np.ndarray, template_pixels: int) -> float:
+    """
+    Fraction of the template's pixels whose intensity bin also occurs (often
+    enough) in the searched region.
+
+    A template that is really on screen has a coverage close to 1 no matter
+    where it sits, so a low coverage means the correlation can be skipped.
+    """
+    return float(np.minimum(region_hist, template_hist).sum()) / template_pixels
+
+
+def hue_saturation(bgr) -> Tuple[float, float]:
+    """Hue (0-180, OpenCV scale) and saturation (0-255) of a mean BGR color"""
+    pixel = np.array([[bgr[:3]]], dtype=np.float32) / 255.0
+    h, s, _ = cv2.cvtColor(pixel, cv2.COLOR_BGR2HSV)[0, 0]
+    return float(h) / 2.0, float(s) * 255.0
+
+
+def color_matches(
+    mode: str,
+    template_bgr: np.ndarray,
+    template_hs: Tuple[float, float],
+    frame_bgr,
+    tolerance: float
+) -> bool:
+    """
+    Compare the mean color at a match location with the template's.
+
+    COLOR_MODE_RGB: every channel mean within tolerance (catches tint and
+    darkening). COLOR_MODE_HSV: saturation and hue within tolerance, both on
+    a 0-255 scale, brightness ignored; hue only counts when both colors are
+    saturated enough to have one.
+
+    Args:
+        mode: One of the COLOR_MODE_* constants
+        template_bgr: Template mean color (B, G, R)
+        template_hs: hue_saturation(template_bgr)
+        frame_bgr: Mean color of the frame window (cv2.mean output, B G R first)
+        tolerance: Largest allowed difference (0-255)
+    """
+    if mode == COLOR_MODE_RGB:
+        return max(abs(frame_bgr[i] - template_bgr[i]) for i in range(3)) <= tolerance
+    if mode == COLOR_MODE_HSV:
+        hue, sat = hue_saturation(frame_bgr)
+        t_hue, t_sat = template_hs
+        if abs(sat - t_sat) > tolerance:
+            return False
+        if min(sat, t_sat) < COLOR_MIN_SATURATION:
+            return True
+        hue_diff = abs(hue - t_hue)
+        hue_diff = min(hue_diff, 180.0 - hue_diff)  # hue wraps around
+        return hue_diff * 255.0 / 90.0 <= tolerance
+    return True
@@ -0,0 +1,159 @@
+"""
+Klad Macro Tool - Worker Status Table
+Shared-memory status of a worker that the UI samples at its own refresh rate
+"""
+
+import math
+import multiprocessing
+from typing import Any, Dict, Optional
+
+from .constants import STATUS_NAME_BYTES, STATUS_SNAPSHOT_RETRIES
+
+# FPS report values (NaN = not reported by this group)
+REPORT_FIELDS = (
+    'fps',
+    'target_fps',
+    'jitter_ms',
+    'key_delay_overshoot_ms',
+    'pyramid_speedup',
+    'prefilter_reject_rate',
+    'toggle_latency_ms',
+    'latency_p50_ms',
+    'latency_p95_ms',
+    'latency_p99_ms',
+)
+
+# Colors are stored as 0xRRGGBB, -1 = not set
+_COLOR_FIELDS = ('indicator', 'match_color')
+
+STATUS_FIELDS = REPORT_FIELDS + _COLOR_FIELDS + (
+    'fps_reports',    # number of FPS reports, the UI redraws the overlay when it changes
+    'match_count',    # number of dispatched matches
+    'match_time_ms',  # frame time of the last match
+    'macro_ms',       # macro length of the last match (NaN = key combo)
+)
+_INDEX = {name: i for i, name in enumerate(STATUS_FIELDS)}
+
+
+def _color_to_int(color: str) -> float:
+    try:
+        return float(int(color.lstrip('#')[:6], 16))
+    except (AttributeError, ValueError):
+        return -1.0
+
+
+def _int_to_color(value: float) -> Optional[str]:
+    return f"#{int(value):06x}" if value >= 0 else None
+
+
+class WorkerStatus:
+    """
+    Last match, match count and FPS report of one worker in shared memory.
+
+    The worker overwrites the values in place instead of pickling a message
+    per match through the status queue; the UI reads a snapshot whenever it
+    refreshes, so its cost no longer depends on the match rate. Rare events
+    (started/stopped, warnings, learned ROIs) still use the queue.
+
+    Writes are wrapped in a sequence counter (odd while writing) so a reader
+    never sees a half-written row; writers (worker loop and action thread)
+    share a lock, the reader takes none.
+
+    Create it in the main process and pass it to the worker as a Process
+    argument.
+    """
+
+    def __init__(self):
+        self._values = multiprocessing.RawArray('d', len(STATUS_FIELDS))
+        self._name = multiprocessing.RawArray('c', STATUS_NAME_BYTES)
+        self._seq = multiprocessing.RawValue('L', 0)
+        self._lock = multiprocessing.Lock()
+        for name in REPORT_FIELDS + ('macro_ms',):
+            self._values[_INDEX[name]] = math.nan
+        for name in _COLOR_FIELDS:
+            self._values[_INDEX[name]] = -1.0
+
+    # ---- worker side ----
+
+    def _begin(self) -> None:
+        self._lock.acquire()
+        self._seq.value += 1
+
+    def _end(self) -> None:
+        self._seq.value += 1
+        self._lock.release()
+
+    def publish_report(self, report: Dict[str, Any]) -> None:
+        """Store an FPS report (keys of REPORT_FIELDS, missing ones are cleared)"""
+        values = self._values
+        self._begin()
+        try:
+            for name in REPORT_FIELDS:
+                value = report.get(name)
+                values[_INDEX[name]] = math.nan if value is None else value
+            values[_INDEX['fps_reports']] += 1
+        finally:
+            self._end()
+
+    def record_match(self, template: str, color: str, time_ms: float, macro_ms: Optional[float] = None) -> None:
+        """Store a dispatched match and show its color on the indicator"""
+        values = self._values
+        encoded = template.encode('utf-8')[:STATUS_NAME_BYTES - 1]
+        color_value = _color_to_int(color)
+        self._begin()
+        try:
+            self._name.value = encoded
+            values[_INDEX['match_color']] = color_value
+            values[_INDEX['indicator']] = color_value
+            values[_INDEX['match_time_ms']] = time_ms
+            values[_INDEX['macro_ms']] = math.nan if macro_ms is None else macro_ms
+            values[_INDEX['match_count']] += 1
+        finally:
+            self._end()
+
+    def set_indicator(self, color: str) -> None:
+        """Set the indicator color (e.g. back to green after an action)"""
+        color_value = _color_to_int(color)
+        self._begin()
+        try:
+            self._values[_INDEX['indicator']] = color_value
+        finally:
+            self._end()
+
+    # ---- UI side ----
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Consistent copy of the current values.
+
+        Gives up after STATUS_SNAPSHOT_RETRIES attempts: a worker killed in
+        the middle of a write leaves the sequence odd forever.
+
+        Returns:
+            Dict with every STATUS_FIELDS entry (NaN -> None, colors as '#rrggbb'
+            or None) plus 'template', the name of the last matched template;
+            None if no consistent copy could be taken (skip this sample)
+        """
+        for _ in range(STATUS_SNAPSHOT_RETRIES):
+            seq = self._seq.value
+            if seq & 1:
+                continue  # write in progress
+            values = self._values[:]
+            template = self._name.value
+            if self._seq.value == seq:
+                break
+        else:
+            return None
+
+        snapshot: Dict[str, Any] = {}
+        for name, value in zip(STATUS_FIELDS, values):
+            if name in _COLOR_FIELDS:
+                snapshot[name] = _int_to_color(value)
+            elif math.isnan(value):
+                snapshot[name] = None
+            else:
+                snapshot[name] = value
+        snapshot['fps_reports'] = int(snapshot['fps_reports'])
+        snapshot['match_count'] = int(snapshot['match_count'])
+        snapshot['template'] = template.decode('utf-8', errors='replace')
+        return snapshot
@@ -0,0 +1,112 @@
+"""
+Klad Macro Tool - Score Telemetry
+Sampled per-template match scores in a ring buffer, saved for threshold tuning
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .constants import SCORE_TELEMETRY_SAMPLE_EVERY, SCORE_TELEMETRY_CAPACITY
+
+
+class ScoreTelemetry:
+    """
+    Ring buffer of match scores, one row per sampled frame and one column
+    per template.
+
+    Every sample_every-th frame is sampled; the scores the runner computes on
+    that frame are written into the row, templates it did not reach (an
+    earlier one triggered, prefilter, ...) stay NaN. When the buffer is full
+    the oldest rows are overwritten, so memory stays fixed however long the
+    bot runs.
+
+    Args:
+        names: Template names (column order)
+        thresholds: Current threshold of each template (saved alongside)
+        sample_every: Sample one frame out of this many
+        capacity: Rows kept
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        thresholds: List[float],
+        sample_every: int = SCORE_TELEMETRY_SAMPLE_EVERY,
+        capacity: int = SCORE_TELEMETRY_CAPACITY
+    ):
+        self.names = list(names)
+        self.thresholds = list(thresholds)
+        self.sample_every = max(int(sample_every), 1)
+        self.scores = np.full((capacity, len(self.names)), np.nan, dtype=np.float32)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.frames = 0   # frames seen
+        self.rows = 0     # rows written (may exceed capacity)
+        self._row = None  # row of the current sampled frame
+
+    def sample(self) -> bool:
+        """
+        Start a frame.
+
+        Returns:
+            True if this frame is sampled (record() calls until the next
+            sample() go into a fresh row)
+        """
+        self.frames += 1
+        if self.frames % self.sample_every:
+            return False
+        index = self.rows % len(self.times)
+        self._row = self.scores[index]
+        self._row.fill(np.nan)
+        self.times[index] = time.time()
+        self.rows += 1
+        return True
+
+    def record(self, column: int, score: float) -> None:
+        """Store a template's score for the current sampled frame"""
+        self._row[column] = score
+
+    def ordered(self) -> tuple:
+        """(times, scores) of the kept rows, oldest first"""
+        capacity = len(self.times)
+        if self.rows <= capacity:
+            return self.times[:self.rows], self.scores[:self.rows]
+        start = self.rows % capacity
+        order = np.r_[start:capacity, 0:start]
+        return self.times[order], self.scores[order]
+
+    def save(self, path: Path, group: str = '') -> None:
+        """Write the kept rows as a compressed .npz (see load_score_telemetry)"""
+        times, scores = self.ordered()
+        np.savez_compressed(
+            path,
+            group=np.array(group),
+            names=np.array(self.names),
+            thresholds=np.array(self.thresholds, dtype=np.float32),
+            times=times,
+            scores=scores,
+            sample_every=self.sample_every,
+            frames=self.frames
+        )
+
+
+def load_score_telemetry(path: Path) -> Dict[str, Any]:
+    """
+    Read a file written by ScoreTelemetry.save.
+
+    Returns:
+        {'group', 'names', 'thresholds', 'times', 'scores' (rows x templates,
+        NaN = not scored), 'sample_every', 'frames'}
+    """
+    with np.load(path) as data:
+        return {
+            'group': str(data['group']),
+            'names': [str(name) for name in data['names']],
+            'thresholds': data['thresholds'].tolist(),
+            'times': data['times'],
+            'scores': data['scores'],
+            'sample_every': int(data['sample_every']),
+            'frames': int(data['frames']),
+        }
@@ -0,0 +1,240 @@
+"""
+Klad Macro Tool - Template Cache
+Decoded template images and their derived data, cached on disk by content hash
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .matching import build_pyramid, intensity_histogram
+from .constants import (
+    TEMPLATE_CACHE_VERSION,
+    PYRAMID_LEVELS,
+    PYRAMID_MIN_TEMPLATE_PX,
+    PREFILTER_HIST_BINS,
+    MASK_ALPHA_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_FOLDER = Path(__file__).parent.parent / "template_cache"
+
+# Everything that changes the stored arrays is part of the key
+_KEY_PARAMS = (f"v{TEMPLATE_CACHE_VERSION}|{PYRAMID_LEVELS}|{PYRAMID_MIN_TEMPLATE_PX}|{PREFILTER_HIST_BINS}"
+               f"|{MASK_ALPHA_THRESHOLD}")
+
+
+def template_pyramid(img_gray: np.ndarray) -> Optional[List[np.ndarray]]:
+    """
+    Precompute a template's pyramid, as deep as PYRAMID_LEVELS allows while the
+    coarsest level keeps at least PYRAMID_MIN_TEMPLATE_PX on its shorter side.
+
+    Returns:
+        [full, 1/2, ...] images, or None if the template is too small to downscale
+    """
+    levels = 0
+    while levels < PYRAMID_LEVELS and (min(img_gray.shape[:2]) >> (levels + 1)) >= PYRAMID_MIN_TEMPLATE_PX:
+        levels += 1
+    return build_pyramid(img_gray, levels) if levels > 0 else None
+
+
+def alpha_mask(gray: np.ndarray, alpha: np.ndarray) -> tuple:
+    """
+    Turn a PNG alpha channel into a matchTemplate mask.
+
+    The template is cropped to the box around its opaque pixels: masked
+    matching costs more per pixel than plain matching, so nothing outside
+    that box is correlated at all. If the cropped template is fully opaque
+    it needs no mask.
+
+    Returns:
+        (cropped gray, mask (uint8 0/255) or None, (x, y) offset of the crop)
+    """
+    opaque = alpha >= MASK_ALPHA_THRESHOLD
+    if not opaque.any():
+        return gray, None, (0, 0)  # fully transparent: ignore the alpha
+    ys, xs = np.nonzero(opaque)
+    x1, y1, x2, y2 = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+    gray = np.ascontiguousarray(gray[y1:y2, x1:x2])
+    opaque = opaque[y1:y2, x1:x2]
+    mask = None if opaque.all() else opaque.astype(np.uint8) * 255
+    return gray, mask, (int(x1), int(y1))
+
+
+def _prepare(data: bytes) -> Optional[Dict[str, Any]]:
+    """Decode an image file's bytes and compute everything matching needs"""
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        return None
+    if img.dtype != np.uint8:
+        img = (img >> 8).astype(np.uint8)  # 16-bit PNG
+
+    # Convert to grayscale (3x faster matching); alpha -> mask
+    mask, offset = None, (0, 0)
+    if img.ndim == 2:
+        gray = bgr = img
+    elif img.shape[2] == 4:
+        gray, mask, offset = alpha_mask(cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY), img[:, :, 3])
+        x, y = offset
+        bgr = img[y:y + gray.shape[0], x:x + gray.shape[1], :3]
+    else:
+        gray, bgr = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), img
+    mean = cv2.mean(np.ascontiguousarray(bgr), mask=mask)
+    return {
+        'gray': gray,
+        'mask': mask,
+        'offset': offset,
+        # Mean color (B, G, R) of the opaque pixels, for the color check
+        'color': np.array(mean[:3] if bgr.ndim == 3 else mean[:1] * 3, dtype=np.float32),
+        # Masked templates are matched at full resolution only
+        'pyramid': template_pyramid(gray) if mask is None else None,
+        'hist': intensity_histogram(gray, PREFILTER_HIST_BINS, mask),
+    }
+
+
+class TemplateCache:
+    """
+    Template images decoded once and shared between processes.
+
+    Entries are keyed by a hash of the file content (plus the preprocessing
+    parameters), so renamed or copied images hit the same entry and edited
+    ones miss it. Each entry is a folder of .npy files (gray image, alpha
+    mask, pyramid levels, histogram, mean color) that every worker
+    memory-maps read-only: the OS keeps one copy in the page cache no matter
+    how many processes use it, and a start or reload only pays for an mmap
+    instead of PNG decoding.
+
+    Within a process the file hash is remembered by path, size and mtime, so
+    repeated lookups (test mode, reloads) cost one stat call.
+
+    If the cache folder cannot be written the arrays are kept in memory only.
+
+    Args:
+        folder: Cache folder (created on first write)
+    """
+
+    def __init__(self, folder: Path = TEMPLATE_CACHE_FOLDER):
+        self.folder = folder
+        self._hashes: Dict[str, tuple] = {}   # path -> (size, mtime_ns, key)
+        self._entries: Dict[str, Dict[str, Any]] = {}  # key -> arrays
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Prepared arrays of an image file.
+
+        Returns:
+            {'gray', 'mask' (or None), 'offset', 'color' (mean B, G, R),
+            'pyramid' (list or None), 'hist', 'key'} with read-only arrays,
+            or None if the file is missing or not a valid image
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            known = self._hashes.get(str(path))
+            if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                entry = self._entries.get(known[2])
+                if entry is not None:
+                    return entry
+
+            try:
+                # UTF-8 path desteği için numpy ile oku
+                data = np.fromfile(str(path), dtype=np.uint8).tobytes()
+            except OSError:
+                return None
+            key = hashlib.sha1(_KEY_PARAMS.encode() + data).hexdigest()
+            self._hashes[str(path)] = (stat.st_size, stat.st_mtime_ns, key)
+
+            entry = self._entries.get(key) or self._load(key)
+            if entry is None:
+                arrays = _prepare(data)
+                if arrays is None:
+                    return None
+                self.misses += 1
+                entry = self._store(key, arrays)
+            else:
+                self.hits += 1
+            self._entries[key] = entry
+            return entry
+
+    def _entry_folder(self, key: str) -> Path:
+        return self.folder / key[:2] / key
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Memory-map a stored entry (None if missing or damaged)"""
+        folder = self._entry_folder(key)
+        if not (folder / 'done').exists():
+            return None
+        try:
+            gray = np.load(folder / 'gray.npy', mmap_mode='r')
+            hist = np.load(folder / 'hist.npy')
+            mask = np.load(folder / 'mask.npy', mmap_mode='r') if (folder / 'mask.npy').exists() else None
+            offset = tuple(int(v) for v in np.load(folder / 'offset.npy'))
+            color = np.load(folder / 'color.npy')
+            pyramid = [gray]
+            while (folder / f'pyr{len(pyramid)}.npy').exists():
+                pyramid.append(np.load(folder / f'pyr{len(pyramid)}.npy', mmap_mode='r'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Template cache entry {key} unreadable: {e}")
+            return None
+        return {'gray': gray, 'mask': mask, 'offset': offset, 'color': color,
+                'pyramid': pyramid if len(pyramid) > 1 else None, 'hist': hist, 'key': key}
+
+    def _store(self, key: str, arrays: Dict[str, Any]) -> Dict[str, Any]:
+        """Write an entry and map it back; keeps the in-memory arrays if writing fails"""
+        folder = self._entry_folder(key)
+        files = {'gray.npy': arrays['gray'], 'hist.npy': arrays['hist'], 'offset.npy': np.array(arrays['offset']),
+                 'color.npy': arrays['color']}
+        if arrays['mask'] is not None:
+            files['mask.npy'] = arrays['mask']
+        for level, image in enumerate((arrays['pyramid'] or [])[1:], start=1):
+            files[f'pyr{level}.npy'] = image
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            for name, array in files.items():
+                # Write under a private name and rename, so a process starting
+                # at the same time never maps a half-written file
+                tmp = folder / f'{name}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    np.save(f, np.ascontiguousarray(array))
+                os.replace(tmp, folder / name)
+            (folder / 'done').touch()
+        except OSError as e:
+            # e.g. read-only install, or Windows refusing to replace a file
+            # another worker has mapped (that worker's copy is identical)
+            logger.debug(f"Template cache write failed for {key}: {e}")
+            for array in (arrays['gray'], arrays['hist'], arrays['color'], *(arrays['pyramid'] or [])):
+                array.flags.writeable = False
+            if arrays['mask'] is not None:
+                arrays['mask'].flags.writeable = False
+            return dict(arrays, key=key)
+        return self._load(key) or dict(arrays, key=key)
+
+    def clear_memory(self) -> None:
+        """Forget the in-process state (entries on disk stay)"""
+        with self._lock:
+            self._hashes.clear()
+            self._entries.clear()
+
+
+_default_cache: Optional[TemplateCache] = None
+
+
+def get_template_cache() -> TemplateCache:
+    """Process-wide cache on TEMPLATE_CACHE_FOLDER"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TemplateCache()
+    return _default_cache
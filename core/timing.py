@@ -0,0 +1,291 @@
+"""
+Klad Macro Tool - Timing
+Precise waits, frame pacing and delay measurement
+"""
+
+import sys
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from .constants import TIMER_SPIN_THRESHOLD_SEC, LATENCY_SUB_BUCKETS, LATENCY_MAX_MS
+
+# Process-wide spin threshold (set from the global settings in each worker)
+_spin_threshold = TIMER_SPIN_THRESHOLD_SEC
+
+
+def set_spin_threshold(seconds: float) -> None:
+    """Set the default busy-wait part of precise_sleep for this process"""
+    global _spin_threshold
+    _spin_threshold = max(seconds, 0.0)
+
+
+def get_spin_threshold() -> float:
+    return _spin_threshold
+
+
+def enable_high_resolution_timer() -> bool:
+    """
+    Ask Windows for 1 ms timer resolution (time.sleep otherwise rounds up to
+    ~15.6 ms on older Python versions). No-op on other platforms.
+
+    Returns:
+        True if the resolution was changed (call disable_high_resolution_timer later)
+    """
+    if sys.platform != 'win32':
+        return False
+    try:
+        import ctypes
+        return ctypes.windll.winmm.timeBeginPeriod(1) == 0
+    except Exception:
+        return False
+
+
+def disable_high_resolution_timer() -> None:
+    """Undo enable_high_resolution_timer"""
+    if sys.platform != 'win32':
+        return
+    try:
+        import ctypes
+        ctypes.windll.winmm.timeEndPeriod(1)
+    except Exception:
+        pass
+
+
+def precise_sleep(seconds: float, spin_threshold: Optional[float] = None) -> None:
+    """
+    Wait with sub-millisecond accuracy.
+
+    Sleeps through most of the interval and spins on perf_counter for the last
+    spin_threshold seconds, where time.sleep would overshoot.
+
+    Args:
+        seconds: Time to wait
+        spin_threshold: Length of the final busy-wait part (0 = plain sleep,
+            None = process default, see set_spin_threshold)
+    """
+    if seconds <= 0:
+        return
+    if spin_threshold is None:
+        spin_threshold = _spin_threshold
+    deadline = time.perf_counter() + seconds
+    coarse = seconds - spin_threshold
+    if coarse > 0:
+        time.sleep(coarse)
+    while time.perf_counter() < deadline:
+        time.sleep(0)  # yield the core to other threads while spinning
+
+
+class FramePacer:
+    """
+    Paces a loop to a target frame rate.
+
+    wait() is called once per iteration, before the frame is processed. Frame
+    starts are scheduled on a fixed grid (deadline += interval) so short and
+    long frames even out; if the loop falls more than one interval behind, the
+    grid is reset instead of bursting to catch up.
+
+    Args:
+        target_fps: Frames per second, 0 = as fast as possible (no waiting)
+        spin_threshold: Busy-wait part of each wait (see precise_sleep)
+    """
+
+    def __init__(self, target_fps: float, spin_threshold: Optional[float] = None):
+        self.target_fps = target_fps
+        self.interval = 1.0 / target_fps if target_fps > 0 else 0.0
+        self.spin_threshold = spin_threshold
+        self.deadline: Optional[float] = None
+        self.last_start: Optional[float] = None
+        self._deviation_sum = 0.0
+        self._deviation_count = 0
+
+    def reset(self) -> None:
+        """Forget the schedule (e.g. after the group was paused)"""
+        self.deadline = None
+        self.last_start = None
+
+    def remaining(self) -> float:
+        """Seconds until the next frame is due (0 = due now or unpaced)"""
+        if not self.interval or self.deadline is None:
+            return 0.0
+        return max(self.deadline - time.perf_counter(), 0.0)
+
+    def wait(self) -> None:
+        """Block until the next frame is due"""
+        if not self.interval:
+            return
+
+        remaining = self.remaining()
+        if remaining > 0:
+            precise_sleep(remaining, self.spin_threshold)
+        self.frame_started()
+
+    def frame_started(self) -> None:
+        """
+        Book a frame start on the schedule (done by wait; call it directly when
+        a scheduler serving several pacers waits itself, see remaining)
+        """
+        if not self.interval:
+            return
+
+        start = time.perf_counter()
+        if self.deadline is None:
+            self.deadline = start
+        if self.last_start is not None:
+            self._deviation_sum += abs((start - self.last_start) - self.interval)
+            self._deviation_count += 1
+        self.last_start = start
+
+        self.deadline += self.interval
+        if start - self.deadline > self.interval:
+            self.deadline = start + self.interval  # too far behind, resync
+
+    def pop_jitter_ms(self) -> Optional[float]:
+        """
+        Mean absolute deviation of frame intervals from the target since the last call.
+
+        Returns:
+            Jitter in milliseconds, or None when unpaced or no frames ran
+        """
+        if not self._deviation_count:
+            return None
+        jitter = self._deviation_sum / self._deviation_count * 1000
+        self._deviation_sum = 0.0
+        self._deviation_count = 0
+        return jitter
+
+
+class DelayStats:
+    """
+    Requested vs actual wait times, to see what a "1 ms" delay really costs.
+
+    Thread-safe: waits are recorded on the action executor thread and read
+    by the worker loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.count = 0
+        self.requested = 0.0
+        self.overshoot = 0.0
+        self.max_overshoot = 0.0
+
+    def add(self, requested: float, actual: float) -> None:
+        overshoot = actual - requested
+        with self._lock:
+            self.count += 1
+            self.requested += requested
+            self.overshoot += overshoot
+            self.max_overshoot = max(self.max_overshoot, overshoot)
+
+    def pop_summary(self) -> Optional[Dict[str, float]]:
+        """
+        Summary since the last call.
+
+        Returns:
+            {'count', 'mean_requested_ms', 'mean_overshoot_ms', 'max_overshoot_ms'} or None
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            summary = {
+                'count': self.count,
+                'mean_requested_ms': self.requested / self.count * 1000,
+                'mean_overshoot_ms': self.overshoot / self.count * 1000,
+                'max_overshoot_ms': self.max_overshoot * 1000,
+            }
+            self._reset()
+            return summary
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram (HdrHistogram style) with fixed memory.
+
+    Values are counted in microseconds: exactly up to sub_buckets µs, then
+    sub_buckets / 2 buckets per doubling, so percentiles keep a relative
+    error of about 1 / sub_buckets at any scale. Recording is O(1) and
+    thread-safe (dispatch and completion are recorded on the action thread).
+
+    Args:
+        sub_buckets: Linear buckets before the first doubling (power of two)
+        max_ms: Largest tracked value, larger values count as max_ms
+    """
+
+    def __init__(self, sub_buckets: int = LATENCY_SUB_BUCKETS, max_ms: float = LATENCY_MAX_MS):
+        self.sub_buckets = sub_buckets
+        self._half = sub_buckets // 2
+        self._sub_bits = sub_buckets.bit_length()
+        self.max_us = int(max_ms * 1000)
+        self.counts = [0] * (self._index(self.max_us) + 1)
+        self.total = 0
+        self.sum_us = 0
+        self.max_seen_us = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value_us: int) -> int:
+        if value_us < self.sub_buckets:
+            return value_us
+        shift = value_us.bit_length() - self._sub_bits + 1
+        return self.sub_buckets + (shift - 1) * self._half + (value_us >> shift) - self._half
+
+    def _bounds(self, index: int) -> tuple:
+        """(lowest, highest) microsecond value counted in a bucket"""
+        if index < self.sub_buckets:
+            return index, index
+        shift, offset = divmod(index - self.sub_buckets, self._half)
+        shift += 1
+        mantissa = offset + self._half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        value_us = min(max(int(seconds * 1e6), 0), self.max_us)
+        index = self._index(value_us)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum_us += value_us
+            if value_us > self.max_seen_us:
+                self.max_seen_us = value_us
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Value (ms) at or below which percent of the recorded values fall, None if empty"""
+        with self._lock:
+            if not self.total:
+                return None
+            target = max(1, int(self.total * percent / 100.0 + 0.5))
+            running = 0
+            for index, count in enumerate(self.counts):
+                running += count
+                if running >= target:
+                    low, high = self._bounds(index)
+                    return min((low + high) / 2, self.max_seen_us) / 1000
+        return self.max_seen_us / 1000
+
+    def summary(self) -> Optional[Dict[str, float]]:
+        """
+        Returns:
+            {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'} or None if empty
+        """
+        if not self.total:
+            return None
+        return {
+            'count': self.total,
+            'mean_ms': round(self.sum_us / self.total / 1000, 3),
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_seen_us / 1000, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary plus the non-empty buckets as [low_ms, high_ms, count] (JSON dump)"""
+        with self._lock:
+            buckets: List[List[float]] = [
+                [low / 1000, high / 1000, count]
+                for low, high, count in (self._bounds(i) + (c,) for i, c in enumerate(self.counts) if c)
+            ]
+        return {'summary': self.summary(), 'buckets': buckets}
@@ -4,21 +4,64 @@ Independent worker process for each group's template matching
 """
 
 import cv2
+import json
+import math
 import numpy as np
 import time
 import logging
-import mss
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from multiprocessing import Queue, Value
 
-from .keyboard_handler import press_key_with_timing, press_key_combo, execute_macro
+from .frame_source import FrameSource, create_frame_source, MssFrameSource
+from .timing import (
+    FramePacer, LatencyHistogram, DelayStats, precise_sleep, set_spin_threshold,
+    enable_high_resolution_timer, disable_high_resolution_timer
+)
+from .actions import ActionExecutor
+from .control import WorkerControl
+from .status import WorkerStatus
+from .telemetry import ScoreTelemetry
+from .config import get_safe_folder_name
+from .template_cache import TemplateCache, get_template_cache
+from .matching import (
+    BatchedMatcher, top_peaks, intensity_histogram, histogram_coverage, hue_saturation, color_matches
+)
+from .keyboard_handler import (
+    compile_key, compile_key_combo, press_compiled_combo, compile_macro, macro_duration, run_macro
+)
 from .constants import (
     FPS_REPORT_INTERVAL_SEC,
+    TEST_CYCLE_INTERVAL_MS,
     FPS_RESET_INTERVAL_SEC,
-    IDLE_SLEEP_SEC,
+    CONTROL_WAIT_TIMEOUT_SEC,
     DEFAULT_TIMING,
     DEFAULT_TRIGGER_CONDITION,
+    DEFAULT_BATCHED_MATCHING,
+    BATCHED_MIN_TEMPLATES,
+    BATCHED_MAX_SPECTRA_BYTES,
+    DEFAULT_ROI_MODE,
+    ROI_MODE_AUTO,
+    ROI_MODE_FIXED,
+    ROI_PADDING_PX,
+    ROI_FULL_SCAN_INTERVAL,
+    COLOR_MODE_OFF,
+    DEFAULT_COLOR_MODE,
+    DEFAULT_COLOR_TOLERANCE,
+    DEFAULT_PYRAMID_MATCHING,
+    PYRAMID_CANDIDATES,
+    DEFAULT_PREFILTER,
+    PREFILTER_HIST_BINS,
+    PREFILTER_MIN_COVERAGE,
+    DEFAULT_CHANGE_GATE,
+    DEFAULT_SCORE_TELEMETRY,
+    CHANGE_GATE_SCALE,
+    CHANGE_GATE_THRESHOLD,
+    CHANGE_GATE_MAX_SKIP,
+    DEFAULT_TARGET_FPS,
+    DEFAULT_ACTION_POLICY,
+    TIMER_SPIN_THRESHOLD_SEC,
     TRIGGER_CONDITION_FOUND,
     TRIGGER_CONDITION_NOT_FOUND
 )
@@ -27,86 +70,443 @@ logger = logging.getLogger(__name__)
 
 # Images folder path (will be set from main module)
 IMAGES_FOLDER = Path(__file__).parent.parent / "images"
+LATENCY_FOLDER = Path(__file__).parent.parent / "latency"
+TELEMETRY_FOLDER = Path(__file__).parent.parent / "telemetry"
 
+# Latency stages, all measured from the moment the frame was grabbed
+LATENCY_STAGES = (
+    'decide',    # match decision made
+    'dispatch',  # action started on the executor (first key about to be sent)
+    'complete',  # action finished
+)
 
-def group_worker(
-    group_data: Dict[str, Any],
-    command_queue: Queue,
-    status_queue: Queue,
-    running_flag: Value
-) -> None:
+
+class GroupRunner:
     """
-    Worker process for each group.
-    Runs independently and listens for commands.
+    Capture -> match -> action pipeline of a single group.
+
+    Used by group_worker in the bot process and by the offline benchmark, so
+    both measure the same code path.
 
     Args:
         group_data: Group configuration dictionary
-        command_queue: Queue for receiving commands (toggle, stop)
-        status_queue: Queue for sending status updates to main process
-        running_flag: Shared flag to signal process termination
+        source: Opened frame source for the group's search region
+        status_queue: Queue for status updates to the main process (optional)
+        dry_run: Skip key presses (benchmark / headless runs)
+        profiler: Optional object with add(stage, seconds) for per-stage timings
+        images_folder: Base folder of template images
+        status_table: Shared status the UI samples; matches are written here
+            instead of the queue when given (optional)
+        record_scores: Keep every template's last score in self.scores (test mode,
+            NaN = rejected by the prefilter)
     """
-    group_id = group_data['id']
-    group_name = group_data['name']
 
-    # Load templates (grayscale for faster matching)
-    loaded_templates = _load_templates(group_data)
+    def __init__(
+        self,
+        group_data: Dict[str, Any],
+        source: FrameSource,
+        status_queue: Optional[Queue] = None,
+        dry_run: bool = False,
+        profiler: Any = None,
+        images_folder: Path = IMAGES_FOLDER,
+        status_table: Optional[WorkerStatus] = None,
+        record_scores: bool = False
+    ):
+        self.group_id = group_data['id']
+        self.name = group_data['name']
+        self.source = source
+        self.status_queue = status_queue
+        self.status_table = status_table
+        self.dry_run = dry_run
+        self.profiler = profiler
+
+        # Load templates (grayscale for faster matching)
+        self.region = group_data.get('search_region', [0, 0, 100, 100])
+        self.templates = _load_templates(group_data, images_folder)
+
+        # Preallocated buffers: gray frame + one matchTemplate result per template
+        self.gray = np.empty((self.region[3] - self.region[1], self.region[2] - self.region[0]), dtype=np.uint8)
+        self.frame = None  # last BGRA frame, read by the color check
+        _allocate_result_buffers(self.templates, self.gray.shape)
+        _apply_rois(self.templates, self.region, self.gray.shape)
+        self.frame_pyramid = _allocate_pyramid_buffers(self.templates, self.gray)
+        self._pyramid_ready = 0
+        self.pyramid_full_cost = 0.0  # estimated full-resolution time of pyramid scans
+        self.pyramid_cost = 0.0       # actual time of pyramid scans
+        self.matcher = _build_batched_matcher(group_data, self.templates)
+        self.prefilter = group_data.get('prefilter', DEFAULT_PREFILTER)
+        self.prefilter_stats: Dict[str, List[int]] = {}  # name -> [checked, rejected]
+        self._frame_hist = None
+        self._matcher_usable = False
+
+        # Change gate: downscaled signature of the last matched frame
+        self.change_gate = group_data.get('change_gate', DEFAULT_CHANGE_GATE)
+        self.gate_skipped = 0
+        self._gate_sig = None
+        self._gate_ref = None
+        self._gate_diff = None
+        self._gate_age = None  # frames reused since the reference (None = no reference)
+        self._last_triggered = None
+        self._matcher_ready = False
+        self._match_time = 0.0
+        self._minmax_time = 0.0
+
+        # Test mode: last score per template, and the templates match() did
+        # not reach on its last frame because an earlier one triggered
+        self.scores: Optional[Dict[str, float]] = {} if record_scores else None
+        self._unscored: List[Dict[str, Any]] = []
+        self._unscored_frame = 0.0
 
-    search_running = False
-    last_spam_time = 0
+        # Capture -> decision -> key latency, per group and per template
+        self.capture_time = 0.0
+        self.latency = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+        self.template_latency = {data['name']: LatencyHistogram() for data in self.templates}
 
-    # Settings
-    spam_enabled = group_data.get('spam_enabled', False)
-    spam_key = group_data.get('spam_key', None)
-    spam_timing = group_data.get('spam_timing', DEFAULT_TIMING)
-    spam_interval = group_data.get('spam_key_interval', 0.025)
-    search_region = group_data.get('search_region', [0, 0, 100, 100])
+        # Sampled score distributions for threshold tuning (bench/tune_thresholds.py)
+        self.telemetry = None
+        if group_data.get('score_telemetry', DEFAULT_SCORE_TELEMETRY) and self.templates:
+            self.telemetry = ScoreTelemetry([data['name'] for data in self.templates],
+                                            [data['threshold'] for data in self.templates])
 
-    def press_spam_key() -> None:
+        # Settings
+        self.spam_enabled = group_data.get('spam_enabled', False)
+        self.spam_key = group_data.get('spam_key', None)
+        self.spam_timing = group_data.get('spam_timing', DEFAULT_TIMING)
+        self.spam_interval = group_data.get('spam_key_interval', 0.025)
+        # Spam key resolved to a scan code once, not on every press
+        self.spam_combo = compile_key(self.spam_key, self.spam_timing) if self.spam_key else None
+        self.last_spam_time = 0
+
+        # Macro problems found while compiling -> show them in the main log now
+        for data in self.templates:
+            for error in data.get('macro_errors', []):
+                self._put_status({
+                    'group_id': self.group_id,
+                    'type': 'warning',
+                    'message': f"{data['name']} makro: {error}"
+                })
+
+        # Key presses run on their own thread so scanning never waits for a macro
+        self.executor = None if dry_run else ActionExecutor(group_data.get('action_policy', DEFAULT_ACTION_POLICY))
+        # Requested vs actual key timing waits of this group (not per process:
+        # several groups can share one)
+        self.delay_stats = DelayStats()
+
+    def close(self) -> None:
+        """Stop the action executor"""
+        if self.executor is not None:
+            self.executor.stop()
+            self.executor = None
+
+    def _put_status(self, msg: Dict[str, Any]) -> None:
+        if self.status_queue is not None:
+            self.status_queue.put(msg)
+
+    def _report_match(self, msg: Dict[str, Any]) -> None:
+        """Match or indicator reset: status table if there is one, queue otherwise"""
+        if self.status_table is None:
+            self._put_status(msg)
+        elif 'template' in msg:
+            self.status_table.record_match(msg['template'], msg['color'], msg['time_ms'], msg.get('macro_ms'))
+        else:
+            self.status_table.set_indicator(msg['color'])
+
+    def press_spam_key(self) -> None:
         """Press spam key if enabled and interval has passed"""
-        nonlocal last_spam_time
-        if not spam_enabled or not spam_key:
+        if not self.spam_enabled or not self.spam_key:
             return
 
         current_time = time.perf_counter()
-        if current_time - last_spam_time >= spam_interval:
-            press_key_with_timing(spam_key, spam_timing)
-            last_spam_time = current_time
+        if current_time - self.last_spam_time >= self.spam_interval:
+            if self.executor is not None:
+                # Spam only fills gaps, never waits behind a template action
+                if not self.executor.idle:
+                    return
+                self.executor.submit('spam', partial(press_compiled_combo, self.spam_combo, self.delay_stats))
+            self.last_spam_time = current_time
 
-    def process_frame(sct) -> None:
-        """Process single frame for template matching"""
-        nonlocal last_spam_time
+    def grab_gray(self) -> Optional[np.ndarray]:
+        """Grab a frame from the source and return it as grayscale"""
+        prof = self.profiler
+        while True:
+            t0 = time.perf_counter() if prof else 0
+            frame = self.source.grab()
+            if frame is None:
+                return None  # no new frame yet
+            t1 = self.capture_time = time.perf_counter()
+            if frame.shape[:2] != self.gray.shape:
+                # Source delivers another size (e.g. recording) -> resize buffers once
+                self.gray = np.empty(frame.shape[:2], dtype=np.uint8)
+                _allocate_result_buffers(self.templates, self.gray.shape)
+                _apply_rois(self.templates, self.region, self.gray.shape)
+                self.frame_pyramid = _allocate_pyramid_buffers(self.templates, self.gray)
+            # Convert to grayscale (faster matching), straight from BGRA into the buffer
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY, dst=self.gray)
+            if prof:
+                prof.add('capture', t1 - t0)
+                prof.add('convert', time.perf_counter() - t1)
+            # Shared slot overwritten while converting -> retry with the newest frame
+            if self.source.frame_valid():
+                self.frame = frame
+                return gray
 
-        if not loaded_templates:
-            press_spam_key()
-            return
+    def _score(
+        self,
+        data: Dict[str, Any],
+        screenshot_gray: np.ndarray,
+        roi: Optional[tuple] = None
+    ) -> tuple:
+        """
+        Correlate one template against the frame, or only against an ROI window of it.
 
-        frame_start = time.perf_counter()
+        Args:
+            data: Template data dictionary
+            screenshot_gray: Grayscale search region
+            roi: (x1, y1, x2, y2) window in frame coordinates, None for the full frame
 
-        try:
-            # Screen capture with mss (~5x faster than PIL)
-            monitor = {
-                "left": search_region[0],
-                "top": search_region[1],
-                "width": search_region[2] - search_region[0],
-                "height": search_region[3] - search_region[1]
-            }
-            sct_img = sct.grab(monitor)
-            # Convert to grayscale (faster matching)
-            screenshot = np.array(sct_img)[:, :, :3]  # BGRA -> BGR
-            screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-        except Exception as e:
-            logger.error(f"[{group_name}] Screen capture error: {e}")
+        Returns:
+            (max_val, max_loc) with max_loc in frame coordinates; max_val is
+            NaN if the prefilter rejected the template (not scored, never found)
+        """
+        prof = self.profiler
+        if self.prefilter and not self._prefilter_pass(data, screenshot_gray, roi):
+            return math.nan, (0, 0)
+
+        t0 = time.perf_counter() if prof else 0
+        batch_index = data.get('batch_index')
+        if roi is None and batch_index is not None and self._matcher_usable:
+            if not self._matcher_ready:
+                # Frame DFT only once, and only if a batched template is actually scored
+                self.matcher.set_frame(screenshot_gray)
+                self._matcher_ready = True
+                if prof:
+                    t_prep = time.perf_counter()
+                    prof.add('batch_prepare', t_prep - t0)
+                    t0 = t_prep
+            max_val, max_loc = self.matcher.score(batch_index)
+            t1 = time.perf_counter() if prof else 0
+        elif roi is None and data.get('pyramid') is not None:
+            max_val, max_loc = self._pyramid_score(data, screenshot_gray)
+            t1 = time.perf_counter() if prof else 0
+        elif roi is None:
+            result = cv2.matchTemplate(screenshot_gray, data['image'], cv2.TM_CCOEFF_NORMED,
+                                       result=data['result'], mask=data['mask'])
+            if data['mask'] is not None:
+                cv2.patchNaNs(result, 0)  # flat masked windows give NaN, which breaks minMaxLoc
+            t1 = time.perf_counter() if prof else 0
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        else:
+            x1, y1, x2, y2 = roi
+            result = cv2.matchTemplate(screenshot_gray[y1:y2, x1:x2], data['image'], cv2.TM_CCOEFF_NORMED,
+                                       result=data['roi_result'], mask=data['mask'])
+            if data['mask'] is not None:
+                cv2.patchNaNs(result, 0)
+            t1 = time.perf_counter() if prof else 0
+            _, max_val, _, loc = cv2.minMaxLoc(result)
+            max_loc = (loc[0] + x1, loc[1] + y1)
+        if prof:
+            t2 = time.perf_counter()
+            prof.add(f"match:{data['name']}", t1 - t0)
+            prof.add(f"minmax:{data['name']}", t2 - t1)
+            self._match_time += t1 - t0
+            self._minmax_time += t2 - t1
+        return max_val, max_loc
+
+    def _prefilter_pass(self, data: Dict[str, Any], screenshot_gray: np.ndarray, roi: Optional[tuple]) -> bool:
+        """
+        Cheap histogram check: False if the searched area clearly cannot contain the template.
+
+        The frame histogram is computed once per frame; ROI windows get their own.
+        """
+        prof = self.profiler
+        t0 = time.perf_counter() if prof else 0
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            region_hist = intensity_histogram(screenshot_gray[y1:y2, x1:x2], PREFILTER_HIST_BINS)
+        else:
+            if self._frame_hist is None:
+                self._frame_hist = intensity_histogram(screenshot_gray, PREFILTER_HIST_BINS)
+            region_hist = self._frame_hist
+
+        passed = histogram_coverage(region_hist, data['hist'], data['pixels']) >= PREFILTER_MIN_COVERAGE
+
+        stats = self.prefilter_stats.setdefault(data['name'], [0, 0])
+        stats[0] += 1
+        if not passed:
+            stats[1] += 1
+        if prof:
+            prof.add('prefilter', time.perf_counter() - t0)
+        return passed
+
+    def pop_prefilter_stats(self) -> Dict[str, List[int]]:
+        """Per-template [checked, rejected] counts since the last call"""
+        stats = self.prefilter_stats
+        self.prefilter_stats = {}
+        return stats
+
+    def _frame_level(self, level: int) -> np.ndarray:
+        """Downscaled frame of the given pyramid level (built lazily once per frame)"""
+        while self._pyramid_ready < level:
+            self._pyramid_ready += 1
+            cv2.pyrDown(self.frame_pyramid[self._pyramid_ready - 1], dst=self.frame_pyramid[self._pyramid_ready])
+        return self.frame_pyramid[level]
+
+    def _pyramid_score(self, data: Dict[str, Any], screenshot_gray: np.ndarray) -> tuple:
+        """
+        Coarse-to-fine match: correlate the downscaled template with the
+        downscaled frame, then verify the best PYRAMID_CANDIDATES peaks at full
+        resolution in a small window around each.
+
+        Returns:
+            (max_val, max_loc) like a full-resolution scan
+        """
+        if 'full_cost' not in data:
+            # One full-resolution scan per template to measure the speedup against
+            t0 = time.perf_counter()
+            cv2.matchTemplate(screenshot_gray, data['image'], cv2.TM_CCOEFF_NORMED, result=data['result'])
+            data['full_cost'] = time.perf_counter() - t0
+
+        start = time.perf_counter()
+        pyramid = data['pyramid']
+        level = len(pyramid) - 1
+        scale = 1 << level
+        coarse = cv2.matchTemplate(self._frame_level(level), pyramid[level], cv2.TM_CCOEFF_NORMED,
+                                   result=data['coarse_result'])
+
+        height, width = screenshot_gray.shape
+        h, w = data['image'].shape[:2]
+        margin = 2 * scale  # pyrDown rounding moves peaks by up to ~scale pixels
+        best_val, best_loc = -1.0, (0, 0)
+        for _, (cx, cy) in top_peaks(coarse, PYRAMID_CANDIDATES, max(pyramid[level].shape[:2]) // 2):
+            x2 = min(cx * scale + w + margin, width)
+            y2 = min(cy * scale + h + margin, height)
+            x1 = max(min(cx * scale - margin, x2 - w), 0)
+            y1 = max(min(cy * scale - margin, y2 - h), 0)
+            rh, rw = y2 - y1 - h + 1, x2 - x1 - w + 1
+            result = cv2.matchTemplate(screenshot_gray[y1:y2, x1:x2], data['image'], cv2.TM_CCOEFF_NORMED,
+                                       result=data['verify_result'][:rh * rw].reshape(rh, rw))
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val > best_val:
+                best_val, best_loc = max_val, (max_loc[0] + x1, max_loc[1] + y1)
+            if best_val >= data['threshold']:
+                break
+
+        self.pyramid_cost += time.perf_counter() - start
+        self.pyramid_full_cost += data['full_cost']
+        return best_val, best_loc
+
+    def pop_pyramid_speedup(self) -> Optional[float]:
+        """Estimated pyramid speedup since the last call (None if no pyramid scans ran)"""
+        if self.pyramid_cost <= 0:
+            return None
+        speedup = self.pyramid_full_cost / self.pyramid_cost
+        self.pyramid_full_cost = self.pyramid_cost = 0.0
+        return speedup
+
+    def _color_pass(self, data: Dict[str, Any], max_loc: tuple) -> bool:
+        """
+        Compare the mean color of the frame under a match with the template's.
+
+        One cv2.mean over the template-sized window (masked pixels excluded),
+        a few microseconds. Without a color frame (match() called directly on a
+        gray image) the check passes.
+        """
+        if self.frame is None:
+            return True
+        prof = self.profiler
+        t0 = time.perf_counter() if prof else 0
+        x, y = max_loc
+        h, w = data['image'].shape[:2]
+        # A shared slot may already hold a newer frame; a few pixels of it only
+        # shift the mean for that one frame
+        mean = cv2.mean(self.frame[y:y + h, x:x + w], mask=data['mask'])
+        passed = color_matches(data['color_mode'], data['color_mean'], data['color_hs'], mean,
+                               data['color_tolerance'])
+        if prof:
+            prof.add(f"color:{data['name']}", time.perf_counter() - t0)
+        return passed
+
+    def _learn_roi(self, data: Dict[str, Any], max_loc: tuple) -> None:
+        """Move an auto ROI template's window to a padded box around its match"""
+        height, width = self.gray.shape
+        h, w = data['image'].shape[:2]
+        roi = (
+            max(max_loc[0] - ROI_PADDING_PX, 0),
+            max(max_loc[1] - ROI_PADDING_PX, 0),
+            min(max_loc[0] + w + ROI_PADDING_PX, width),
+            min(max_loc[1] + h + ROI_PADDING_PX, height)
+        )
+        if roi == data.get('roi'):
             return
 
-        triggered_template = None
+        _set_roi(data, roi)
+        # Report in screen coordinates so the main process can store it in the config
+        x0, y0 = self.region[0], self.region[1]
+        self._put_status({
+            'group_id': self.group_id,
+            'type': 'roi',
+            'template': data['name'],
+            'file': data['file'],
+            'roi': [roi[0] + x0, roi[1] + y0, roi[2] + x0, roi[3] + y0]
+        })
+
+    def match(self, screenshot_gray: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Run templates in order and return the first one whose trigger condition holds.
+
+        Templates with an ROI are only correlated against their window. Auto ROI
+        templates fall back to a full scan until they are found, every
+        ROI_FULL_SCAN_INTERVAL scans, and before a "not found" triggers.
+
+        Args:
+            screenshot_gray: Grayscale search region
+
+        Returns:
+            Template data dictionary, or None if nothing triggered
+        """
+        prof = self.profiler
+        self._match_time = self._minmax_time = 0.0
+        # Unexpected frame size -> use matchTemplate for everything
+        self._matcher_usable = self.matcher is not None and screenshot_gray.shape == self.matcher.frame_shape
+        self._matcher_ready = False
+        self._pyramid_ready = 0
+        self._frame_hist = None
+        triggered = None
+        telemetry = self.telemetry if self.telemetry is not None and self.telemetry.sample() else None
 
-        for data in loaded_templates:
+        for index, data in enumerate(self.templates):
             try:
-                result = cv2.matchTemplate(screenshot_gray, data['image'], cv2.TM_CCOEFF_NORMED)
-                _, max_val, _, _ = cv2.minMaxLoc(result)
+                trigger_condition = data.get('trigger_condition', TRIGGER_CONDITION_FOUND)
+                auto_roi = data.get('roi_mode') == ROI_MODE_AUTO
+
+                roi = data.get('roi')
+                if auto_roi and roi is not None:
+                    data['roi_age'] += 1
+                    if data['roi_age'] >= ROI_FULL_SCAN_INTERVAL:
+                        roi = None  # periodic full scan, follows an icon that moved
 
+                max_val, max_loc = self._score(data, screenshot_gray, roi)
                 is_found = max_val >= data['threshold']
-                trigger_condition = data.get('trigger_condition', TRIGGER_CONDITION_FOUND)
+
+                if auto_roi and roi is not None and not is_found and trigger_condition == TRIGGER_CONDITION_NOT_FOUND:
+                    # Confirm the miss on the whole region before acting on it
+                    roi = None
+                    max_val, max_loc = self._score(data, screenshot_gray)
+                    is_found = max_val >= data['threshold']
+
+                if auto_roi and roi is None:
+                    data['roi_age'] = 0
+                    if is_found:
+                        self._learn_roi(data, max_loc)
+
+                # Shape found -> does the tint match too (ready vs cooldown / out of range)
+                if is_found and data['color_mode'] != COLOR_MODE_OFF:
+                    is_found = self._color_pass(data, max_loc)
+
+                if self.scores is not None:
+                    self.scores[data['name']] = max_val
+                if telemetry is not None and not math.isnan(max_val):
+                    telemetry.record(index, max_val)  # prefilter-skipped stays NaN
 
                 # Tetikleme koşuluna göre kontrol et
                 should_trigger = False
@@ -116,142 +516,938 @@ def group_worker(
                     should_trigger = True
 
                 if should_trigger:
-                    triggered_template = data
+                    triggered = data
+                    if self.scores is not None:
+                        self._unscored = self.templates[index + 1:]
+                        self._unscored_frame = self.capture_time
                     break
             except Exception as e:
-                logger.error(f"[{group_name}] Template match error: {e}")
+                logger.error(f"[{self.name}] Template match error: {e}")
+
+        if prof:
+            prof.add('match', self._match_time)
+            prof.add('minmax', self._minmax_time)
+
+        return triggered
+
+    def score_unscored(self) -> None:
+        """
+        Test mode: score the templates match() skipped on the current frame
+        after an earlier one triggered, so every template shows a live value.
+
+        Only runs right after the frame that was matched (per-frame caches
+        still belong to it); call it outside the timed part of the loop.
+        """
+        if self.scores is None or not self._unscored or self._unscored_frame != self.capture_time:
+            return
+        for data in self._unscored:
+            try:
+                self.scores[data['name']] = self._score(data, self.gray, data.get('roi'))[0]
+            except Exception as e:
+                logger.error(f"[{self.name}] Template match error: {e}")
+        self._unscored = []
+
+    def dispatch(self, template: Dict[str, Any], frame_time_ms: float) -> None:
+        """Report the match and run the template's macro or key combo on the executor"""
+        match_msg = {
+            'group_id': self.group_id,
+            'type': 'match',
+            'color': template['color'],
+            'template': template['name'],
+            'time_ms': round(frame_time_ms, 2)
+        }
+        # Reset indicator to green after execution
+        reset_msg = {
+            'group_id': self.group_id,
+            'type': 'match',
+            'color': '#00FF00'
+        }
+
+        captured = self.capture_time
+        template_latency = self.template_latency[template['name']]
+
+        if self.executor is None:
+            self._report_match(match_msg)
+            self._report_match(reset_msg)
+            self._record_action_latency(template_latency, captured, done=False)
+            self._record_action_latency(template_latency, captured, done=True)
+            return
+
+        # Execute macro or simple key press (both resolved at load)
+        if template.get('compiled_macro') is not None:
+            press = partial(run_macro, template['compiled_macro'], self.delay_stats)
+            match_msg['macro_ms'] = template['macro_ms']
+        else:
+            press = partial(press_compiled_combo, template['compiled_combo'], self.delay_stats)
+
+        def action():
+            self._record_action_latency(template_latency, captured, done=False)
+            self._report_match(match_msg)
+            try:
+                press()
+            finally:
+                self._record_action_latency(template_latency, captured, done=True)
+                self._report_match(reset_msg)
+
+        # Rejected (busy, per action_policy) -> the next frame decides again
+        self.executor.submit(template['name'], action)
+
+    def _record_action_latency(self, template_latency: LatencyHistogram, captured: float, done: bool) -> None:
+        elapsed = time.perf_counter() - captured
+        if done:
+            self.latency['complete'].record(elapsed)
+        else:
+            self.latency['dispatch'].record(elapsed)
+            template_latency.record(elapsed)
+
+    def latency_report(self) -> Dict[str, Any]:
+        """
+        Latency histograms for a JSON dump.
+
+        Returns:
+            {'group', 'stages': {stage: histogram}, 'templates': {name: capture -> dispatch histogram}}
+        """
+        return {
+            'group': self.name,
+            'stages': {stage: hist.to_dict() for stage, hist in self.latency.items()},
+            'templates': {name: hist.to_dict() for name, hist in self.template_latency.items() if hist.total}
+        }
+
+    def frame_unchanged(self, screenshot_gray: np.ndarray) -> bool:
+        """
+        True if the frame differs from the last matched one by at most
+        CHANGE_GATE_THRESHOLD gray levels on a 1/CHANGE_GATE_SCALE signature.
+
+        The reference is only replaced when matching runs, so slow drift still
+        adds up; after CHANGE_GATE_MAX_SKIP reused frames matching is forced.
+        """
+        height, width = screenshot_gray.shape
+        size = (max(width // CHANGE_GATE_SCALE, 1), max(height // CHANGE_GATE_SCALE, 1))
+        if self._gate_sig is None or self._gate_sig.shape != (size[1], size[0]):
+            self._gate_sig = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._gate_ref = np.empty_like(self._gate_sig)
+            self._gate_diff = np.empty_like(self._gate_sig)
+            self._gate_age = None
+
+        cv2.resize(screenshot_gray, size, dst=self._gate_sig, interpolation=cv2.INTER_AREA)
+        if self._gate_age is not None and self._gate_age < CHANGE_GATE_MAX_SKIP:
+            cv2.absdiff(self._gate_sig, self._gate_ref, dst=self._gate_diff)
+            if cv2.minMaxLoc(self._gate_diff)[1] <= CHANGE_GATE_THRESHOLD:
+                self._gate_age += 1
+                return True
+
+        # Changed (or forced): this frame becomes the new reference
+        self._gate_sig, self._gate_ref = self._gate_ref, self._gate_sig
+        self._gate_age = 0
+        return False
+
+    def process_frame(self) -> bool:
+        """Process single frame for template matching, returns False if no frame was available"""
+        if not self.templates:
+            self.press_spam_key()
+            return True
+
+        frame_start = time.perf_counter()
+
+        try:
+            screenshot_gray = self.grab_gray()
+        except Exception as e:
+            logger.error(f"[{self.name}] Screen capture error: {e}")
+            return False
+        if screenshot_gray is None:
+            return False
+
+        prof = self.profiler
+        if self.change_gate:
+            t0 = time.perf_counter() if prof else 0
+            unchanged = self.frame_unchanged(screenshot_gray)
+            if prof:
+                prof.add('gate', time.perf_counter() - t0)
+        else:
+            unchanged = False
+
+        if unchanged:
+            # Same picture as last time -> same decision, no matching
+            triggered_template = self._last_triggered
+            self.gate_skipped += 1
+        else:
+            triggered_template = self.match(screenshot_gray)
+            self._last_triggered = triggered_template
 
         frame_time_ms = (time.perf_counter() - frame_start) * 1000
 
+        t0 = time.perf_counter() if prof else 0
         if triggered_template:
-            # Send match status to main process
-            status_queue.put({
-                'group_id': group_id,
-                'type': 'match',
-                'color': triggered_template['color'],
-                'template': triggered_template['name'],
-                'time_ms': round(frame_time_ms, 2)
+            self.latency['decide'].record(time.perf_counter() - self.capture_time)
+            self.dispatch(triggered_template, frame_time_ms)
+        else:
+            self.press_spam_key()
+        if prof:
+            now = time.perf_counter()
+            prof.add('dispatch', now - t0)
+            prof.add('frame', now - frame_start)
+
+        return True
+
+
+class _GroupSlot:
+    """
+    One group inside a worker process: runner, frame source, pacing, toggle
+    state and FPS bookkeeping.
+
+    Args:
+        group_data: Group configuration dictionary
+        control: Shared control block of the group
+        status_queue: Queue for rare status events
+        status_table: Shared status for matches and FPS reports (optional)
+        frame_bus: Shared capture info (optional)
+    """
+
+    def __init__(
+        self,
+        group_data: Dict[str, Any],
+        control: WorkerControl,
+        status_queue: Queue,
+        status_table: Optional[WorkerStatus],
+        frame_bus: Optional[Dict[str, Any]]
+    ):
+        self.group_data = group_data
+        self.group_id = group_data['id']
+        self.name = group_data['name']
+        self.control = control
+        self.status_queue = status_queue
+        self.status_table = status_table
+        self.frame_bus = frame_bus
+
+        self.source = _open_frame_source(group_data, frame_bus)
+        self.runner = GroupRunner(group_data, self.source, status_queue,
+                                  dry_run=_replay_dry_run(group_data, self.source, status_queue),
+                                  status_table=status_table)
+        self.pacer = FramePacer(group_data.get('target_fps', DEFAULT_TARGET_FPS))
+        self.running = False
+        self.removed = False
+
+        # FPS tracking
+        self.frame_count = 0
+        self.fps_start_time = time.perf_counter()
+        self.last_fps_report = time.perf_counter()
+
+        self.toggle_time = None  # set on start until the first frame is done
+        self.toggle_latency_ms = None
+
+        logger.info(f"[{self.name}] Worker started")
+        status_queue.put({'group_id': self.group_id, 'type': 'status', 'status': 'ready'})
+
+    def _reset_fps(self) -> None:
+        self.frame_count = 0
+        self.fps_start_time = time.perf_counter()
+
+    def poll(self) -> None:
+        """Apply toggles and commands from the main process"""
+        control = self.control
+
+        # Scanning state: one shared memory read per frame
+        if control.active != self.running:
+            self.running = control.active
+            self.source.set_active(self.running)
+            status = 'running' if self.running else 'stopped'
+            self.status_queue.put({
+                'group_id': self.group_id,
+                'type': 'status',
+                'status': status
             })
+            logger.info(f"[{self.name}] {'Started' if self.running else 'Stopped'}")
+            self.pacer.reset()
+            self.toggle_time = control.toggle_time if self.running else None
+            self._reset_fps()
 
-            # Execute macro or simple key press
-            if triggered_template.get('use_macro') and triggered_template.get('macro'):
-                execute_macro(triggered_template['macro'])
+        for cmd in control.poll_commands():
+            if cmd.get('action') == 'reload':
+                self.reload(cmd['group'])
+            elif cmd.get('action') == 'remove':
+                self.removed = True
             else:
-                press_key_combo(triggered_template['key_combo'], triggered_template.get('timing', {}))
+                logger.warning(f"[{self.name}] Unknown command: {cmd.get('action')}")
 
-            # Reset indicator to green after execution
-            status_queue.put({
-                'group_id': group_id,
-                'type': 'match',
-                'color': '#00FF00'
-            })
+    def reload(self, group_data: Dict[str, Any]) -> None:
+        """Edited group definition: swap templates/settings without respawning"""
+        reload_start = time.perf_counter()
+        try:
+            self.runner, self.source = _reload_runner(
+                self.runner, self.source, self.group_data, group_data, self.frame_bus,
+                self.status_queue, self.status_table, self.running
+            )
+        except Exception as e:
+            logger.error(f"[{self.name}] Reload error, keeping the old settings: {e}")
+            self.status_queue.put({'group_id': self.group_id, 'type': 'warning',
+                                   'message': f"Ayarlar yüklenemedi: {e}"})
+            return
+        self.group_data = group_data
+        self.name = group_data['name']
+        self.pacer = FramePacer(group_data.get('target_fps', DEFAULT_TARGET_FPS))
+        self._reset_fps()
+        reload_ms = (time.perf_counter() - reload_start) * 1000
+        logger.info(f"[{self.name}] Reloaded in {reload_ms:.1f} ms")
+        self.status_queue.put({'group_id': self.group_id, 'type': 'status', 'status': 'reloaded',
+                               'reload_ms': round(reload_ms, 1)})
+
+    def step(self) -> None:
+        """Process one frame (the caller has waited for the pacer) and report FPS"""
+        self.pacer.frame_started()
+        try:
+            if self.runner.process_frame():
+                self.frame_count += 1
+        except Exception as e:
+            logger.error(f"[{self.name}] Frame processing error: {e}")
+
+        # Toggle key -> first processed frame
+        if self.toggle_time is not None:
+            self.toggle_latency_ms = (time.perf_counter() - self.toggle_time) * 1000
+            self.toggle_time = None
+            logger.info(f"[{self.name}] First frame {self.toggle_latency_ms:.2f} ms after toggle")
+
+        # Report FPS every 500ms
+        current_time = time.perf_counter()
+        if current_time - self.last_fps_report >= FPS_REPORT_INTERVAL_SEC:
+            self.report_fps(current_time)
+
+    def report_fps(self, current_time: float) -> None:
+        runner = self.runner
+        pacer = self.pacer
+        elapsed = current_time - self.fps_start_time
+        fps = self.frame_count / elapsed if elapsed > 0 else 0
+        fps_msg = {
+            'group_id': self.group_id,
+            'type': 'fps',
+            'fps': round(fps, 1),
+            'name': self.name
+        }
+        key_latency = runner.latency['dispatch'].summary()
+        if key_latency is not None:
+            fps_msg['latency_p50_ms'] = key_latency['p50_ms']
+            fps_msg['latency_p95_ms'] = key_latency['p95_ms']
+            fps_msg['latency_p99_ms'] = key_latency['p99_ms']
+        if self.toggle_latency_ms is not None:
+            fps_msg['toggle_latency_ms'] = round(self.toggle_latency_ms, 2)
+        if pacer.target_fps:
+            fps_msg['target_fps'] = pacer.target_fps
+            jitter = pacer.pop_jitter_ms()
+            if jitter is not None:
+                fps_msg['jitter_ms'] = round(jitter, 2)
+        key_delays = runner.delay_stats.pop_summary()
+        if key_delays is not None:
+            fps_msg['key_delay_overshoot_ms'] = round(key_delays['mean_overshoot_ms'], 3)
+        speedup = runner.pop_pyramid_speedup()
+        if speedup is not None:
+            fps_msg['pyramid_speedup'] = round(speedup, 1)
+        prefilter_stats = runner.pop_prefilter_stats()
+        if prefilter_stats:
+            checked = sum(c for c, _ in prefilter_stats.values())
+            rejected = sum(r for _, r in prefilter_stats.values())
+            fps_msg['prefilter_reject_rate'] = round(rejected / checked * 100, 1)
+        if self.status_table is not None:
+            self.status_table.publish_report(fps_msg)
         else:
-            press_spam_key()
+            self.status_queue.put(fps_msg)
+        self.last_fps_report = current_time
 
-    # Main loop
-    logger.info(f"[{group_name}] Worker started")
-    status_queue.put({'group_id': group_id, 'type': 'status', 'status': 'ready'})
+        # Reset FPS counter every 5 seconds (prevent overflow)
+        if elapsed >= FPS_RESET_INTERVAL_SEC:
+            self.frame_count = 0
+            self.fps_start_time = current_time
 
-    # FPS tracking
-    frame_count = 0
-    fps_start_time = time.perf_counter()
-    last_fps_report = time.perf_counter()
+    def close(self) -> None:
+        if self.running:
+            self.source.set_active(False)
+        self.runner.close()
+        self.source.close()
+        _write_latency_report(self.runner)
+        _write_score_telemetry(self.runner)
+        logger.info(f"[{self.name}] Worker stopped")
 
-    # Create mss instance (one per worker)
-    with mss.mss() as sct:
-        while running_flag.value:
-            # Check for commands
-            try:
-                while not command_queue.empty():
-                    cmd = command_queue.get_nowait()
-                    if cmd.get('action') == 'toggle':
-                        search_running = not search_running
-                        status = 'running' if search_running else 'stopped'
-                        status_queue.put({
-                            'group_id': group_id,
-                            'type': 'status',
-                            'status': status
-                        })
-                        logger.info(f"[{group_name}] {'Started' if search_running else 'Stopped'}")
-                        # Reset FPS counter
-                        frame_count = 0
-                        fps_start_time = time.perf_counter()
-                    elif cmd.get('action') == 'stop':
-                        search_running = False
-                        status_queue.put({
-                            'group_id': group_id,
-                            'type': 'status',
-                            'status': 'stopped'
-                        })
-            except Exception as e:
-                logger.error(f"[{group_name}] Command queue error: {e}")
-
-            # Process frame if running
-            if search_running:
-                try:
-                    process_frame(sct)
-                    frame_count += 1
-                except Exception as e:
-                    logger.error(f"[{group_name}] Frame processing error: {e}")
-
-                # Report FPS every 500ms
-                current_time = time.perf_counter()
-                elapsed = current_time - fps_start_time
-
-                if current_time - last_fps_report >= FPS_REPORT_INTERVAL_SEC:
-                    fps = frame_count / elapsed if elapsed > 0 else 0
-                    status_queue.put({
-                        'group_id': group_id,
-                        'type': 'fps',
-                        'fps': round(fps, 1),
-                        'name': group_name
-                    })
-                    last_fps_report = current_time
-
-                    # Reset FPS counter every 5 seconds (prevent overflow)
-                    if elapsed >= FPS_RESET_INTERVAL_SEC:
-                        frame_count = 0
-                        fps_start_time = current_time
-            else:
-                # Sleep when idle (reduce CPU usage)
-                time.sleep(IDLE_SLEEP_SEC)
 
-    logger.info(f"[{group_name}] Worker stopped")
+def _run_groups(
+    groups: List[Dict[str, Any]],
+    controls: List[WorkerControl],
+    status_queue: Queue,
+    running_flag: Value,
+    frame_bus: Optional[Dict[str, Any]],
+    spin_threshold: float,
+    status_tables: List[Optional[WorkerStatus]],
+    cv_threads: int = 0
+) -> None:
+    """
+    Worker main loop for one or more groups.
+
+    Running groups are served round-robin, one frame each per pass; a group
+    with a target FPS is skipped until its pacer is due. When no group is due
+    the loop sleeps until the earliest deadline, when none is running it
+    blocks on the (shared) wake Event of the controls.
+    """
+    # Precise key timings: 1 ms timer resolution + sleep/spin hybrid waits
+    high_res_timer = enable_high_resolution_timer()
+    set_spin_threshold(spin_threshold)
+
+    # Match OpenCV's thread pool to the CPUs this worker was given
+    if cv_threads > 0:
+        cv2.setNumThreads(cv_threads)
+
+    slots = []
+    for group_data, control, status_table in zip(groups, controls, status_tables):
+        try:
+            slots.append(_GroupSlot(group_data, control, status_queue, status_table, frame_bus))
+        except Exception as e:
+            logger.error(f"[{group_data.get('name')}] Worker start error: {e}")
+
+    while running_flag.value and slots:
+        for slot in slots:
+            slot.poll()
+        if any(slot.removed for slot in slots):
+            for slot in slots:
+                if slot.removed:
+                    slot.close()
+            slots = [slot for slot in slots if not slot.removed]
+
+        running = [slot for slot in slots if slot.running]
+        if not running:
+            # Block until toggled (timeout only to notice shutdown)
+            if slots:
+                slots[0].control.wait(CONTROL_WAIT_TIMEOUT_SEC)
+            continue
+
+        stepped = False
+        next_due = None
+        for slot in running:
+            remaining = slot.pacer.remaining()
+            if remaining <= 0:
+                slot.step()
+                stepped = True
+            elif next_due is None or remaining < next_due:
+                next_due = remaining
+        if not stepped and next_due is not None:
+            precise_sleep(min(next_due, CONTROL_WAIT_TIMEOUT_SEC))
+
+    for slot in slots:
+        slot.close()
+    if high_res_timer:
+        disable_high_resolution_timer()
 
 
-def _load_templates(group_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def group_worker(
+    group_data: Dict[str, Any],
+    control: WorkerControl,
+    status_queue: Queue,
+    running_flag: Value,
+    frame_bus: Optional[Dict[str, Any]] = None,
+    spin_threshold: float = TIMER_SPIN_THRESHOLD_SEC,
+    status_table: Optional[WorkerStatus] = None,
+    cv_threads: int = 0
+) -> None:
+    """
+    Worker process for each group.
+    Runs independently and listens for commands.
+
+    Args:
+        group_data: Group configuration dictionary
+        control: Shared control block (scanning state, commands)
+        status_queue: Queue for sending status updates to main process
+        running_flag: Shared flag to signal process termination
+        frame_bus: Optional shared capture info {'name': shm name, 'active': Value,
+            'ready': Condition}.
+            When given, frames are read from the capture server instead of mss.
+            Replay and synthetic sources always run with keys disabled (dry run).
+        spin_threshold: Busy-wait part of precise waits (key timings, frame pacing)
+        status_table: Shared status for matches and FPS reports. When given,
+            only rare events (started/stopped, warnings, ROIs) use status_queue.
+        cv_threads: OpenCV threads for this process (0 = OpenCV default)
+    """
+    _run_groups([group_data], [control], status_queue, running_flag, frame_bus, spin_threshold, [status_table],
+                cv_threads)
+
+
+def multi_group_worker(
+    groups: List[Dict[str, Any]],
+    controls: List[WorkerControl],
+    status_queue: Queue,
+    running_flag: Value,
+    frame_bus: Optional[Dict[str, Any]] = None,
+    spin_threshold: float = TIMER_SPIN_THRESHOLD_SEC,
+    status_tables: Optional[List[Optional[WorkerStatus]]] = None,
+    cv_threads: int = 0
+) -> None:
+    """
+    Worker process hosting several groups (see plan_worker_processes).
+
+    Saves one interpreter, OpenCV thread pool and import per group; the
+    groups take turns frame by frame. Controls should share one wake Event.
+    A group's 'remove' command drops it, the process exits when none is left.
+
+    Args:
+        groups: Group configuration dictionaries
+        controls: Control block of each group (same order)
+        status_queue: Queue for sending status updates to main process
+        running_flag: Shared flag to signal process termination
+        frame_bus: Optional shared capture info (see group_worker)
+        spin_threshold: Busy-wait part of precise waits (key timings, frame pacing)
+        status_tables: Shared status of each group (same order, optional)
+        cv_threads: OpenCV threads for this process (0 = OpenCV default)
+    """
+    if status_tables is None:
+        status_tables = [None] * len(groups)
+    _run_groups(groups, controls, status_queue, running_flag, frame_bus, spin_threshold, status_tables, cv_threads)
+
+
+class _TestSlot:
+    """
+    One group in a test mode process: a dry-run GroupRunner that records
+    every template's score, paced like the bot or at the test rate.
+
+    Args:
+        group_data: Group configuration dictionary
+        result_queue: Queue the scores and FPS are reported to
+        test_fps: Frame rate of the test (0 = the group's own target FPS)
+    """
+
+    def __init__(self, group_data: Dict[str, Any], result_queue: Queue, test_fps: float):
+        self.group_id = group_data['id']
+        self.name = group_data['name']
+        self.result_queue = result_queue
+        self.source = _open_frame_source(group_data, None)
+        try:
+            self.runner = GroupRunner(group_data, self.source, dry_run=True, record_scores=True)
+        except Exception:
+            self.source.close()
+            raise
+        self.pacer = FramePacer(test_fps or group_data.get('target_fps', DEFAULT_TARGET_FPS))
+
+        self.frame_count = 0
+        self.extra_time = 0.0  # scoring the bot would skip, left out of the FPS
+        self.fps_start_time = self.last_report = time.perf_counter()
+        self.fps = None
+
+    def step(self) -> None:
+        """Process one frame like the bot, then report if the interval passed"""
+        self.pacer.frame_started()
+        try:
+            if self.runner.process_frame():
+                self.frame_count += 1
+        except Exception as e:
+            logger.error(f"[{self.name}] Frame processing error: {e}")
+
+        current_time = time.perf_counter()
+        if current_time - self.last_report >= TEST_CYCLE_INTERVAL_MS / 1000:
+            self.report(current_time)
+
+    def report(self, current_time: float) -> None:
+        runner = self.runner
+        runner.score_unscored()
+        self.extra_time += time.perf_counter() - current_time
+
+        elapsed = current_time - self.fps_start_time - self.extra_time
+        if current_time - self.fps_start_time >= FPS_REPORT_INTERVAL_SEC and elapsed > 0:
+            self.fps = self.frame_count / elapsed
+            if current_time - self.fps_start_time >= FPS_RESET_INTERVAL_SEC:
+                self.frame_count = 0
+                self.extra_time = 0.0
+                self.fps_start_time = current_time
+        msg = {
+            'group_id': self.group_id,
+            'type': 'test',
+            'scores': dict(runner.scores),
+            'fps': round(self.fps, 1) if self.fps is not None else None
+        }
+        if self.pacer.target_fps:
+            msg['target_fps'] = self.pacer.target_fps
+        self.result_queue.put(msg)
+        self.last_report = time.perf_counter()
+
+    def close(self) -> None:
+        self.runner.close()
+        self.source.close()
+
+
+def test_worker(
+    groups: List[Dict[str, Any]],
+    result_queue: Queue,
+    running_flag: Value,
+    test_fps: float = 0,
+    cv_threads: int = 0
+) -> None:
+    """
+    Test mode process: runs the bot's capture -> match pipeline on the given
+    groups without pressing keys and reports every template's score.
+
+    Started with the same process plan as the bot, so the reported FPS is the
+    rate the bot reaches. Scores the bot would not compute (templates after
+    the one that triggered) are filled in once per report and left out of
+    the FPS.
+
+    Args:
+        groups: Group configuration dictionaries
+        result_queue: Queue for {'type': 'test', 'group_id', 'scores', 'fps'} reports
+        running_flag: Shared flag to signal process termination
+        test_fps: Frame rate of the test (0 = each group's target FPS, like the bot)
+        cv_threads: OpenCV threads for this process (0 = OpenCV default)
+    """
+    high_res_timer = enable_high_resolution_timer()
+    if cv_threads > 0:
+        cv2.setNumThreads(cv_threads)
+
+    slots = []
+    for group_data in groups:
+        try:
+            slots.append(_TestSlot(group_data, result_queue, test_fps))
+        except Exception as e:
+            logger.error(f"[{group_data.get('name')}] Test start error: {e}")
+            result_queue.put({'group_id': group_data.get('id'), 'type': 'warning',
+                              'message': f"Test başlatılamadı: {e}"})
+
+    while running_flag.value and slots:
+        stepped = False
+        next_due = None
+        for slot in slots:
+            remaining = slot.pacer.remaining()
+            if remaining <= 0:
+                slot.step()
+                stepped = True
+            elif next_due is None or remaining < next_due:
+                next_due = remaining
+        if not stepped and next_due is not None:
+            precise_sleep(min(next_due, CONTROL_WAIT_TIMEOUT_SEC))
+
+    for slot in slots:
+        slot.close()
+    if high_res_timer:
+        disable_high_resolution_timer()
+
+
+def plan_worker_processes(groups: List[Dict[str, Any]], process_count: int) -> List[List[Dict[str, Any]]]:
+    """
+    Spread groups over worker processes.
+
+    Groups are dealt out by template count (largest first, each to the
+    process with the fewest templates so far) so the matching load is even.
+
+    Args:
+        groups: Enabled group configuration dictionaries
+        process_count: Number of processes (0 = one process per group)
+
+    Returns:
+        One list of groups per process (empty processes are left out)
+    """
+    if process_count <= 0 or process_count >= len(groups):
+        return [[group] for group in groups]
+
+    plan: List[List[Dict[str, Any]]] = [[] for _ in range(process_count)]
+    load = [0] * process_count
+    for group in sorted(groups, key=lambda g: len(g.get('templates', [])), reverse=True):
+        index = load.index(min(load))
+        plan[index].append(group)
+        load[index] += max(len(group.get('templates', [])), 1)
+    return [bucket for bucket in plan if bucket]
+
+
+def _open_frame_source(group_data: Dict[str, Any], frame_bus: Optional[Dict[str, Any]]) -> FrameSource:
+    """Open the group's frame source (live mss, shared capture, replay or synthetic), mss on failure"""
+    source = create_frame_source(group_data, frame_bus, IMAGES_FOLDER)
+    try:
+        source.open()
+    except Exception as e:
+        logger.error(f"[{group_data['name']}] Frame source error, falling back to mss: {e}")
+        source = MssFrameSource(group_data.get('search_region', [0, 0, 100, 100]))
+        source.open()
+    return source
+
+
+def _replay_dry_run(group_data: Dict[str, Any], source: FrameSource, status_queue: Queue) -> bool:
+    """
+    True (keys off) if the source is not the live screen: the bot must not
+    press real keys for recorded or synthetic frames. Warns the user.
+    """
+    if source.live:
+        return False
+    logger.warning(f"[{group_data['name']}] {type(source).__name__} is not a live source, keys are disabled")
+    status_queue.put({'group_id': group_data['id'], 'type': 'warning',
+                      'message': "Canlı olmayan kare kaynağı (kayıt / sentetik): tuşlara basılmayacak"})
+    return True
+
+
+def _reload_runner(
+    runner: GroupRunner,
+    source: FrameSource,
+    old_group: Dict[str, Any],
+    new_group: Dict[str, Any],
+    frame_bus: Optional[Dict[str, Any]],
+    status_queue: Queue,
+    status_table: Optional[WorkerStatus],
+    active: bool
+) -> tuple:
+    """
+    Build a runner (and a new frame source if the region changed) for an edited group.
+
+    The old runner and source are closed only after the new ones loaded, so a
+    broken edit leaves the worker running with the old settings. Latency
+    histograms carry over.
+
+    Returns:
+        (runner, source)
+    """
+    new_source = source
+    if (new_group.get('search_region') != old_group.get('search_region')
+            or new_group.get('frame_source') != old_group.get('frame_source')):
+        new_source = _open_frame_source(new_group, frame_bus)
+    dry_run = not new_source.live
+    if new_source is not source:
+        dry_run = _replay_dry_run(new_group, new_source, status_queue)
+    try:
+        new_runner = GroupRunner(new_group, new_source, status_queue, dry_run=dry_run, status_table=status_table)
+    except Exception:
+        if new_source is not source:
+            new_source.close()
+        raise
+
+    new_runner.latency = runner.latency
+    for name, hist in runner.template_latency.items():
+        if name in new_runner.template_latency:
+            new_runner.template_latency[name] = hist
+    # Scores were taken with the old templates/thresholds -> save them separately
+    _write_score_telemetry(runner)
+    runner.close()
+
+    if new_source is not source:
+        if active:
+            source.set_active(False)
+            new_source.set_active(True)
+        source.close()
+    return new_runner, new_source
+
+
+def _write_latency_report(runner: GroupRunner, folder: Path = LATENCY_FOLDER) -> None:
+    """Dump the runner's latency histograms to latency/<group>.json if anything fired"""
+    if not runner.latency['decide'].total:
+        return
+    try:
+        folder.mkdir(exist_ok=True)
+        path = folder / f"{get_safe_folder_name(runner.name)}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(runner.latency_report(), f, indent=2, ensure_ascii=False)
+        logger.info(f"[{runner.name}] Latency report written to {path}")
+    except Exception as e:
+        logger.error(f"[{runner.name}] Latency report error: {e}")
+
+
+def _write_score_telemetry(runner: GroupRunner, folder: Path = TELEMETRY_FOLDER) -> None:
+    """Save the runner's sampled scores to telemetry/<group>_<time>.npz if it recorded any"""
+    if runner.telemetry is None or not runner.telemetry.rows:
+        return
+    try:
+        folder.mkdir(exist_ok=True)
+        path = folder / f"{get_safe_folder_name(runner.name)}_{time.strftime('%Y%m%d-%H%M%S')}.npz"
+        runner.telemetry.save(path, runner.name)
+        logger.info(f"[{runner.name}] Score telemetry written to {path}")
+    except Exception as e:
+        logger.error(f"[{runner.name}] Score telemetry error: {e}")
+
+
+def _load_templates(
+    group_data: Dict[str, Any],
+    images_folder: Path = IMAGES_FOLDER,
+    cache: Optional[TemplateCache] = None
+) -> List[Dict[str, Any]]:
     """
     Load and prepare templates for matching.
 
+    Images come from the template cache: decoded once per content hash and
+    memory-mapped, so starts and reloads do not decode PNGs again.
+
     Args:
         group_data: Group configuration dictionary
+        images_folder: Base folder of template images
+        cache: Template cache (default: the process-wide one)
 
     Returns:
         List of template data dictionaries with loaded images
     """
     loaded_templates = []
+    pyramid_matching = group_data.get('pyramid_matching', DEFAULT_PYRAMID_MATCHING)
+    cache = cache or get_template_cache()
 
     for template in group_data.get('templates', []):
         if not template.get('enabled', True):
             continue
 
-        template_path = IMAGES_FOLDER / template['file']
-        if template_path.exists():
-            # UTF-8 path desteği için numpy ile oku
-            img = cv2.imdecode(np.fromfile(str(template_path), dtype=np.uint8), cv2.IMREAD_COLOR)
-            if img is not None:
-                # Convert to grayscale (3x faster matching)
-                img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                loaded_templates.append({
-                    'name': template['name'],
-                    'image': img_gray,
-                    'threshold': template['threshold'],
-                    'key_combo': template.get('key_combo', ''),
-                    'color': template.get('color', '#00ff88'),
-                    'timing': template.get('timing', DEFAULT_TIMING),
-                    'trigger_condition': template.get('trigger_condition', DEFAULT_TRIGGER_CONDITION),
-                    'use_macro': template.get('use_macro', False),
-                    'macro': template.get('macro', [])
-                })
+        cached = cache.get(images_folder / template['file'])
+        if cached is not None:
+            img_gray = cached['gray']
+
+            # Compile the macro once (opcode tuples), report invalid steps now
+            compiled_macro, macro_errors = None, []
+            if template.get('use_macro', False) and template.get('macro'):
+                compiled_macro, macro_errors = compile_macro(template['macro'])
+                for error in macro_errors:
+                    logger.warning(f"[{group_data.get('name')}] {template['name']} macro: {error}")
+            loaded_templates.append({
+                'name': template['name'],
+                'file': template['file'],
+                'image': img_gray,
+                # Alpha mask (PNG transparency), the image is already cropped to its opaque box
+                'mask': cached['mask'],
+                'pixels': cv2.countNonZero(cached['mask']) if cached['mask'] is not None else img_gray.size,
+                'threshold': template['threshold'],
+                'key_combo': template.get('key_combo', ''),
+                'compiled_combo': compile_key_combo(template.get('key_combo', ''),
+                                                    template.get('timing', DEFAULT_TIMING)),
+                'color': template.get('color', '#00ff88'),
+                'timing': template.get('timing', DEFAULT_TIMING),
+                'trigger_condition': template.get('trigger_condition', DEFAULT_TRIGGER_CONDITION),
+                'use_macro': template.get('use_macro', False),
+                'macro': template.get('macro', []),
+                'compiled_macro': compiled_macro,
+                'macro_errors': macro_errors,
+                'macro_ms': round(macro_duration(compiled_macro) * 1000, 1) if compiled_macro is not None else 0,
+                'roi_mode': template.get('roi_mode', DEFAULT_ROI_MODE),
+                'roi_config': template.get('roi'),
+                'pyramid': cached['pyramid'] if pyramid_matching else None,
+                'hist': cached['hist'],
+                # Color check: template mean color precomputed, one cv2.mean per match
+                'color_mode': template.get('color_mode', DEFAULT_COLOR_MODE),
+                'color_tolerance': template.get('color_tolerance', DEFAULT_COLOR_TOLERANCE),
+                'color_mean': cached['color'],
+                'color_hs': hue_saturation(cached['color'])
+            })
 
     return loaded_templates
+
+
+def _allocate_pyramid_buffers(loaded_templates: List[Dict[str, Any]], gray: np.ndarray) -> List[np.ndarray]:
+    """
+    Allocate the frame pyramid and the per-template coarse / verify result buffers.
+
+    Templates whose coarse level does not fit the downscaled frame lose their
+    pyramid and are matched at full resolution.
+
+    Args:
+        loaded_templates: Output of _load_templates
+        gray: Preallocated grayscale frame buffer (pyramid level 0)
+
+    Returns:
+        [gray, 1/2, ...] frame buffers, as deep as the deepest template pyramid
+    """
+    depth = max((len(d['pyramid']) - 1 for d in loaded_templates if d.get('pyramid')), default=0)
+    frame_pyramid = [gray]
+    for _ in range(depth):
+        h, w = frame_pyramid[-1].shape
+        frame_pyramid.append(np.empty(((h + 1) // 2, (w + 1) // 2), dtype=np.uint8))
+
+    for data in loaded_templates:
+        pyramid = data.get('pyramid')
+        if not pyramid:
+            continue
+        level = len(pyramid) - 1
+        fh, fw = frame_pyramid[level].shape
+        th, tw = pyramid[level].shape[:2]
+        if th > fh or tw > fw or data['result'] is None:
+            data['pyramid'] = None
+            continue
+        data['coarse_result'] = np.empty((fh - th + 1, fw - tw + 1), dtype=np.float32)
+        side = 4 * (1 << level) + 1  # verify window positions per axis (2 * margin + 1)
+        data['verify_result'] = np.empty(side * side, dtype=np.float32)
+
+    return frame_pyramid
+
+
+def _allocate_result_buffers(loaded_templates: List[Dict[str, Any]], frame_shape: tuple) -> None:
+    """
+    Allocate one matchTemplate result buffer per template for the given frame size.
+
+    Templates larger than the frame get None (matchTemplate raises as before).
+    """
+    height, width = frame_shape
+    for data in loaded_templates:
+        h, w = data['image'].shape[:2]
+        if h <= height and w <= width:
+            data['result'] = np.empty((height - h + 1, width - w + 1), dtype=np.float32)
+        else:
+            data['result'] = None
+
+
+def _set_roi(data: Dict[str, Any], roi: Optional[tuple]) -> None:
+    """Set a template's ROI window (frame coordinates) and its result buffer"""
+    data['roi'] = roi
+    data['roi_age'] = 0
+    if roi is None:
+        data['roi_result'] = None
+    else:
+        h, w = data['image'].shape[:2]
+        data['roi_result'] = np.empty((roi[3] - roi[1] - h + 1, roi[2] - roi[0] - w + 1), dtype=np.float32)
+
+
+def _apply_rois(loaded_templates: List[Dict[str, Any]], region: List[int], frame_shape: tuple) -> None:
+    """
+    Convert configured ROIs (screen coordinates) to windows inside the frame.
+
+    ROIs are clipped to the frame and grown to at least the template size.
+    Templates without a usable ROI (or in full mode) are scanned fully.
+
+    Args:
+        loaded_templates: Output of _load_templates
+        region: Group search region [x1, y1, x2, y2] (screen coordinates)
+        frame_shape: (height, width) of the grayscale frame
+    """
+    height, width = frame_shape
+    for data in loaded_templates:
+        roi = None
+        config_roi = data.get('roi_config')
+        if data.get('roi_mode') in (ROI_MODE_AUTO, ROI_MODE_FIXED) and config_roi and len(config_roi) == 4:
+            h, w = data['image'].shape[:2]
+            x1 = max(int(config_roi[0]) - region[0], 0)
+            y1 = max(int(config_roi[1]) - region[1], 0)
+            x2 = min(max(int(config_roi[2]) - region[0], x1 + w), width)
+            y2 = min(max(int(config_roi[3]) - region[1], y1 + h), height)
+            x1, y1 = max(min(x1, x2 - w), 0), max(min(y1, y2 - h), 0)
+            if x2 - x1 >= w and y2 - y1 >= h:
+                roi = (x1, y1, x2, y2)
+        _set_roi(data, roi)
+
+
+def _build_batched_matcher(
+    group_data: Dict[str, Any],
+    loaded_templates: List[Dict[str, Any]]
+) -> Optional[BatchedMatcher]:
+    """
+    Precompute template spectra for batched matching (load time).
+
+    Templates that take part get a 'batch_index'; the rest (too large for the
+    region, fixed to an ROI window, matched with the pyramid, masked, or over
+    the spectra memory budget) keep using cv2.matchTemplate.
+
+    Args:
+        group_data: Group configuration dictionary
+        loaded_templates: Output of _load_templates
+
+    Returns:
+        BatchedMatcher, or None if batching is disabled or not worthwhile
+    """
+    if not group_data.get('batched_matching', DEFAULT_BATCHED_MATCHING):
+        return None
+
+    region = group_data.get('search_region', [0, 0, 100, 100])
+    frame_shape = (region[3] - region[1], region[2] - region[0])
+    spectrum_bytes = cv2.getOptimalDFTSize(frame_shape[0]) * cv2.getOptimalDFTSize(frame_shape[1]) * 4
+    max_templates = max(BATCHED_MAX_SPECTRA_BYTES // spectrum_bytes, 0)
+
+    eligible = [
+        data for data in loaded_templates
+        if data['image'].shape[0] <= frame_shape[0] and data['image'].shape[1] <= frame_shape[1]
+        and not (data.get('roi_mode') == ROI_MODE_FIXED and data.get('roi') is not None)
+        and data.get('pyramid') is None
+        and data.get('mask') is None
+    ][:max_templates]
+
+    if len(eligible) < BATCHED_MIN_TEMPLATES:
+        return None
+
+    for i, data in enumerate(eligible):
+        data['batch_index'] = i
+
+    return BatchedMatcher(frame_shape, [data['image'] for data in eligible])
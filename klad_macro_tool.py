@@ -40,8 +40,6 @@ try:
     import customtkinter as ctk
     from tkinter import messagebox
     import tkinter as tk
-    import cv2
-    import numpy as np
     from pathlib import Path
     from PIL import Image, ImageTk
     import keyboard
@@ -50,6 +48,8 @@ try:
     from multiprocessing import Process, Queue, Value
     import logging
     import copy
+    import json
+    import math
 
     # Core module imports
     from core import (
@@ -68,9 +68,35 @@ try:
         EXPORT_START_MARKER,
         EXPORT_END_MARKER,
         MIN_REGION_SIZE,
+        ROI_MODE_AUTO,
+        TIMER_SPIN_THRESHOLD_SEC,
+        WORKER_PROCESSES_PER_GROUP,
+        WORKER_PROCESSES_AUTO,
+        DEFAULT_WORKER_PROCESSES,
+        WORKER_PRIORITY_BELOW_NORMAL,
+        WORKER_PRIORITY_NORMAL,
+        WORKER_PRIORITY_ABOVE_NORMAL,
+        WORKER_PRIORITY_HIGH,
+        DEFAULT_WORKER_PRIORITY,
+        DEFAULT_RESERVED_CORES,
+        DEFAULT_SPREAD_WORKERS,
+        DEFAULT_CV_THREADS,
+        DEFAULT_TEST_FPS,
 
         # Functions
         group_worker,
+        multi_group_worker,
+        plan_worker_processes,
+        test_worker,
+        WorkerControl,
+        WorkerStatus,
+        AffinityPlanner,
+        physical_cores,
+        apply_placement,
+        cv_thread_count,
+        FrameBus,
+        capture_server,
+        get_union_region,
         load_config as core_load_config,
         save_config as core_save_config,
         get_conflicting_keys,
@@ -138,6 +164,13 @@ logger = logging.getLogger(__name__)
 # Note: group_worker is now imported from core.worker
 
 class ConfigManager:
+    WORKER_PRIORITY_LABELS = {
+        WORKER_PRIORITY_BELOW_NORMAL: "Normalin altı",
+        WORKER_PRIORITY_NORMAL: "Normal",
+        WORKER_PRIORITY_ABOVE_NORMAL: "Normalin üstü",
+        WORKER_PRIORITY_HIGH: "Yüksek",
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("Klad Macro Tool")
@@ -158,11 +191,27 @@ class ConfigManager:
 
         # Process management
         self.processes = {}  # group_id -> Process
-        self.command_queues = {}  # group_id -> Queue
+        self.worker_controls = {}  # group_id -> WorkerControl
+        self.worker_status = {}  # group_id -> WorkerStatus (shared memory, sampled by the UI)
+        self.status_seen = {}  # group_id -> (match_count, indicator, fps_reports) at the last sample
+        self.worker_configs = {}  # group_id -> config snapshot the worker runs with (hot reload)
+        self.hooked_toggle_keys = None  # toggle_key_map of the hooked keys
+        self.learned_rois_dirty = False  # auto ROIs learned since the last config write
+        self._worker_memory = {}  # pid -> RSS MB
+        self.affinity_planner = None  # AffinityPlanner of the running bots
+        self._placement_index = 0
+        self._placement_total = 0  # processes placed by start_all_bots (CPU sharing)
+        self._worker_memory_time = 0.0
         self.status_queue = None
         self.running_flags = {}  # group_id -> Value
         self.bot_active = False
 
+        # Shared capture (one screen grab for all groups)
+        self.frame_bus = None
+        self.frame_bus_info = None  # {'name', 'active', 'ready'} passed to workers
+        self.capture_process = None
+        self.capture_running_flag = None
+
         # UI state
         self.selected_group_index = None
         self.selected_template_index = None
@@ -200,6 +249,10 @@ class ConfigManager:
         self.test_mode_active = False
         self.test_overlay = None
         self.test_labels = {}  # group_id -> {template_name -> label}
+        self.test_fps_labels = {}  # group_id -> FPS label
+        self.test_processes = []  # test_worker processes
+        self.test_queue = None  # scores and FPS from the test processes
+        self.test_flag = None
         self.test_update_job = None
 
         # Load existing config
@@ -645,6 +698,16 @@ class ConfigManager:
             command=self.toggle_fps_overlay
         ).pack(anchor="w", pady=(8, 0))
 
+        self.shared_capture_var = ctk.BooleanVar(value=self.global_settings.get("shared_capture", False))
+        ctk.CTkCheckBox(
+            debug_content,
+            text="Ortak Ekran Yakalama (tüm gruplar tek capture)",
+            variable=self.shared_capture_var,
+            font=ctk.CTkFont(size=13),
+            fg_color=self.colors["accent"],
+            hover_color=self.colors["accent_hover"]
+        ).pack(anchor="w", pady=(8, 0))
+
         # CPU Çekirdek Slider
         cpu_limit_frame = ctk.CTkFrame(debug_content, fg_color="transparent")
         cpu_limit_frame.pack(anchor="w", pady=(12, 0), fill="x")
@@ -689,6 +752,181 @@ class ConfigManager:
         )
         self.cpu_cores_label.pack(side="left")
 
+        # CPU yerleşimi: oyuna ayrılan çekirdekler, dağıtım, öncelik, OpenCV thread
+        reserve_frame = ctk.CTkFrame(debug_content, fg_color="transparent")
+        reserve_frame.pack(anchor="w", pady=(12, 0), fill="x")
+
+        ctk.CTkLabel(
+            reserve_frame,
+            text="Oyuna Ayrılan:",
+            font=ctk.CTkFont(size=13)
+        ).pack(side="left")
+
+        physical_count = len(physical_cores())
+        reserve_values = [str(i) for i in range(min(4, physical_count - 1) + 1)]
+        reserved = str(self.global_settings.get("reserved_cores", DEFAULT_RESERVED_CORES))
+        if reserved not in reserve_values:
+            reserve_values.append(reserved)
+        self.reserved_cores_menu = ctk.CTkOptionMenu(
+            reserve_frame,
+            values=reserve_values,
+            width=70,
+            height=28,
+            fg_color=self.colors["bg_dark"],
+            button_color=self.colors["accent"],
+            button_hover_color=self.colors["accent_hover"],
+            command=self.update_placement_preview
+        )
+        self.reserved_cores_menu.pack(side="left", padx=(10, 5))
+        self.reserved_cores_menu.set(reserved)
+
+        ctk.CTkLabel(
+            reserve_frame,
+            text="(ilk fiziksel çekirdekler, worker'lar kullanmaz)",
+            font=ctk.CTkFont(size=11),
+            text_color=self.colors["text_secondary"]
+        ).pack(side="left")
+
+        self.spread_workers_var = ctk.BooleanVar(
+            value=self.global_settings.get("spread_workers", DEFAULT_SPREAD_WORKERS))
+        ctk.CTkCheckBox(
+            debug_content,
+            text="Worker'ları ayrı fiziksel çekirdeklere dağıt",
+            variable=self.spread_workers_var,
+            font=ctk.CTkFont(size=13),
+            fg_color=self.colors["accent"],
+            hover_color=self.colors["accent_hover"],
+            command=self.update_placement_preview
+        ).pack(anchor="w", pady=(8, 0))
+
+        priority_frame = ctk.CTkFrame(debug_content, fg_color="transparent")
+        priority_frame.pack(anchor="w", pady=(12, 0), fill="x")
+
+        ctk.CTkLabel(
+            priority_frame,
+            text="Worker Önceliği:",
+            font=ctk.CTkFont(size=13)
+        ).pack(side="left")
+
+        self.worker_priority_menu = ctk.CTkOptionMenu(
+            priority_frame,
+            values=list(self.WORKER_PRIORITY_LABELS.values()),
+            width=130,
+            height=28,
+            fg_color=self.colors["bg_dark"],
+            button_color=self.colors["accent"],
+            button_hover_color=self.colors["accent_hover"]
+        )
+        self.worker_priority_menu.pack(side="left", padx=(10, 15))
+        self.worker_priority_menu.set(self.WORKER_PRIORITY_LABELS.get(
+            self.global_settings.get("worker_priority", DEFAULT_WORKER_PRIORITY),
+            self.WORKER_PRIORITY_LABELS[DEFAULT_WORKER_PRIORITY]))
+
+        ctk.CTkLabel(
+            priority_frame,
+            text="OpenCV Thread:",
+            font=ctk.CTkFont(size=13)
+        ).pack(side="left")
+
+        cv_values = ["Otomatik", "1", "2", "4"]
+        cv_setting = self.global_settings.get("cv_threads", DEFAULT_CV_THREADS)
+        cv_text = "Otomatik" if not cv_setting else str(cv_setting)
+        if cv_text not in cv_values:
+            cv_values.append(cv_text)
+        self.cv_threads_menu = ctk.CTkOptionMenu(
+            priority_frame,
+            values=cv_values,
+            width=100,
+            height=28,
+            fg_color=self.colors["bg_dark"],
+            button_color=self.colors["accent"],
+            button_hover_color=self.colors["accent_hover"]
+        )
+        self.cv_threads_menu.pack(side="left", padx=(10, 5))
+        self.cv_threads_menu.set(cv_text)
+
+        self.placement_label = ctk.CTkLabel(
+            debug_content,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=self.colors["text_secondary"]
+        )
+        self.placement_label.pack(anchor="w", pady=(6, 0))
+        self.update_placement_preview()
+
+        # Worker process düzeni (her gruba bir process veya paylaşımlı)
+        worker_frame = ctk.CTkFrame(debug_content, fg_color="transparent")
+        worker_frame.pack(anchor="w", pady=(12, 0), fill="x")
+
+        ctk.CTkLabel(
+            worker_frame,
+            text="Worker Process:",
+            font=ctk.CTkFont(size=13)
+        ).pack(side="left")
+
+        worker_values = ["Grup başına", "Otomatik", "1", "2", "3", "4", "6", "8"]
+        worker_setting = self.global_settings.get("worker_processes", DEFAULT_WORKER_PROCESSES)
+        if worker_setting == WORKER_PROCESSES_PER_GROUP:
+            worker_text = "Grup başına"
+        elif worker_setting == WORKER_PROCESSES_AUTO:
+            worker_text = "Otomatik"
+        else:
+            worker_text = str(worker_setting)
+        if worker_text not in worker_values:
+            worker_values.append(worker_text)
+        self.worker_processes_menu = ctk.CTkOptionMenu(
+            worker_frame,
+            values=worker_values,
+            width=120,
+            height=28,
+            fg_color=self.colors["bg_dark"],
+            button_color=self.colors["accent"],
+            button_hover_color=self.colors["accent_hover"]
+        )
+        self.worker_processes_menu.pack(side="left", padx=(10, 5))
+        self.worker_processes_menu.set(worker_text)
+
+        ctk.CTkLabel(
+            worker_frame,
+            text="(çok grupta daha az bellek, gruplar sırayla taranır)",
+            font=ctk.CTkFont(size=11),
+            text_color=self.colors["text_secondary"]
+        ).pack(side="left")
+
+        # Hassas bekleme (tuş zamanlamaları için spin süresi)
+        spin_frame = ctk.CTkFrame(debug_content, fg_color="transparent")
+        spin_frame.pack(anchor="w", pady=(12, 0), fill="x")
+
+        ctk.CTkLabel(
+            spin_frame,
+            text="Hassas Bekleme:",
+            font=ctk.CTkFont(size=13)
+        ).pack(side="left")
+
+        spin_ms = self.global_settings.get("timer_spin_ms", TIMER_SPIN_THRESHOLD_SEC * 1000)
+        spin_values = ["Kapalı", "0.5 ms", "1 ms", "2 ms", "4 ms"]
+        spin_text = "Kapalı" if not spin_ms else f"{spin_ms:g} ms"
+        if spin_text not in spin_values:
+            spin_values.append(spin_text)
+        self.timer_spin_menu = ctk.CTkOptionMenu(
+            spin_frame,
+            values=spin_values,
+            width=100,
+            height=28,
+            fg_color=self.colors["bg_dark"],
+            button_color=self.colors["accent"],
+            button_hover_color=self.colors["accent_hover"]
+        )
+        self.timer_spin_menu.pack(side="left", padx=(10, 5))
+        self.timer_spin_menu.set(spin_text)
+
+        ctk.CTkLabel(
+            spin_frame,
+            text="(tuş gecikmelerinin son kısmı CPU ile beklenir)",
+            font=ctk.CTkFont(size=11),
+            text_color=self.colors["text_secondary"]
+        ).pack(side="left")
+
         # Log Console card
         log_card = ctk.CTkFrame(settings_scroll, fg_color=self.colors["bg_secondary"], corner_radius=12)
         log_card.pack(fill="both", expand=True, pady=(0, 15))
@@ -799,7 +1037,26 @@ Kullanım:
             font=ctk.CTkFont(size=13, weight="bold"),
             command=self.toggle_test_mode
         )
-        self.test_mode_btn.pack(side="left", padx=(0, 10))
+        self.test_mode_btn.pack(side="left", padx=(0, 4))
+
+        # Test hızı: sabit FPS veya grubun hedef FPS'i (bot hızı)
+        test_fps_values = ["10 FPS", "30 FPS", "60 FPS", "Bot hızı"]
+        test_fps = self.global_settings.get("test_fps", DEFAULT_TEST_FPS)
+        test_fps_text = f"{test_fps} FPS" if test_fps else "Bot hızı"
+        if test_fps_text not in test_fps_values:
+            test_fps_values.insert(-1, test_fps_text)
+        self.test_fps_menu = ctk.CTkOptionMenu(
+            left_controls,
+            values=test_fps_values,
+            width=95,
+            height=45,
+            corner_radius=10,
+            fg_color=self.colors["bg_dark"],
+            button_color=self.colors["warning"],
+            button_hover_color="#e6a800"
+        )
+        self.test_fps_menu.pack(side="left", padx=(0, 10))
+        self.test_fps_menu.set(test_fps_text)
 
         ctk.CTkButton(
             left_controls,
@@ -2760,6 +3017,7 @@ Kullanım:
             self.refresh_group_list()
             self.update_group_details()
             self.refresh_template_list()
+            self.save_config(silent=True)
 
     def export_group(self):
         """Export selected group as text"""
@@ -2811,6 +3069,7 @@ Kullanım:
             group['templates'].pop(self.selected_template_index)
             self.selected_template_index = None
             self.refresh_template_list()
+            self.save_config(silent=True)
 
     def duplicate_template(self):
         """Duplicate selected template"""
@@ -2861,6 +3120,7 @@ Kullanım:
         # Select the new template
         self.selected_template_index = insert_index
         self.refresh_template_list()
+        self.save_config(silent=True)
 
     # ==================== HOTKEY VALIDATION ====================
 
@@ -2878,9 +3138,9 @@ Kullanım:
             self.start_test_mode()
 
     def start_test_mode(self):
-        """Start test mode - shows template matching status in overlay"""
-        # Aktif grup kontrolü
-        enabled_groups = [g for g in self.groups if g.get('enabled', True)]
+        """Start test mode - runs the bot engine without key presses, shows scores in overlay"""
+        # Aktif grup kontrolü (iç içe klasörlerdeki gruplar dahil)
+        enabled_groups = [g for g in flatten_groups(self.groups) if g.get('enabled', True)]
         if not enabled_groups:
             messagebox.showwarning("Uyarı", "Test için en az bir aktif grup olmalı!")
             return
@@ -2895,10 +3155,29 @@ Kullanım:
         self.test_mode_btn.configure(text="⏹  Durdur", fg_color=self.colors["danger"], hover_color="#cc3344")
 
         # Overlay penceresi oluştur
-        self.create_test_overlay()
+        self.create_test_overlay(groups_with_templates)
+
+        # Bot ile aynı process dağılımı, böylece görülen FPS botun FPS'i olur
+        self.test_queue = Queue()
+        self.test_flag = Value('b', True)
+        test_fps = self.get_test_fps()
+        planner = self.create_affinity_planner()
+        plan = plan_worker_processes(groups_with_templates, self.get_worker_process_count())
+        for index, process_groups in enumerate(plan):
+            cpus = planner.cpus_for(index)
+            cv_threads = cv_thread_count(self.get_cv_threads(), cpus, planner.sharing(index, len(plan)))
+            p = Process(target=test_worker, args=(process_groups, self.test_queue, self.test_flag, test_fps,
+                                                  cv_threads))
+            p.daemon = True
+            p.start()
+            apply_placement(p.pid, cpus, self.get_worker_priority())
+            self.test_processes.append(p)
+
+        rate = f"{test_fps} FPS" if test_fps else "bot hızı"
+        self.add_log(f"Test modu başladı: {len(groups_with_templates)} grup, {len(plan)} process, {rate}", "INFO")
 
-        # Test döngüsünü başlat
-        self.run_test_cycle()
+        # Sonuçları overlay'e aktar
+        self.poll_test_results()
 
     def stop_test_mode(self):
         """Stop test mode"""
@@ -2910,6 +3189,17 @@ Kullanım:
             self.root.after_cancel(self.test_update_job)
             self.test_update_job = None
 
+        # Test process'lerini durdur
+        if self.test_flag is not None:
+            self.test_flag.value = False
+        for process in self.test_processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self.test_processes.clear()
+        self.test_flag = None
+        self.test_queue = None
+
         # Overlay'i kapat
         if self.test_overlay:
             try:
@@ -2919,8 +3209,16 @@ Kullanım:
             self.test_overlay = None
 
         self.test_labels.clear()
+        self.test_fps_labels.clear()
+
+    def get_test_fps(self):
+        """Seçili test hızı (0 = bot hızı, grubun hedef FPS'i)"""
+        if hasattr(self, 'test_fps_menu'):
+            text = self.test_fps_menu.get()
+            return 0 if text == "Bot hızı" else int(text.split()[0])
+        return self.global_settings.get("test_fps", DEFAULT_TEST_FPS)
 
-    def create_test_overlay(self):
+    def create_test_overlay(self, groups):
         """Create test mode overlay window - FPS overlay style, click-through"""
         self.test_overlay = tk.Toplevel(self.root)
         self.test_overlay.title("")
@@ -2959,27 +3257,35 @@ Kullanım:
             bg='#1a1a1a'
         ).pack(side="left")
 
-        # Aktif grupları ve template'lerini listele
-        enabled_groups = [g for g in self.groups if g.get('enabled', True)]
-
-        for group in enabled_groups:
-            if not group.get('templates'):
-                continue
-
+        # Test edilen grupları ve template'lerini listele
+        for group in groups:
             group_id = group['id']
             self.test_labels[group_id] = {}
 
-            # Grup başlığı
+            # Grup başlığı + ölçülen FPS
             group_frame = tk.Frame(main_frame, bg='#242424', padx=8, pady=6)
             group_frame.pack(fill="x", pady=(0, 6))
 
+            title_row = tk.Frame(group_frame, bg='#242424')
+            title_row.pack(fill="x")
+
             tk.Label(
-                group_frame,
+                title_row,
                 text=f"📁 {group['name']}",
                 font=("Segoe UI", 10, "bold"),
                 fg="#00d4ff",
                 bg='#242424'
-            ).pack(anchor="w")
+            ).pack(side="left")
+
+            fps_label = tk.Label(
+                title_row,
+                text="-- FPS",
+                font=("Segoe UI", 9),
+                fg="#888888",
+                bg='#242424'
+            )
+            fps_label.pack(side="right", padx=(8, 0))
+            self.test_fps_labels[group_id] = fps_label
 
             # Template'leri listele
             for template in group.get('templates', []):
@@ -3036,94 +3342,50 @@ Kullanım:
                     'threshold': threshold
                 }
 
-    def run_test_cycle(self):
-        """Run one test cycle and schedule next"""
+    def poll_test_results(self):
+        """Show the latest scores and FPS from the test processes, schedule next poll"""
         if not self.test_mode_active:
             return
 
+        latest = {}  # group_id -> newest report
         try:
-            import mss
-            with mss.mss() as sct:
-                enabled_groups = [g for g in self.groups if g.get('enabled', True)]
-
-                for group in enabled_groups:
-                    if not group.get('templates'):
-                        continue
-
-                    group_id = group['id']
-                    if group_id not in self.test_labels:
-                        continue
-
-                    search_region = group.get('search_region', [0, 0, 100, 100])
-
-                    # Ekran görüntüsü al
-                    try:
-                        monitor = {
-                            "left": search_region[0],
-                            "top": search_region[1],
-                            "width": search_region[2] - search_region[0],
-                            "height": search_region[3] - search_region[1]
-                        }
-                        sct_img = sct.grab(monitor)
-                        screenshot = np.array(sct_img)[:, :, :3]
-                        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-                    except Exception as e:
-                        continue
-
-                    # Her template için eşleşme kontrolü
-                    for template in group.get('templates', []):
-                        if not template.get('enabled', True):
-                            continue
-
-                        template_name = template['name']
-                        if template_name not in self.test_labels[group_id]:
-                            continue
-
-                        threshold = template.get('threshold', 0.9)
-                        template_file = template.get('file', '')
-
-                        # Template yolunu bul (bot worker ile AYNI mantık: IMAGES_FOLDER / file)
-                        template_path = IMAGES_FOLDER / template_file
-
-                        match_val = 0.0
-                        matched = False
-
-                        if template_path.exists():
-                            try:
-                                # UTF-8 path desteği için numpy ile oku
-                                template_img = cv2.imdecode(np.fromfile(str(template_path), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
-                                if template_img is not None:
-                                    # Template screenshot'tan büyükse atla
-                                    if template_img.shape[0] > screenshot_gray.shape[0] or template_img.shape[1] > screenshot_gray.shape[1]:
-                                        logger.warning(f"Template '{template_name}' arama bölgesinden büyük!")
-                                        continue
-
-                                    result = cv2.matchTemplate(screenshot_gray, template_img, cv2.TM_CCOEFF_NORMED)
-                                    _, max_val, _, _ = cv2.minMaxLoc(result)
-                                    match_val = max_val
-                                    matched = max_val >= threshold
-                            except Exception as e:
-                                logger.error(f"Template match error for '{template_name}': {e}")
-                        else:
-                            logger.warning(f"Template dosyası bulunamadı: {template_path}")
-
-                        # UI güncelle
-                        labels = self.test_labels[group_id][template_name]
-                        match_percent = int(match_val * 100)
-
-                        if matched:
-                            labels['canvas'].itemconfig(labels['indicator'], fill="#00ff88")
-                            labels['match'].configure(text=f"{match_percent}%", fg="#00ff88")
-                        else:
-                            labels['canvas'].itemconfig(labels['indicator'], fill="#ff4757")
-                            labels['match'].configure(text=f"{match_percent}%", fg="#888888")
-
+            while not self.test_queue.empty():
+                msg = self.test_queue.get_nowait()
+                if msg.get('type') == 'test':
+                    latest[msg['group_id']] = msg
+                elif msg.get('type') == 'warning':
+                    self.add_log(f"Test: {msg.get('message')}", "WARNING")
         except Exception as e:
-            logger.error(f"Test cycle error: {e}")
+            logger.error(f"Test result error: {e}")
+
+        for group_id, msg in latest.items():
+            fps_label = self.test_fps_labels.get(group_id)
+            if fps_label is not None and msg.get('fps') is not None:
+                fps_text = f"{msg['fps']:.0f} FPS"
+                if msg.get('target_fps'):
+                    fps_text += f" / {msg['target_fps']:g}"
+                fps_label.configure(text=fps_text)
+
+            for template_name, match_val in msg['scores'].items():
+                labels = self.test_labels.get(group_id, {}).get(template_name)
+                if labels is None:
+                    continue
+                if math.isnan(match_val):
+                    # Ön filtre eledi, korelasyon hesaplanmadı
+                    labels['canvas'].itemconfig(labels['indicator'], fill="#ff4757")
+                    labels['match'].configure(text="—", fg="#888888")
+                    continue
+                match_percent = int(max(match_val, 0) * 100)
+
+                if match_val >= labels['threshold']:
+                    labels['canvas'].itemconfig(labels['indicator'], fill="#00ff88")
+                    labels['match'].configure(text=f"{match_percent}%", fg="#00ff88")
+                else:
+                    labels['canvas'].itemconfig(labels['indicator'], fill="#ff4757")
+                    labels['match'].configure(text=f"{match_percent}%", fg="#888888")
 
-        # Sonraki cycle'ı zamanla (100ms = 10 FPS test)
         if self.test_mode_active:
-            self.test_update_job = self.root.after(100, self.run_test_cycle)
+            self.test_update_job = self.root.after(TEST_CYCLE_INTERVAL_MS, self.poll_test_results)
 
     # ==================== BOT CONTROL ====================
 
@@ -3173,47 +3435,196 @@ Kullanım:
         # Create status queue
         self.status_queue = multiprocessing.Queue()
 
-        # Start process for each enabled group
-        for group in enabled_groups:
+        # CPU placement plan (affinity, priority, OpenCV threads)
+        self.affinity_planner = self.create_affinity_planner()
+        self._placement_index = 0
+        self.add_log(f"CPU yerleşimi: {self.affinity_planner.describe()}", "INFO")
 
-            group_id = group['id']
+        shared_capture = self.shared_capture_var.get() and len(enabled_groups) > 1
+        plan = plan_worker_processes(enabled_groups, self.get_worker_process_count())
+        self._placement_total = len(plan) + (1 if shared_capture else 0)
 
-            # Create command queue and running flag
-            cmd_queue = multiprocessing.Queue()
-            running_flag = multiprocessing.Value('b', True)
+        # Shared capture: one process grabs the union region for all groups
+        self.frame_bus_info = None
+        if shared_capture:
+            self.frame_bus_info = self.start_capture_server(enabled_groups)
 
-            self.command_queues[group_id] = cmd_queue
-            self.running_flags[group_id] = running_flag
+        # Start worker processes (one per group, or several groups per process)
+        for process_groups in plan:
+            self.start_worker_process(process_groups)
 
-            # Start process
-            p = Process(target=group_worker, args=(group, cmd_queue, self.status_queue, running_flag))
-            p.daemon = True
-            p.start()
-            self.processes[group_id] = p
+        # Setup hotkeys - use enabled_groups (already filtered)
+        self.hook_toggle_keys(enabled_groups)
 
-            # CPU affinity ayarla
-            self.apply_cpu_affinity(p.pid)
+        self.bot_active = True
+        self.update_ui_state()
+        logger.info("All bots started")
+
+    def start_worker_process(self, groups):
+        """Bir veya birden fazla grubu çalıştıran worker process başlat"""
+        # Aynı process'teki gruplar tek Event ile uyandırılır
+        wake = multiprocessing.Event() if len(groups) > 1 else None
+        controls = [WorkerControl(wake) for _ in groups]
+        status_tables = [WorkerStatus() for _ in groups]
+        running_flag = multiprocessing.Value('b', True)
+        spin_threshold = self.get_timer_spin_ms() / 1000.0
+        cpus = self.next_worker_cpus()
+        cv_threads = cv_thread_count(self.get_cv_threads(), cpus,
+                                     self.affinity_planner.sharing(self._placement_index - 1, self._placement_total))
+
+        # Start process
+        if len(groups) == 1:
+            p = Process(target=group_worker, args=(groups[0], controls[0], self.status_queue, running_flag,
+                                                   self.frame_bus_info, spin_threshold, status_tables[0],
+                                                   cv_threads))
+        else:
+            p = Process(target=multi_group_worker, args=(groups, controls, self.status_queue, running_flag,
+                                                         self.frame_bus_info, spin_threshold, status_tables,
+                                                         cv_threads))
+        p.daemon = True
+        p.start()
+
+        # CPU affinity ve öncelik ayarla
+        names = ", ".join(g.get('name', '') for g in groups)
+        self.place_process(p.pid, cpus, f"Worker [{names}]")
+
+        for group, control, status_table in zip(groups, controls, status_tables):
+            group_id = group['id']
+            self.worker_controls[group_id] = control
+            self.worker_status[group_id] = status_table
+            self.running_flags[group_id] = running_flag
+            self.worker_configs[group_id] = self.worker_config_snapshot(group)
+            self.processes[group_id] = p
 
             # Create indicator
             self.create_indicator(group_id, len(self.indicator_windows))
 
-        # Setup hotkeys - use enabled_groups (already filtered)
+    def stop_group_worker(self, group_id):
+        """Tek grubu durdur (process'te başka grup yoksa process'i de kapat)"""
+        process = self.processes.pop(group_id)
+        control = self.worker_controls.pop(group_id)
+        running_flag = self.running_flags.pop(group_id)
+        if process in self.processes.values():
+            # Process başka grupları da çalıştırıyor: sadece bu grubu çıkar
+            control.set_active(False)
+            control.send({'action': 'remove'})
+        else:
+            running_flag.value = False
+            control.wake()
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+        self.worker_status.pop(group_id, None)
+        self.status_seen.pop(group_id, None)
+        self.worker_configs.pop(group_id, None)
+        self.fps_data.pop(group_id, None)
+        if group_id in self.fps_labels:
+            try:
+                self.fps_labels.pop(group_id).destroy()
+            except:
+                pass
+        if group_id in self.indicator_windows:
+            try:
+                self.indicator_windows.pop(group_id)[0].destroy()
+            except:
+                pass
+
+    def get_worker_process_count(self):
+        """Ayara göre worker process sayısı (0 = her gruba bir process)"""
+        setting = self.get_worker_processes_setting()
+        if setting == WORKER_PROCESSES_AUTO:
+            return multiprocessing.cpu_count() or 1
+        return setting
+
+    def get_worker_processes_setting(self):
+        """Worker process ayarı: 0 = grup başına, -1 = otomatik (çekirdek sayısı), N = N process"""
+        if not hasattr(self, 'worker_processes_menu'):
+            return self.global_settings.get("worker_processes", DEFAULT_WORKER_PROCESSES)
+        text = self.worker_processes_menu.get()
+        if text == "Grup başına":
+            return WORKER_PROCESSES_PER_GROUP
+        if text == "Otomatik":
+            return WORKER_PROCESSES_AUTO
+        try:
+            return int(text)
+        except ValueError:
+            return DEFAULT_WORKER_PROCESSES
+
+    def get_worker_memory_mb(self):
+        """Worker process'lerinin bellek kullanımı (MB), en fazla 2 saniyede bir ölçülür"""
+        now = time.perf_counter()
+        if now - self._worker_memory_time < 2.0:
+            return self._worker_memory
+        self._worker_memory_time = now
+        memory = {}
+        try:
+            import psutil
+            for process in set(self.processes.values()):
+                try:
+                    memory[process.pid] = psutil.Process(process.pid).memory_info().rss / (1024 * 1024)
+                except (psutil.Error, ValueError):
+                    pass
+        except ImportError:
+            pass
+        self._worker_memory = memory
+        return memory
+
+    @staticmethod
+    def toggle_key_map(groups):
+        """Bağlanacak (grup id, toggle tuşu) çiftleri"""
+        return sorted((group['id'], group['toggle_key']) for group in groups if group.get('toggle_key'))
+
+    def hook_toggle_keys(self, groups):
+        """Grupların toggle tuşlarını bağla (öncekileri kaldırır)"""
         keyboard.unhook_all()
+        self.hooked_toggle_keys = self.toggle_key_map(groups)
+        for group_id, toggle_key in self.hooked_toggle_keys:
+            keyboard.on_press_key(toggle_key, lambda e, gid=group_id: self.toggle_group(gid))
+
+    @staticmethod
+    def worker_config_snapshot(group):
+        """Worker'ı ilgilendiren grup ayarları (otomatik öğrenilen arama pencereleri hariç)"""
+        group = copy.deepcopy(group)
+        for template in group.get('templates', []):
+            if template.get('roi_mode') == ROI_MODE_AUTO:
+                template.pop('roi', None)
+        return json.dumps(group, sort_keys=True, ensure_ascii=False)
+
+    def sync_workers(self):
+        """Bot çalışırken yapılan config değişikliklerini worker'lara yeniden başlatmadan uygula"""
+        if not self.bot_active:
+            return
+        enabled_groups = [g for g in flatten_groups(self.groups) if g.get('enabled', True)]
+        enabled_ids = {g['id'] for g in enabled_groups}
+
+        for group_id in [gid for gid in self.processes if gid not in enabled_ids]:
+            self.stop_group_worker(group_id)
+            self.add_log(f"[{self.get_group_name_by_id(group_id)}] Worker durduruldu", "INFO")
+
         for group in enabled_groups:
-            toggle_key = group.get('toggle_key')
-            if toggle_key:
-                group_id = group['id']
-                keyboard.on_press_key(toggle_key, lambda e, gid=group_id: self.toggle_group(gid))
+            group_id = group['id']
+            if group_id not in self.processes:
+                self.start_worker_process([group])
+                self.add_log(f"[{group.get('name', '')}] Worker başlatıldı", "INFO")
+                continue
+            snapshot = self.worker_config_snapshot(group)
+            if snapshot != self.worker_configs.get(group_id):
+                self.worker_controls[group_id].send({'action': 'reload', 'group': copy.deepcopy(group)})
+                self.worker_configs[group_id] = snapshot
 
-        self.bot_active = True
-        self.update_ui_state()
-        logger.info("All bots started")
+        if self.get_conflicting_keys():
+            self.add_log("Çakışan toggle key'ler var, aynı tuş birden fazla grubu açıp kapatır", "WARN")
+        # unhook_all + yeniden bağlama sadece tuşlar değiştiyse
+        if self.toggle_key_map(enabled_groups) != self.hooked_toggle_keys:
+            self.hook_toggle_keys(enabled_groups)
 
     def stop_all_bots(self):
         """Stop all group processes"""
         # Stop all processes
         for group_id, flag in self.running_flags.items():
             flag.value = False
+            self.worker_controls[group_id].wake()
 
         # Wait and terminate
         for group_id, process in self.processes.items():
@@ -3223,9 +3634,14 @@ Kullanım:
 
         # Cleanup
         self.processes.clear()
-        self.command_queues.clear()
+        self.worker_controls.clear()
+        self.worker_status.clear()
+        self.status_seen.clear()
+        self.worker_configs.clear()
         self.running_flags.clear()
 
+        self.stop_capture_server()
+
         # Remove indicators
         for group_id, (window, _) in self.indicator_windows.items():
             try:
@@ -3239,15 +3655,59 @@ Kullanım:
 
         # Unhook keyboard
         keyboard.unhook_all()
+        self.hooked_toggle_keys = None
 
         self.bot_active = False
+        self.save_learned_rois()
         self.update_ui_state()
         logger.info("All bots stopped")
 
+    def start_capture_server(self, groups):
+        """Start the shared capture process, returns frame bus info for workers"""
+        region = get_union_region(groups)
+        if region is None:
+            return None
+
+        try:
+            self.frame_bus = FrameBus.create(region)
+        except Exception as e:
+            logger.error(f"Frame bus create error: {e}")
+            self.add_log(f"Ortak yakalama başlatılamadı: {e}", "ERROR")
+            self.frame_bus = None
+            return None
+
+        active_count = multiprocessing.Value('i', 0)
+        frame_ready = multiprocessing.Condition()
+        self.capture_running_flag = multiprocessing.Value('b', True)
+        self.capture_process = Process(
+            target=capture_server,
+            args=(self.frame_bus.name, self.capture_running_flag, active_count, frame_ready)
+        )
+        self.capture_process.daemon = True
+        self.capture_process.start()
+        self.place_process(self.capture_process.pid, self.next_worker_cpus(), "Ortak yakalama")
+
+        self.add_log(f"Ortak yakalama: {region[2] - region[0]}x{region[3] - region[1]} bölge", "INFO")
+        return {'name': self.frame_bus.name, 'active': active_count, 'ready': frame_ready}
+
+    def stop_capture_server(self):
+        """Stop the shared capture process and free the frame bus"""
+        if self.capture_process is not None:
+            self.capture_running_flag.value = False
+            self.capture_process.join(timeout=1)
+            if self.capture_process.is_alive():
+                self.capture_process.terminate()
+            self.capture_process = None
+            self.capture_running_flag = None
+
+        if self.frame_bus is not None:
+            self.frame_bus.close()
+            self.frame_bus = None
+
     def toggle_group(self, group_id):
         """Toggle a specific group"""
-        if group_id in self.command_queues:
-            self.command_queues[group_id].put({'action': 'toggle'})
+        if group_id in self.worker_controls:
+            self.worker_controls[group_id].toggle()
 
     def update_ui_state(self):
         """Update UI based on bot state"""
@@ -3261,14 +3721,8 @@ Kullanım:
             self.status_indicator.configure(fg_color=self.colors["warning"])
             self.status_label.configure(text="Hazır", text_color=self.colors["warning"])
 
-            # Bot aktifken düzenleme butonlarını devre dışı bırak
-            self.add_group_btn.configure(state="disabled")
-            self.edit_group_btn.configure(state="disabled")
-            self.delete_group_btn.configure(state="disabled")
-            self.add_template_btn.configure(state="disabled")
-            self.edit_template_btn.configure(state="disabled")
-            self.delete_template_btn.configure(state="disabled")
-            self.duplicate_template_btn.configure(state="disabled")
+            # Düzenleme butonları açık kalır: kaydedilen değişiklikler worker'lara
+            # yeniden başlatmadan uygulanır (sync_workers)
         else:
             self.start_stop_btn.configure(
                 text="▶  BAŞLAT",
@@ -3279,15 +3733,6 @@ Kullanım:
             self.status_indicator.configure(fg_color=self.colors["danger"])
             self.status_label.configure(text="Durdu", text_color=self.colors["danger"])
 
-            # Bot durduğunda düzenleme butonlarını aktif et
-            self.add_group_btn.configure(state="normal")
-            self.edit_group_btn.configure(state="normal")
-            self.delete_group_btn.configure(state="normal")
-            self.add_template_btn.configure(state="normal")
-            self.edit_template_btn.configure(state="normal")
-            self.delete_template_btn.configure(state="normal")
-            self.duplicate_template_btn.configure(state="normal")
-
     # ==================== INDICATORS ====================
 
     def create_indicator(self, group_id, index):
@@ -3372,6 +3817,16 @@ Kullanım:
             bg='#1a1a1a'
         ).pack(anchor='w')
 
+        # Toplam: tüm grupların FPS'i, process sayısı ve bellek
+        self.fps_total_label = tk.Label(
+            self.fps_label_frame,
+            text="",
+            font=('Consolas', 10),
+            fg='#aaaaaa',
+            bg='#1a1a1a'
+        )
+        self.fps_total_label.pack(anchor='w')
+
         self.fps_labels = {}
 
     def update_fps_overlay(self):
@@ -3387,13 +3842,44 @@ Kullanım:
         if self.fps_overlay is None:
             self.create_fps_overlay()
 
+        # Toplam FPS ve worker process belleği (layout karşılaştırması için)
+        memory = self.get_worker_memory_mb()
+        total_text = f"Σ {sum(d['fps'] for d in self.fps_data.values()):.0f} FPS | {len(set(self.processes.values()))} process"
+        if memory:
+            total_mb = sum(memory.values())
+            total_text += f" | {total_mb:.0f} MB ({total_mb / len(memory):.0f}/process)"
+        self.fps_total_label.configure(text=total_text)
+
         # Her grup için label güncelle
         for group_id, data in self.fps_data.items():
             fps = data['fps']
             name = data['name']
-
-            # Renk belirle (FPS'e göre)
-            if fps >= 60:
+            if data.get('target_fps'):
+                # Hedefli grup: ulaşılan / hedef FPS ve kare aralığı sapması
+                text = f"{fps:5.1f}/{data['target_fps']} FPS"
+                if data.get('jitter_ms') is not None:
+                    text += f" ±{data['jitter_ms']:.1f}ms"
+                text += f" | {name}"
+            else:
+                text = f"{fps:5.1f} FPS | {name}"
+            if data.get('pyramid_speedup'):
+                text += f" (piramit x{data['pyramid_speedup']:.1f})"
+            if data.get('prefilter_reject_rate') is not None:
+                text += f" (ön filtre %{data['prefilter_reject_rate']:.0f})"
+            if data.get('key_delay_overshoot_ms') is not None:
+                text += f" (tuş +{data['key_delay_overshoot_ms']:.2f}ms)"
+            if data.get('latency_p50_ms') is not None:
+                # Kare yakalama -> tuş gönderimi
+                text += (f" (gecikme {data['latency_p50_ms']:.1f}/{data['latency_p95_ms']:.1f}/"
+                         f"{data['latency_p99_ms']:.1f}ms)")
+            if data.get('toggle_latency_ms') is not None:
+                text += f" (başlatma {data['toggle_latency_ms']:.1f}ms)"
+
+            # Renk belirle (FPS'e göre, hedefli grupta hedefe oranla)
+            if data.get('target_fps'):
+                ratio = fps / data['target_fps']
+                color = '#00ff88' if ratio >= 0.95 else '#ffaa00' if ratio >= 0.75 else '#ff4757'
+            elif fps >= 60:
                 color = '#00ff88'  # Yeşil
             elif fps >= 30:
                 color = '#ffaa00'  # Turuncu
@@ -3404,7 +3890,7 @@ Kullanım:
                 # Yeni label oluştur
                 label = tk.Label(
                     self.fps_label_frame,
-                    text=f"{fps:5.1f} FPS | {name}",
+                    text=text,
                     font=('Consolas', 11, 'bold'),
                     fg=color,
                     bg='#1a1a1a'
@@ -3414,7 +3900,7 @@ Kullanım:
             else:
                 # Mevcut label'ı güncelle
                 self.fps_labels[group_id].configure(
-                    text=f"{fps:5.1f} FPS | {name}",
+                    text=text,
                     fg=color
                 )
 
@@ -3454,24 +3940,114 @@ Kullanım:
                         elif status == 'ready':
                             self.update_indicator(group_id, '#FF0000')
                             self.add_log(f"[{group_name}] Hazır", "INFO")
+                        elif status == 'reloaded':
+                            self.add_log(f"[{group_name}] Ayarlar yeniden yüklendi ({msg.get('reload_ms', 0)}ms)", "INFO")
                     elif msg_type == 'match':
                         color = msg.get('color', '#00FF00')
                         self.update_indicator(group_id, color)
                         if self.debug_var.get():
                             template_name = msg.get('template', '')
                             time_ms = msg.get('time_ms', 0)
-                            self.add_log(f"[{group_name}] Eşleşme: {template_name} ({time_ms}ms)", "MATCH")
+                            macro_text = f", makro {msg['macro_ms']}ms" if 'macro_ms' in msg else ""
+                            self.add_log(f"[{group_name}] Eşleşme: {template_name} ({time_ms}ms{macro_text})", "MATCH")
+                    elif msg_type == 'warning':
+                        self.add_log(f"[{group_name}] {msg.get('message', '')}", "WARN")
                     elif msg_type == 'fps':
                         fps = msg.get('fps', 0)
                         name = msg.get('name', 'Unknown')
-                        self.fps_data[group_id] = {'fps': fps, 'name': name}
+                        self.fps_data[group_id] = {'fps': fps, 'name': name,
+                                                   'target_fps': msg.get('target_fps'),
+                                                   'jitter_ms': msg.get('jitter_ms'),
+                                                   'pyramid_speedup': msg.get('pyramid_speedup'),
+                                                   'prefilter_reject_rate': msg.get('prefilter_reject_rate'),
+                                                   'key_delay_overshoot_ms': msg.get('key_delay_overshoot_ms'),
+                                                   'toggle_latency_ms': msg.get('toggle_latency_ms'),
+                                                   'latency_p50_ms': msg.get('latency_p50_ms'),
+                                                   'latency_p95_ms': msg.get('latency_p95_ms'),
+                                                   'latency_p99_ms': msg.get('latency_p99_ms')}
                         self.update_fps_overlay()
+                    elif msg_type == 'roi':
+                        self.store_learned_roi(group_id, msg.get('file'), msg.get('roi'))
+                        if self.debug_var.get():
+                            self.add_log(f"[{group_name}] Arama penceresi öğrenildi: {msg.get('template', '')} {msg.get('roi')}", "DEBUG")
             except:
                 pass
 
+            self.sample_worker_status()
+
         # OPTIMIZATION: Reduced polling from 50ms (20Hz) to 100ms (10Hz) for better CPU usage
         self.root.after(100, self.check_status_queue)
 
+    def sample_worker_status(self):
+        """Worker durum tablolarını oku (eşleşme, FPS) - maliyet eşleşme sayısından bağımsız"""
+        for group_id, status_table in self.worker_status.items():
+            try:
+                snap = status_table.snapshot()
+            except Exception:
+                continue
+            if snap is None:
+                continue  # yazma sürüyor (veya worker yazarken öldü), sonraki örnekte
+            match_count, indicator, fps_reports = self.status_seen.get(group_id, (0, None, 0))
+
+            if snap['match_count'] != match_count:
+                # Son örnekten beri eşleşme oldu: aksiyon bitmiş olsa da rengini göster
+                self.update_indicator(group_id, snap['match_color'] or '#00FF00')
+                if self.debug_var.get():
+                    group_name = self.get_group_name_by_id(group_id)
+                    macro_text = f", makro {snap['macro_ms']}ms" if snap['macro_ms'] is not None else ""
+                    extra = snap['match_count'] - match_count - 1
+                    extra_text = f" (+{extra} eşleşme)" if extra > 0 else ""
+                    self.add_log(f"[{group_name}] Eşleşme: {snap['template']} "
+                                 f"({snap['match_time_ms']}ms{macro_text}){extra_text}", "MATCH")
+            elif snap['indicator'] != indicator and snap['indicator'] is not None:
+                self.update_indicator(group_id, snap['indicator'])
+
+            if snap['fps_reports'] != fps_reports:
+                self.fps_data[group_id] = {'fps': snap['fps'] or 0,
+                                           'name': self.get_group_name_by_id(group_id),
+                                           'target_fps': snap['target_fps'],
+                                           'jitter_ms': snap['jitter_ms'],
+                                           'pyramid_speedup': snap['pyramid_speedup'],
+                                           'prefilter_reject_rate': snap['prefilter_reject_rate'],
+                                           'key_delay_overshoot_ms': snap['key_delay_overshoot_ms'],
+                                           'toggle_latency_ms': snap['toggle_latency_ms'],
+                                           'latency_p50_ms': snap['latency_p50_ms'],
+                                           'latency_p95_ms': snap['latency_p95_ms'],
+                                           'latency_p99_ms': snap['latency_p99_ms']}
+                self.update_fps_overlay()
+
+            self.status_seen[group_id] = (snap['match_count'], snap['indicator'], snap['fps_reports'])
+
+    def get_timer_spin_ms(self):
+        """Hassas bekleme spin süresi (ms), 0 = kapalı"""
+        if not hasattr(self, 'timer_spin_menu'):
+            return self.global_settings.get("timer_spin_ms", TIMER_SPIN_THRESHOLD_SEC * 1000)
+        text = self.timer_spin_menu.get()
+        try:
+            return 0.0 if text == "Kapalı" else float(text.split()[0])
+        except ValueError:
+            return TIMER_SPIN_THRESHOLD_SEC * 1000
+
+    def store_learned_roi(self, group_id, template_file, roi):
+        """Worker'ın öğrendiği arama penceresini template'e yaz (otomatik mod)"""
+        for group in self.get_flattened_groups():
+            if group.get('id') != group_id:
+                continue
+            for template in group.get('templates', []):
+                if template.get('file') == template_file and template.get('roi_mode') == ROI_MODE_AUTO:
+                    # Sadece bellekte; config bot durunca tek seferde yazılır
+                    template['roi'] = roi
+                    self.learned_rois_dirty = True
+                    return
+
+    def save_learned_rois(self):
+        """Çalışma sırasında öğrenilen arama pencerelerini config'e yaz (worker senkronu olmadan)"""
+        if not self.learned_rois_dirty:
+            return
+        self.learned_rois_dirty = False
+        if not core_save_config(CONFIG_FILE, self.groups, self.global_settings, self.presets):
+            logger.error("Failed to save learned search windows")
+
     # ==================== CONFIG ====================
 
     def load_config(self):
@@ -3537,35 +4113,66 @@ Kullanım:
             self.add_log("FPS overlay kapatıldı.", "INFO")
             self.destroy_fps_overlay()
 
-    def apply_cpu_affinity(self, pid):
-        """Process'e CPU affinity uygula"""
-        try:
-            import psutil
-
-            # Toplam çekirdek sayısı
-            total_cores = psutil.cpu_count(logical=True)
-            if total_cores is None or total_cores < 1:
-                return
-
-            # Kullanılacak çekirdek sayısını al
-            cpu_cores = self.global_settings.get("cpu_cores", 0)
-
-            # 0 veya max = sınırsız
-            if cpu_cores == 0 or cpu_cores >= total_cores:
-                return  # Sınırsız, bir şey yapma
-
-            # İlk N çekirdeği kullan
-            affinity_mask = list(range(cpu_cores))
-
-            # Process'e affinity uygula
-            proc = psutil.Process(pid)
-            proc.cpu_affinity(affinity_mask)
+    def create_affinity_planner(self):
+        """Ayarlara göre CPU yerleşim planlayıcısı"""
+        max_cpus = self.global_settings.get("cpu_cores", 0)
+        if hasattr(self, 'cpu_cores_slider'):
+            max_cpus = int(self.cpu_cores_slider.get())
+        return AffinityPlanner(
+            max_cpus=max_cpus,
+            reserved_cores=self.get_reserved_cores(),
+            spread=self.get_spread_workers()
+        )
 
-            logger.info(f"CPU affinity set for PID {pid}: {cpu_cores}/{total_cores} cores")
-        except ImportError:
-            logger.warning("psutil not installed, CPU affinity not applied")
-        except Exception as e:
-            logger.error(f"Failed to set CPU affinity: {e}")
+    def next_worker_cpus(self):
+        """Sıradaki process'e ayrılan CPU'lar (None = sabitleme yok)"""
+        if self.affinity_planner is None:
+            self.affinity_planner = self.create_affinity_planner()
+        cpus = self.affinity_planner.cpus_for(self._placement_index)
+        self._placement_index += 1
+        # Çalışırken eklenen process'ler de CPU paylaşımına sayılır
+        self._placement_total = max(self._placement_total, self._placement_index)
+        return cpus
+
+    def place_process(self, pid, cpus, label):
+        """Process'i CPU'lara sabitle, önceliğini ayarla ve yerleşimi logla"""
+        priority = self.get_worker_priority()
+        apply_placement(pid, cpus, priority)
+        cpu_text = ",".join(str(cpu) for cpu in cpus) if cpus else "tümü"
+        message = f"{label} → CPU {cpu_text}, öncelik: {self.WORKER_PRIORITY_LABELS[priority]}"
+        logger.info(message)
+        self.add_log(message, "INFO")
+
+    def get_reserved_cores(self):
+        if hasattr(self, 'reserved_cores_menu'):
+            return int(self.reserved_cores_menu.get())
+        return self.global_settings.get("reserved_cores", DEFAULT_RESERVED_CORES)
+
+    def get_spread_workers(self):
+        if hasattr(self, 'spread_workers_var'):
+            return self.spread_workers_var.get()
+        return self.global_settings.get("spread_workers", DEFAULT_SPREAD_WORKERS)
+
+    def get_worker_priority(self):
+        if hasattr(self, 'worker_priority_menu'):
+            label = self.worker_priority_menu.get()
+            for value, text in self.WORKER_PRIORITY_LABELS.items():
+                if text == label:
+                    return value
+        priority = self.global_settings.get("worker_priority", DEFAULT_WORKER_PRIORITY)
+        # Bilinmeyen / eski değer -> varsayılan
+        return priority if priority in self.WORKER_PRIORITY_LABELS else DEFAULT_WORKER_PRIORITY
+
+    def get_cv_threads(self):
+        if hasattr(self, 'cv_threads_menu'):
+            text = self.cv_threads_menu.get()
+            return 0 if text == "Otomatik" else int(text)
+        return self.global_settings.get("cv_threads", DEFAULT_CV_THREADS)
+
+    def update_placement_preview(self, *_):
+        """Ayarlar sekmesindeki CPU yerleşim özetini güncelle"""
+        if hasattr(self, 'placement_label'):
+            self.placement_label.configure(text=self.create_affinity_planner().describe())
 
     def on_cpu_cores_change(self, value):
         """CPU çekirdek sayısı değiştiğinde çağrılır"""
@@ -3577,12 +4184,25 @@ Kullanım:
             self.cpu_cores_label.configure(text="Sınırsız")
         else:
             self.cpu_cores_label.configure(text=f"{cores}/{self.total_cpu_cores}")
+        self.update_placement_preview()
 
     def save_config(self, silent=False):
         """Save config to JSON"""
         try:
             self.global_settings["debug_enabled"] = self.debug_var.get()
             self.global_settings["fps_overlay_enabled"] = self.fps_overlay_var.get()
+            self.global_settings["shared_capture"] = self.shared_capture_var.get()
+            if hasattr(self, 'timer_spin_menu'):
+                self.global_settings["timer_spin_ms"] = self.get_timer_spin_ms()
+            if hasattr(self, 'worker_processes_menu'):
+                self.global_settings["worker_processes"] = self.get_worker_processes_setting()
+            if hasattr(self, 'test_fps_menu'):
+                self.global_settings["test_fps"] = self.get_test_fps()
+            if hasattr(self, 'reserved_cores_menu'):
+                self.global_settings["reserved_cores"] = self.get_reserved_cores()
+                self.global_settings["spread_workers"] = self.get_spread_workers()
+                self.global_settings["worker_priority"] = self.get_worker_priority()
+                self.global_settings["cv_threads"] = self.get_cv_threads()
             # CPU çekirdek sayısını kaydet
             if hasattr(self, 'cpu_cores_slider'):
                 self.global_settings["cpu_cores"] = int(self.cpu_cores_slider.get())
@@ -3594,6 +4214,11 @@ Kullanım:
                 getattr(self, 'presets', [])
             )
 
+            if success:
+                self.learned_rois_dirty = False
+                # Çalışan worker'lara değişiklikleri gönder (hot reload)
+                self.sync_workers()
+
             if success and not silent:
                 messagebox.showinfo("Başarılı", "Config kaydedildi!")
             elif not success:
@@ -3608,6 +4233,8 @@ Kullanım:
 
     def on_close(self):
         """Handle window close"""
+        if self.test_mode_active:
+            self.stop_test_mode()
         if self.bot_active:
             self.stop_all_bots()
         self.save_config(silent=True)  # Auto-save on close
@@ -4,7 +4,7 @@ Dialog classes for group management (Add, Edit, Key Capture, Region Select)
 """
 
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 import tkinter as tk
 from PIL import ImageTk, ImageGrab
 import keyboard
@@ -13,6 +13,22 @@ from pathlib import Path
 
 from core.keyboard_utils import get_physical_key_name
 from core.config import get_safe_folder_name
+from core.constants import (
+    FRAME_SOURCE_MSS,
+    FRAME_SOURCE_REPLAY,
+    REPLAY_IMAGE_EXTENSIONS,
+    DEFAULT_BATCHED_MATCHING,
+    DEFAULT_PYRAMID_MATCHING,
+    DEFAULT_PREFILTER,
+    DEFAULT_CHANGE_GATE,
+    DEFAULT_SCORE_TELEMETRY,
+    DEFAULT_TARGET_FPS,
+    TARGET_FPS_OPTIONS,
+    ACTION_POLICY_DROP,
+    ACTION_POLICY_COALESCE,
+    ACTION_POLICY_QUEUE,
+    DEFAULT_ACTION_POLICY,
+)
 
 # Images folder path
 IMAGES_FOLDER = Path(__file__).parent.parent.parent / "images"
@@ -231,6 +247,12 @@ class AddGroupDialog:
 
 class EditGroupDialog:
     """Dialog for editing group"""
+    ACTION_POLICY_LABELS = {
+        ACTION_POLICY_DROP: "Yeniyi at",
+        ACTION_POLICY_COALESCE: "Birleştir",
+        ACTION_POLICY_QUEUE: "Sıraya al",
+    }
+
     def __init__(self, parent, manager, index):
         self.manager = manager
         self.index = index
@@ -243,7 +265,7 @@ class EditGroupDialog:
 
         self.top = ctk.CTkToplevel(parent)
         self.top.title(f"Grubu Düzenle: {self.group['name']}")
-        self.top.geometry("500x650")
+        self.top.geometry("500x760")
         self.top.transient(parent)
         self.top.grab_set()
         self.top.resizable(False, False)
@@ -324,6 +346,75 @@ class EditGroupDialog:
                      fg_color="#333333", hover_color="#444444",
                      command=self.select_region).pack(side="left")
 
+        # Frame source (live capture or recorded frames)
+        self.frame_source = dict(self.group.get('frame_source') or {'type': FRAME_SOURCE_MSS})
+        source_frame = ctk.CTkFrame(main, fg_color="transparent")
+        source_frame.pack(fill="x", pady=8)
+        ctk.CTkLabel(source_frame, text="Görüntü Kaynağı:", width=100).pack(side="left")
+        self.source_menu = ctk.CTkOptionMenu(source_frame, values=["Canlı Ekran", "Kayıt"], width=120,
+                                             command=self._on_source_change)
+        self.source_menu.pack(side="left", padx=10)
+        self.source_menu.set("Kayıt" if self.frame_source.get('type') == FRAME_SOURCE_REPLAY else "Canlı Ekran")
+        self.source_btn = ctk.CTkButton(source_frame, text="Seç", width=60, height=30,
+                                        fg_color="#333333", hover_color="#444444",
+                                        command=self.select_replay_path)
+        self.source_btn.pack(side="left")
+        self.source_label = ctk.CTkLabel(main, text=self._source_text(), text_color="#888888",
+                                         font=ctk.CTkFont(size=11))
+        self.source_label.pack(anchor="w", padx=(110, 0))
+        self._on_source_change(self.source_menu.get())
+
+        # Performance settings
+        perf_frame = ctk.CTkFrame(main, fg_color="#1a1a1a", corner_radius=10)
+        perf_frame.pack(fill="x", pady=(10, 0))
+        ctk.CTkLabel(perf_frame, text="⚡ Performans", font=ctk.CTkFont(size=12, weight="bold"),
+                    text_color="#00d4ff").pack(anchor="w", padx=15, pady=(10, 5))
+        self.perf_options = ctk.CTkFrame(perf_frame, fg_color="transparent")
+        self.perf_options.pack(fill="x", padx=15, pady=(0, 10))
+
+        fps_row = ctk.CTkFrame(self.perf_options, fg_color="transparent")
+        fps_row.pack(fill="x", pady=2)
+        ctk.CTkLabel(fps_row, text="Hedef FPS:").pack(side="left")
+        fps_values = [self._fps_text(v) for v in TARGET_FPS_OPTIONS]
+        current_fps = self.group.get('target_fps', DEFAULT_TARGET_FPS)
+        if self._fps_text(current_fps) not in fps_values:
+            fps_values.append(self._fps_text(current_fps))
+        self.target_fps_menu = ctk.CTkOptionMenu(fps_row, values=fps_values, width=110, height=28,
+                                                 fg_color="#333333", button_color="#444444",
+                                                 button_hover_color="#555555")
+        self.target_fps_menu.pack(side="left", padx=10)
+        self.target_fps_menu.set(self._fps_text(current_fps))
+
+        policy_row = ctk.CTkFrame(self.perf_options, fg_color="transparent")
+        policy_row.pack(fill="x", pady=2)
+        ctk.CTkLabel(policy_row, text="Aksiyon sürerken:").pack(side="left")
+        self.policy_menu = ctk.CTkOptionMenu(policy_row, values=list(self.ACTION_POLICY_LABELS.values()),
+                                             width=150, height=28, fg_color="#333333",
+                                             button_color="#444444", button_hover_color="#555555")
+        self.policy_menu.pack(side="left", padx=10)
+        self.policy_menu.set(self.ACTION_POLICY_LABELS.get(self.group.get('action_policy', DEFAULT_ACTION_POLICY),
+                                                           self.ACTION_POLICY_LABELS[DEFAULT_ACTION_POLICY]))
+
+        self.batched_var = ctk.BooleanVar(value=self.group.get('batched_matching', DEFAULT_BATCHED_MATCHING))
+        ctk.CTkCheckBox(self.perf_options, text="Toplu eşleştirme (FFT, çok template'te hızlı)",
+                       variable=self.batched_var, fg_color="#00d4ff").pack(anchor="w", pady=2)
+
+        self.pyramid_var = ctk.BooleanVar(value=self.group.get('pyramid_matching', DEFAULT_PYRAMID_MATCHING))
+        ctk.CTkCheckBox(self.perf_options, text="Piramit eşleştirme (kaba→ince, büyük bölgelerde hızlı)",
+                       variable=self.pyramid_var, fg_color="#00d4ff").pack(anchor="w", pady=2)
+
+        self.prefilter_var = ctk.BooleanVar(value=self.group.get('prefilter', DEFAULT_PREFILTER))
+        ctk.CTkCheckBox(self.perf_options, text="Ön filtre (histogram, kesin olmayanları atla)",
+                       variable=self.prefilter_var, fg_color="#00d4ff").pack(anchor="w", pady=2)
+
+        self.change_gate_var = ctk.BooleanVar(value=self.group.get('change_gate', DEFAULT_CHANGE_GATE))
+        ctk.CTkCheckBox(self.perf_options, text="Değişmeyen karede eşleştirmeyi atla",
+                       variable=self.change_gate_var, fg_color="#00d4ff").pack(anchor="w", pady=2)
+
+        self.telemetry_var = ctk.BooleanVar(value=self.group.get('score_telemetry', DEFAULT_SCORE_TELEMETRY))
+        ctk.CTkCheckBox(self.perf_options, text="Skor kaydı (eşik ayarı için, telemetry/ klasörüne)",
+                       variable=self.telemetry_var, fg_color="#00d4ff").pack(anchor="w", pady=2)
+
         # Notes
         notes_frame = ctk.CTkFrame(main, fg_color="#1a1a1a", corner_radius=10)
         notes_frame.pack(fill="x", pady=10)
@@ -373,6 +464,36 @@ class EditGroupDialog:
         self.top.withdraw()
         self.top.after(300, lambda: SelectRegionDialogSimple(self.top.master, self))
 
+    @staticmethod
+    def _fps_text(fps):
+        return "Sınırsız" if not fps else str(int(fps))
+
+    def _source_text(self):
+        if self.frame_source.get('type') == FRAME_SOURCE_REPLAY:
+            return self.frame_source.get('path') or "Kayıt seçilmedi"
+        return ""
+
+    def _on_source_change(self, value):
+        self.frame_source['type'] = FRAME_SOURCE_REPLAY if value == "Kayıt" else FRAME_SOURCE_MSS
+        self.source_btn.configure(state="normal" if value == "Kayıt" else "disabled")
+        self.source_label.configure(text=self._source_text())
+
+    def select_replay_path(self):
+        """Kayıt seç: video dosyası veya PNG dizisindeki herhangi bir kare (klasörü kullanılır)"""
+        path = filedialog.askopenfilename(
+            parent=self.top,
+            title="Kayıt Seç (video veya kare görseli)",
+            filetypes=[("Video / Görsel", "*.mp4 *.avi *.mkv " + " ".join(f"*{e}" for e in REPLAY_IMAGE_EXTENSIONS)),
+                       ("Tümü", "*.*")]
+        )
+        if not path:
+            return
+        path = Path(path)
+        if path.suffix.lower() in REPLAY_IMAGE_EXTENSIONS:
+            path = path.parent
+        self.frame_source['path'] = str(path)
+        self.source_label.configure(text=self._source_text())
+
     def save(self):
         name = self.name_entry.get().strip()
         if not name:
@@ -416,11 +537,25 @@ class EditGroupDialog:
         self.group['spam_enabled'] = self.spam_enabled_var.get()
         self.group['spam_timing'] = {"pre_delay": pre, "hold_time": hold, "post_delay": post}
         self.group['search_region'] = self.search_region
+        self.group['frame_source'] = self.frame_source
+        self.group['batched_matching'] = self.batched_var.get()
+        self.group['pyramid_matching'] = self.pyramid_var.get()
+        self.group['prefilter'] = self.prefilter_var.get()
+        self.group['change_gate'] = self.change_gate_var.get()
+        self.group['score_telemetry'] = self.telemetry_var.get()
+        fps_text = self.target_fps_menu.get()
+        self.group['target_fps'] = 0 if fps_text == "Sınırsız" else int(fps_text)
+        policy_text = self.policy_menu.get()
+        self.group['action_policy'] = next(
+            (policy for policy, text in self.ACTION_POLICY_LABELS.items() if text == policy_text),
+            DEFAULT_ACTION_POLICY
+        )
         self.group['notes'] = self.notes_entry.get("1.0", "end-1c").strip()
 
         self.manager.groups[self.index] = self.group
         self.manager.refresh_group_list()
         self.manager.update_group_details()
+        self.manager.save_config(silent=True)
         self.top.destroy()
 
 
@@ -498,9 +633,10 @@ class CaptureKeyDialogSimple:
 
 
 class SelectRegionDialogSimple:
-    """Simple region selection dialog"""
-    def __init__(self, parent, caller):
+    """Simple region selection dialog (on_select: optional callback instead of caller.search_region)"""
+    def __init__(self, parent, caller, on_select=None):
         self.caller = caller
+        self.on_select = on_select
         self.screenshot = ImageGrab.grab()
         self.width, self.height = self.screenshot.size
 
@@ -552,8 +688,11 @@ class SelectRegionDialogSimple:
         if x2 - x1 < 10 or y2 - y1 < 10:
             return
 
-        self.caller.search_region = [x1, y1, x2, y2]
-        self.caller.region_label.configure(text=f"{x1},{y1} - {x2},{y2}")
+        if self.on_select is not None:
+            self.on_select([x1, y1, x2, y2])
+        else:
+            self.caller.search_region = [x1, y1, x2, y2]
+            self.caller.region_label.configure(text=f"{x1},{y1} - {x2},{y2}")
         self.top.destroy()
         # Ana pencereyi ve dialog'u geri göster
         self.caller.manager.root.deiconify()
@@ -12,7 +12,20 @@ import time
 from pathlib import Path
 
 from core.keyboard_utils import get_physical_key_name
-from core.constants import DEFAULT_TRIGGER_CONDITION, TRIGGER_CONDITION_FOUND, TRIGGER_CONDITION_NOT_FOUND
+from core.constants import (
+    DEFAULT_TRIGGER_CONDITION,
+    TRIGGER_CONDITION_FOUND,
+    TRIGGER_CONDITION_NOT_FOUND,
+    DEFAULT_ROI_MODE,
+    ROI_MODE_FULL,
+    ROI_MODE_AUTO,
+    ROI_MODE_FIXED,
+    COLOR_MODE_OFF,
+    COLOR_MODE_RGB,
+    COLOR_MODE_HSV,
+    DEFAULT_COLOR_MODE,
+    DEFAULT_COLOR_TOLERANCE,
+)
 from core.config import get_safe_folder_name, get_group_images_folder
 
 # Images folder path
@@ -211,7 +224,7 @@ class TemplateFinalizeDialog:
 
         self.top = ctk.CTkToplevel(parent)
         self.top.title("Template Detayları")
-        self.top.geometry("450x530")
+        self.top.geometry("450x540")
         self.top.transient(parent)
         self.top.grab_set()
         self.top.resizable(False, False)
@@ -226,13 +239,11 @@ class TemplateFinalizeDialog:
         # Preview
         preview_frame = ctk.CTkFrame(main, fg_color="#1a1a1a", corner_radius=10)
         preview_frame.pack(pady=(0, 15))
-        try:
-            preview = template_img.copy()
-            preview.thumbnail((80, 80))
-            self.preview_photo = ctk.CTkImage(light_image=preview, dark_image=preview, size=preview.size)
-            ctk.CTkLabel(preview_frame, image=self.preview_photo, text="").pack(padx=15, pady=15)
-        except:
-            pass
+        self.preview_label = ctk.CTkLabel(preview_frame, text="")
+        self.preview_label.pack(side="left", padx=15, pady=15)
+        self.update_preview(template_img)
+        ctk.CTkButton(preview_frame, text="Maske Çiz", width=90, height=28, fg_color="#333333",
+                     command=self.edit_mask).pack(side="left", padx=(0, 15))
 
         # Name
         name_row = ctk.CTkFrame(main, fg_color="transparent")
@@ -326,6 +337,20 @@ class TemplateFinalizeDialog:
     def capture_key(self):
         CaptureKeyComboDialog(self.top, self)
 
+    def edit_mask(self):
+        MaskEditorDialog(self.top, self.template_img, self.update_preview)
+
+    def update_preview(self, template_img):
+        """Görseli (maskeli haliyle) önizlemeye yükle"""
+        self.template_img = template_img
+        try:
+            preview = template_img.copy()
+            preview.thumbnail((80, 80))
+            self.preview_photo = ctk.CTkImage(light_image=preview, dark_image=preview, size=preview.size)
+            self.preview_label.configure(image=self.preview_photo)
+        except:
+            pass
+
     def pick_color(self):
         color = colorchooser.askcolor(initialcolor=self.selected_color)
         if color[1]:
@@ -393,6 +418,8 @@ class TemplateFinalizeDialog:
             "color": self.selected_color,
             "timing": {"pre_delay": pre, "hold_time": hold, "post_delay": post},
             "trigger_condition": trigger_condition,
+            "roi_mode": DEFAULT_ROI_MODE,
+            "color_mode": DEFAULT_COLOR_MODE,
             "use_macro": False,
             "macro": []
         }
@@ -402,6 +429,7 @@ class TemplateFinalizeDialog:
 
         selected_group['templates'].append(new_template)
         self.manager.refresh_template_list()
+        self.manager.save_config(silent=True)
 
         self.top.destroy()
         self.add_dialog.top.destroy()
@@ -481,8 +509,117 @@ class CaptureKeyComboDialog:
         self.top.destroy()
 
 
+class MaskEditorDialog:
+    """Mark template areas to ignore while matching (saved as PNG transparency)"""
+    VIEW_SIZE = 240
+
+    def __init__(self, parent, template_img, on_done):
+        self.on_done = on_done
+        self.image = template_img.convert('RGBA')
+        self.alpha = self.image.getchannel('A')
+        w, h = self.image.size
+        self.scale = max(self.VIEW_SIZE / max(w, h), 1)
+        self.view_size = (max(int(w * self.scale), 1), max(int(h * self.scale), 1))
+        self.start_x = None
+        self.start_y = None
+        self.rect = None
+
+        self.top = ctk.CTkToplevel(parent)
+        self.top.title("Maske Çiz")
+        self.top.transient(parent)
+        self.top.grab_set()
+        self.top.resizable(False, False)
+        self.top.after(10, self.center_window)
+
+        main = ctk.CTkFrame(self.top, fg_color="transparent")
+        main.pack(fill="both", expand=True, padx=20, pady=15)
+
+        ctk.CTkLabel(main, text="Yok sayılacak alanları sürükleyerek işaretleyin\n"
+                               "(sayaç, bekleme animasyonu vb.)",
+                    font=ctk.CTkFont(size=12), text_color="#aaaaaa").pack(pady=(0, 10))
+
+        self.canvas = tk.Canvas(main, width=self.view_size[0], height=self.view_size[1],
+                                highlightthickness=0, cursor="crosshair", bg="#0d0d0d")
+        self.canvas.pack()
+        self.canvas.bind('<ButtonPress-1>', self.on_press)
+        self.canvas.bind('<B1-Motion>', self.on_drag)
+        self.canvas.bind('<ButtonRelease-1>', self.on_release)
+        self.render()
+
+        btn_frame = ctk.CTkFrame(main, fg_color="transparent")
+        btn_frame.pack(pady=(12, 0))
+        ctk.CTkButton(btn_frame, text="Tamam", width=80, height=32, fg_color="#00ff88",
+                     text_color="#000000", command=self.confirm).pack(side="left", padx=(0, 10))
+        ctk.CTkButton(btn_frame, text="Temizle", width=80, height=32, fg_color="#ff6b6b",
+                     text_color="#ffffff", command=self.clear).pack(side="left", padx=(0, 10))
+        ctk.CTkButton(btn_frame, text="İptal", width=80, height=32, fg_color="#333333",
+                     command=self.top.destroy).pack(side="left")
+
+    def center_window(self):
+        self.top.update_idletasks()
+        w, h = self.top.winfo_width(), self.top.winfo_height()
+        x = (self.top.winfo_screenwidth() // 2) - (w // 2)
+        y = (self.top.winfo_screenheight() // 2) - (h // 2)
+        self.top.geometry(f'{w}x{h}+{x}+{y}')
+
+    def render(self):
+        """Görseli büyütülmüş çiz, yok sayılan alanları kırmızı göster"""
+        base = self.image.convert('RGB')
+        tint = Image.new('RGB', base.size, '#ff4757')
+        ignored = self.alpha.point(lambda a: 0 if a >= 128 else 160)
+        view = Image.composite(tint, base, ignored).resize(self.view_size, Image.NEAREST)
+        self.photo = ImageTk.PhotoImage(view)
+        self.canvas.delete('all')
+        self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
+
+    def on_press(self, event):
+        self.start_x, self.start_y = event.x, event.y
+        self.rect = self.canvas.create_rectangle(event.x, event.y, event.x, event.y,
+                                                 outline='#ff4757', width=2, dash=(4, 4))
+
+    def on_drag(self, event):
+        if self.rect:
+            self.canvas.coords(self.rect, self.start_x, self.start_y, event.x, event.y)
+
+    def on_release(self, event):
+        if self.rect is None:
+            return
+        self.rect = None
+        # Canvas -> görsel koordinatları
+        w, h = self.image.size
+        x1 = max(int(min(self.start_x, event.x) / self.scale), 0)
+        y1 = max(int(min(self.start_y, event.y) / self.scale), 0)
+        x2 = min(int(max(self.start_x, event.x) / self.scale) + 1, w)
+        y2 = min(int(max(self.start_y, event.y) / self.scale) + 1, h)
+        if x2 > x1 and y2 > y1:
+            self.alpha.paste(0, (x1, y1, x2, y2))
+        self.render()
+
+    def clear(self):
+        """Tüm maskeyi kaldır"""
+        self.alpha = Image.new('L', self.image.size, 255)
+        self.render()
+
+    def confirm(self):
+        image = self.image.copy()
+        image.putalpha(self.alpha)
+        self.top.destroy()
+        self.on_done(image)
+
+
 class EditTemplateDialog:
     """Dialog for editing template"""
+    ROI_MODE_LABELS = {
+        ROI_MODE_FULL: "Tüm bölge",
+        ROI_MODE_AUTO: "Otomatik",
+        ROI_MODE_FIXED: "Sabit pencere",
+    }
+    COLOR_MODE_LABELS = {
+        COLOR_MODE_OFF: "Kapalı",
+        COLOR_MODE_RGB: "Ortalama renk",
+        COLOR_MODE_HSV: "Ton/doygunluk",
+    }
+
     def __init__(self, parent, manager, template, index):
         self.manager = manager
         self.template = template
@@ -491,6 +628,7 @@ class EditTemplateDialog:
         self.key_combo = template.get('key_combo', '')
         self.new_image = None
         self.macro_list = template.get('macro', [])[:]  # Kopyala
+        self.roi = template.get('roi')
 
         self.top = ctk.CTkToplevel(parent)
         self.top.title(f"Template Düzenle: {template['name']}")
@@ -521,7 +659,9 @@ class EditTemplateDialog:
         self.load_preview()
 
         ctk.CTkButton(preview_content, text="Yeni Görsel", width=100, height=30, fg_color="#333333",
-                     command=self.capture_new_image).pack(side="left", padx=15)
+                     command=self.capture_new_image).pack(side="left", padx=(15, 5))
+        ctk.CTkButton(preview_content, text="Maske", width=70, height=30, fg_color="#333333",
+                     command=self.edit_mask).pack(side="left")
 
         # Name
         name_row = ctk.CTkFrame(main_scroll, fg_color="transparent")
@@ -663,6 +803,57 @@ class EditTemplateDialog:
         self.trigger_menu.pack(side="left", padx=5)
         self.trigger_menu.set(current_display)
 
+        # Arama penceresi (ROI)
+        roi_row = ctk.CTkFrame(main_scroll, fg_color="transparent")
+        roi_row.pack(fill="x", pady=4)
+        ctk.CTkLabel(roi_row, text="Arama:", width=80).pack(side="left")
+        self.roi_menu = ctk.CTkOptionMenu(
+            roi_row,
+            values=list(self.ROI_MODE_LABELS.values()),
+            width=130,
+            height=28,
+            fg_color="#333333",
+            button_color="#444444",
+            button_hover_color="#555555",
+            command=self._on_roi_mode_change
+        )
+        self.roi_menu.pack(side="left", padx=5)
+        self.roi_menu.set(self.ROI_MODE_LABELS.get(template.get('roi_mode', DEFAULT_ROI_MODE),
+                                                   self.ROI_MODE_LABELS[ROI_MODE_FULL]))
+        self.roi_btn = ctk.CTkButton(roi_row, text="Seç", width=45, height=28, fg_color="#333333",
+                                     command=self.select_roi)
+        self.roi_btn.pack(side="left", padx=2)
+        self.roi_label = ctk.CTkLabel(roi_row, text="", text_color="#888888", font=ctk.CTkFont(size=11))
+        self.roi_label.pack(side="left", padx=5)
+        self._on_roi_mode_change(self.roi_menu.get())
+
+        # Renk kontrolü (gri eşleşmeden sonra konumdaki ortalama renk)
+        color_row = ctk.CTkFrame(main_scroll, fg_color="transparent")
+        color_row.pack(fill="x", pady=4)
+        ctk.CTkLabel(color_row, text="Renk:", width=80).pack(side="left")
+        self.color_mode_menu = ctk.CTkOptionMenu(
+            color_row,
+            values=list(self.COLOR_MODE_LABELS.values()),
+            width=130,
+            height=28,
+            fg_color="#333333",
+            button_color="#444444",
+            button_hover_color="#555555",
+            command=self._on_color_mode_change
+        )
+        self.color_mode_menu.pack(side="left", padx=5)
+        self.color_mode_menu.set(self.COLOR_MODE_LABELS.get(template.get('color_mode', DEFAULT_COLOR_MODE),
+                                                            self.COLOR_MODE_LABELS[COLOR_MODE_OFF]))
+        self.color_tolerance_slider = ctk.CTkSlider(color_row, from_=5, to=100, number_of_steps=95, width=100)
+        self.color_tolerance_slider.pack(side="left", padx=5)
+        self.color_tolerance_slider.set(template.get('color_tolerance', DEFAULT_COLOR_TOLERANCE))
+        self.color_tolerance_label = ctk.CTkLabel(color_row, text="", width=30)
+        self.color_tolerance_label.pack(side="left")
+        self.color_tolerance_slider.configure(
+            command=lambda v: self.color_tolerance_label.configure(text=f"±{int(v)}"))
+        self.color_tolerance_label.configure(text=f"±{int(self.color_tolerance_slider.get())}")
+        self._on_color_mode_change(self.color_mode_menu.get())
+
         # Enabled
         self.enabled_var = ctk.BooleanVar(value=template.get('enabled', True))
         ctk.CTkCheckBox(main_scroll, text="Aktif", variable=self.enabled_var,
@@ -956,6 +1147,19 @@ class EditTemplateDialog:
         """Ekran yakalama işlemini başlat"""
         EditTemplateCapture(self.top.master, self)
 
+    def edit_mask(self):
+        """Yok sayılacak alanları çiz (yeni görsel varsa onu, yoksa kayıtlı görseli)"""
+        image = self.new_image
+        if image is None:
+            filepath = IMAGES_FOLDER / self.template['file']
+            try:
+                image = Image.open(filepath)
+                image.load()
+            except Exception as e:
+                messagebox.showerror("Hata", f"Görsel açılamadı: {e}")
+                return
+        MaskEditorDialog(self.top, image, self.update_preview)
+
     def center_window(self):
         self.top.update_idletasks()
         w, h = self.top.winfo_width(), self.top.winfo_height()
@@ -979,12 +1183,58 @@ class EditTemplateDialog:
         else:
             self.trigger_var.set(TRIGGER_CONDITION_NOT_FOUND)
 
+    def _roi_mode(self):
+        label = self.roi_menu.get()
+        for mode, text in self.ROI_MODE_LABELS.items():
+            if text == label:
+                return mode
+        return ROI_MODE_FULL
+
+    def _on_roi_mode_change(self, value):
+        """Arama modu değiştiğinde pencere bilgisini güncelle"""
+        mode = self._roi_mode()
+        self.roi_btn.configure(state="normal" if mode == ROI_MODE_FIXED else "disabled")
+        if mode == ROI_MODE_FULL:
+            text = ""
+        elif self.roi:
+            text = "{},{} - {},{}".format(*self.roi)
+        else:
+            text = "İlk eşleşmede öğrenilir" if mode == ROI_MODE_AUTO else "Pencere seçilmedi"
+        self.roi_label.configure(text=text)
+
+    def _color_mode(self):
+        """Seçili renk kontrolü modu"""
+        for mode, text in self.COLOR_MODE_LABELS.items():
+            if text == self.color_mode_menu.get():
+                return mode
+        return COLOR_MODE_OFF
+
+    def _on_color_mode_change(self, value):
+        """Renk kontrolü kapalıyken toleransı devre dışı bırak"""
+        self.color_tolerance_slider.configure(state="disabled" if self._color_mode() == COLOR_MODE_OFF else "normal")
+
+    def select_roi(self):
+        """Sabit arama penceresini ekrandan seç"""
+        from ui.dialogs.group_dialogs import SelectRegionDialogSimple
+        self.manager.root.withdraw()
+        self.top.withdraw()
+        self.top.after(300, lambda: SelectRegionDialogSimple(self.top.master, self, on_select=self._set_roi))
+
+    def _set_roi(self, region):
+        self.roi = region
+        self._on_roi_mode_change(self.roi_menu.get())
+
     def save(self):
         name = self.name_entry.get().strip()
         if not name:
             messagebox.showwarning("Uyarı", "İsim boş olamaz!")
             return
 
+        roi_mode = self._roi_mode()
+        if roi_mode == ROI_MODE_FIXED and not self.roi:
+            messagebox.showwarning("Uyarı", "Sabit arama penceresi seçilmedi!")
+            return
+
         # Get selected group (folder-safe way)
         selected_group = self.manager.get_selected_group()
         if selected_group is None:
@@ -1024,12 +1274,26 @@ class EditTemplateDialog:
         trigger_display = self.trigger_menu.get()
         self.template['trigger_condition'] = TRIGGER_CONDITION_FOUND if trigger_display == "Görsel bulunduğunda" else TRIGGER_CONDITION_NOT_FOUND
 
+        # Arama penceresi (yeni görselde öğrenilen pencere geçersiz)
+        self.template['roi_mode'] = roi_mode
+        if roi_mode == ROI_MODE_AUTO and self.new_image is not None:
+            self.roi = None
+        if self.roi:
+            self.template['roi'] = self.roi
+        else:
+            self.template.pop('roi', None)
+
+        # Renk kontrolü
+        self.template['color_mode'] = self._color_mode()
+        self.template['color_tolerance'] = int(self.color_tolerance_slider.get())
+
         # Makro bilgisi
         self.template['use_macro'] = self.use_macro_var.get()
         self.template['macro'] = self.macro_list
 
         selected_group['templates'][self.index] = self.template
         self.manager.refresh_template_list()
+        self.manager.save_config(silent=True)
         self.top.destroy()
 
     def update_preview(self, new_img):